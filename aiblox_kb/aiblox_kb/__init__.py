@@ -1,18 +1,67 @@
 """KB contract package: models, repos, db helpers."""
 
-from aiblox_kb.db import make_engine, make_session_factory, make_sessionmaker
-from aiblox_kb.models import Base, KbChunkCache, KbItem, SCHEMA
+from aiblox_kb.db import (
+    InstrumentedAsyncPool,
+    PoolStats,
+    make_engine,
+    make_session_factory,
+    make_sessionmaker,
+    pool_stats,
+    prewarm_pool,
+)
+from aiblox_kb.models import (
+    Base,
+    KbChunkCache,
+    KbChunkCachePacked,
+    KbChunkStore,
+    KbIngestCheckpoint,
+    KbItem,
+    KbItemChunkRef,
+    KbItemEmbedding,
+    SCHEMA,
+)
 from aiblox_kb.repos.item_repo import ItemRepo
 from aiblox_kb.repos.chunk_cache_repo import ChunkCacheRepo
+from aiblox_kb.repos.content_addressed_chunk_repo import ContentAddressedChunkCacheRepo
+from aiblox_kb.repos.packed_chunk_cache_repo import PackedChunkCacheRepo
+from aiblox_kb.repos.item_embedding_repo import ItemEmbeddingRepo
+from aiblox_kb.repos.ingest_checkpoint_repo import IngestCheckpointRepo
+from aiblox_kb.repos.sharded_item_repo import ShardedItemRepo
+from aiblox_kb.repos.sharded_chunk_cache_repo import ShardedChunkCacheRepo
+from aiblox_kb.repos.bm25_item_repo import Bm25ItemRepo
+from aiblox_kb.replicas import ReplicaRouter
+from aiblox_kb.sharding import ShardMap, ShardResult
+from aiblox_kb.uow import UnitOfWork, current_unit_of_work
 
 __all__ = [
     "Base",
     "KbItem",
     "KbChunkCache",
+    "KbChunkCachePacked",
+    "KbChunkStore",
+    "KbItemChunkRef",
+    "KbItemEmbedding",
+    "KbIngestCheckpoint",
     "SCHEMA",
     "ItemRepo",
     "ChunkCacheRepo",
+    "ContentAddressedChunkCacheRepo",
+    "PackedChunkCacheRepo",
+    "ItemEmbeddingRepo",
+    "IngestCheckpointRepo",
     "make_engine",
     "make_sessionmaker",
     "make_session_factory",
+    "prewarm_pool",
+    "pool_stats",
+    "PoolStats",
+    "InstrumentedAsyncPool",
+    "ShardedItemRepo",
+    "ShardedChunkCacheRepo",
+    "Bm25ItemRepo",
+    "ShardMap",
+    "ShardResult",
+    "ReplicaRouter",
+    "UnitOfWork",
+    "current_unit_of_work",
 ]
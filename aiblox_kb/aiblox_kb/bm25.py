@@ -0,0 +1,415 @@
+from __future__ import annotations
+
+import hashlib
+import heapq
+import json
+import math
+import os
+import re
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Iterable, Mapping
+from uuid import UUID, uuid4
+
+from aiblox_kb.filters import matches_filters
+
+_TOKEN = re.compile(r"\w+")
+_MAGIC = b"AIBLOXBM25\x01"
+# Postings are stored as little-endian uint32 arrays regardless of host byte order.
+_SWAP = sys.byteorder != "little"
+# Columns kept per document for filtering (see ``matches_filters``).
+_ROW_COLUMNS = ("owner_user_id", "kind", "source", "source_ref", "content_hash")
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Lower-cased word tokens, comparable to the ``simple`` text search config."""
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+def _field(item: Any, name: str) -> Any:
+    if isinstance(item, Mapping):
+        return item.get(name)
+    if name == "metadata":
+        return getattr(item, "metadata_", None)
+    return getattr(item, name, None)
+
+
+def _as_uuid(value: UUID | str) -> UUID:
+    return value if isinstance(value, UUID) else UUID(str(value))
+
+
+def _signature(item: Any) -> bytes:
+    """Digest of the indexed text: the content hash plus title and summary."""
+    digest = hashlib.blake2b(digest_size=8)
+    content_hash = _field(item, "content_hash") or hashlib.sha256(
+        (_field(item, "content_text") or "").encode("utf-8")
+    ).hexdigest()
+    for part in (content_hash, _field(item, "title") or "", _field(item, "summary") or ""):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.digest()
+
+
+class _Postings:
+    __slots__ = ("docs", "tfs", "max_tf")
+
+    def __init__(self) -> None:
+        self.docs = array("I")
+        self.tfs = array("I")
+        self.max_tf = 0
+
+
+class Bm25Index:
+    """
+    In-memory BM25 inverted index over KB items.
+
+    Postings are parallel ``array('I')`` columns of ascending document numbers and (field-weighted)
+    term frequencies. Queries run document-at-a-time with MaxScore pruning: query terms are ordered
+    by their score upper bound, and once the top-k is full, terms whose combined bound cannot beat
+    the k-th score stop producing candidates and are only probed (by binary search) for documents
+    that still can.
+
+    Updates are incremental: ``upsert`` re-indexes an item only when its content hash, title or
+    summary changed (other columns used by filters are updated in place). Replaced and removed
+    documents are tombstoned and dropped by ``compact``; until then they still count towards
+    document frequencies. ``save`` / ``load`` write a snapshot whose postings are raw uint32
+    arrays, so a restart loads them with ``frombytes`` instead of re-tokenizing every item.
+    """
+
+    def __init__(
+        self,
+        k1: float = 1.2,
+        b: float = 0.75,
+        field_weights: Iterable[tuple[str, int]] = (("title", 3), ("summary", 2), ("content_text", 1)),
+    ) -> None:
+        self.k1 = k1
+        self.b = b
+        self.field_weights = tuple((name, int(weight)) for name, weight in field_weights)
+        self._postings: dict[str, _Postings] = {}
+        self._doc_items: list[UUID] = []
+        self._doc_len = array("I")
+        self._signatures: list[bytes] = []
+        self._rows: list[dict | None] = []
+        self._by_item: dict[UUID, int] = {}
+        self._live_len = 0
+        self._min_len = 0
+        # Guards the swap in ``compact`` against a search capturing the structures in a thread.
+        self._swap_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._by_item)
+
+    @property
+    def dead_ratio(self) -> float:
+        return 1 - len(self._by_item) / len(self._doc_items) if self._doc_items else 0.0
+
+    def upsert(self, item: Any) -> bool:
+        """Index a ``KbItem`` (or item dict); returns whether its text was (re-)indexed."""
+        item_id = _as_uuid(_field(item, "id"))
+        row = {name: _field(item, name) for name in _ROW_COLUMNS}
+        row["id"] = item_id
+        row["metadata"] = dict(_field(item, "metadata") or {})
+        signature = _signature(item)
+        doc = self._by_item.get(item_id)
+        if doc is not None and self._signatures[doc] == signature:
+            self._rows[doc] = row
+            return False
+        if doc is not None:
+            self._remove_doc(doc)
+
+        counts: Counter[str] = Counter()
+        for name, weight in self.field_weights:
+            for token in tokenize(_field(item, name)):
+                counts[token] += weight
+        self._add_doc(item_id, signature, row, counts)
+        return True
+
+    def remove(self, item_id: UUID | str) -> bool:
+        doc = self._by_item.get(_as_uuid(item_id))
+        if doc is None:
+            return False
+        self._remove_doc(doc)
+        return True
+
+    def retain(self, item_ids: Iterable[UUID]) -> int:
+        """Remove every indexed item not in ``item_ids`` (e.g. rows deleted from kb_items)."""
+        keep = {_as_uuid(i) for i in item_ids}
+        gone = [item_id for item_id in self._by_item if item_id not in keep]
+        for item_id in gone:
+            self.remove(item_id)
+        return len(gone)
+
+    def search(
+        self,
+        query_text: str,
+        top_k: int,
+        filters: Mapping[str, Any] | None = None,
+        min_score: float | None = None,
+    ) -> list[tuple[UUID, float]]:
+        """
+        Top ``top_k`` ``(item_id, score)`` by BM25, best first.
+
+        Safe to run in a worker thread while the event loop updates the index: the search reads the
+        structures it captured on entry, and ``compact`` replaces them instead of renumbering in place.
+        """
+        with self._swap_lock:
+            all_postings, doc_items, doc_len, rows = self._postings, self._doc_items, self._doc_len, self._rows
+            live, live_len, min_len = len(self._by_item), self._live_len, self._min_len
+        terms = [t for t in dict.fromkeys(tokenize(query_text)) if t in all_postings]
+        if not terms or top_k <= 0 or not live:
+            return []
+        k1, b = self.k1, self.b
+        n_docs = len(doc_items)
+        avgdl = live_len / live or 1.0
+        lists = []
+        for term in terms:
+            postings = all_postings[term]
+            df = len(postings.docs)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            # BM25 grows with tf and shrinks with document length, so max_tf at the shortest
+            # document bounds every score this term can contribute.
+            norm = k1 * (1 - b + b * min_len / avgdl)
+            bound = idf * postings.max_tf * (k1 + 1) / (postings.max_tf + norm)
+            lists.append((bound, idf, postings.docs, postings.tfs))
+        lists.sort(key=lambda entry: entry[0])
+        bounds = [entry[0] for entry in lists]
+        idfs = [entry[1] for entry in lists]
+        docs = [entry[2] for entry in lists]
+        tfs = [entry[3] for entry in lists]
+        prefix = list(_running_sum(bounds))
+        pos = [0] * len(lists)
+        ends = [len(d) for d in docs]
+
+        heap: list[tuple[float, int]] = []
+        floor = min_score if min_score is not None else 0.0
+
+        def admissible(score: float) -> bool:
+            if len(heap) < top_k:
+                return score >= floor and score > 0
+            return score > heap[0][0]
+
+        first_essential = 0
+        while True:
+            candidate = -1
+            for i in range(first_essential, len(lists)):
+                if pos[i] < ends[i]:
+                    d = docs[i][pos[i]]
+                    if candidate < 0 or d < candidate:
+                        candidate = d
+            if candidate < 0:
+                break
+            norm = k1 * (1 - b + b * doc_len[candidate] / avgdl)
+            score = 0.0
+            for i in range(first_essential, len(lists)):
+                p = pos[i]
+                if p < ends[i] and docs[i][p] == candidate:
+                    tf = tfs[i][p]
+                    score += idfs[i] * tf * (k1 + 1) / (tf + norm)
+                    pos[i] = p + 1
+            row = rows[candidate]
+            if row is None or (filters and not matches_filters(filters, row)):
+                continue
+            pruned = False
+            for i in range(first_essential - 1, -1, -1):
+                if not admissible(score + prefix[i]):
+                    pruned = True
+                    break
+                p = bisect_left(docs[i], candidate, pos[i])
+                pos[i] = p
+                if p < ends[i] and docs[i][p] == candidate:
+                    tf = tfs[i][p]
+                    score += idfs[i] * tf * (k1 + 1) / (tf + norm)
+            if pruned or not admissible(score):
+                continue
+            heapq.heappush(heap, (score, candidate))
+            if len(heap) > top_k:
+                heapq.heappop(heap)
+            if len(heap) == top_k:
+                while first_essential < len(lists) and not admissible(prefix[first_essential]):
+                    first_essential += 1
+        ranked = sorted(heap, key=lambda entry: (-entry[0], entry[1]))
+        return [(doc_items[doc], score) for score, doc in ranked]
+
+    def compact(self) -> None:
+        """Drop tombstoned documents and renumber the rest."""
+        if len(self._by_item) == len(self._doc_items):
+            return
+        remap = array("i", [-1]) * len(self._doc_items)
+        doc_items: list[UUID] = []
+        doc_len = array("I")
+        signatures: list[bytes] = []
+        rows: list[dict | None] = []
+        for doc, row in enumerate(self._rows):
+            if row is None:
+                continue
+            remap[doc] = len(doc_items)
+            doc_items.append(self._doc_items[doc])
+            doc_len.append(self._doc_len[doc])
+            signatures.append(self._signatures[doc])
+            rows.append(row)
+        postings_by_term: dict[str, _Postings] = {}
+        for term, postings in self._postings.items():
+            kept = _Postings()
+            for doc, tf in zip(postings.docs, postings.tfs):
+                new_doc = remap[doc]
+                if new_doc >= 0:
+                    kept.docs.append(new_doc)
+                    kept.tfs.append(tf)
+                    kept.max_tf = max(kept.max_tf, tf)
+            if kept.docs:
+                postings_by_term[term] = kept
+        by_item = {item_id: doc for doc, item_id in enumerate(doc_items)}
+        with self._swap_lock:
+            self._postings = postings_by_term
+            self._doc_items, self._doc_len, self._signatures, self._rows = doc_items, doc_len, signatures, rows
+            self._by_item = by_item
+            self._min_len = min(doc_len) if doc_len else 0
+
+    def maybe_compact(self, max_dead_ratio: float = 0.2) -> bool:
+        if self.dead_ratio <= max_dead_ratio:
+            return False
+        self.compact()
+        return True
+
+    def save(self, path: str, checkpoint: Mapping[str, Any] | None = None) -> None:
+        """Compact and write a snapshot to ``path`` atomically; ``checkpoint`` is stored as-is."""
+        self.compact()
+        buf = bytearray(_MAGIC)
+        header = {"k1": self.k1, "b": self.b, "field_weights": self.field_weights, "checkpoint": checkpoint}
+        _put_bytes(buf, json.dumps(header).encode("utf-8"))
+        _put_varint(buf, len(self._doc_items))
+        for doc, item_id in enumerate(self._doc_items):
+            row = self._rows[doc]
+            buf += item_id.bytes
+            buf += self._signatures[doc]
+            _put_varint(buf, self._doc_len[doc])
+            stored = {name: row[name] for name in _ROW_COLUMNS}
+            stored["owner_user_id"] = str(stored["owner_user_id"]) if stored["owner_user_id"] is not None else None
+            stored["metadata"] = row["metadata"]
+            _put_bytes(buf, json.dumps(stored, separators=(",", ":")).encode("utf-8"))
+        _put_varint(buf, len(self._postings))
+        for term, postings in self._postings.items():
+            _put_bytes(buf, term.encode("utf-8"))
+            _put_bytes(buf, _array_bytes(postings.docs))
+            _put_bytes(buf, _array_bytes(postings.tfs))
+        # A unique name, so concurrent saves to the same path never write one temp file.
+        tmp_path = f"{path}.{uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as fh:
+            fh.write(buf)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> tuple["Bm25Index", dict | None]:
+        """Read a snapshot written by ``save``; returns the index and the stored checkpoint."""
+        with open(path, "rb") as fh:
+            data = memoryview(fh.read())
+        if bytes(data[: len(_MAGIC)]) != _MAGIC:
+            raise ValueError(f"not a BM25 index snapshot: {path}")
+        offset = len(_MAGIC)
+        raw, offset = _get_bytes(data, offset)
+        header = json.loads(bytes(raw))
+        index = cls(k1=header["k1"], b=header["b"], field_weights=[tuple(f) for f in header["field_weights"]])
+        count, offset = _get_varint(data, offset)
+        for doc in range(count):
+            item_id = UUID(bytes=bytes(data[offset : offset + 16]))
+            signature = bytes(data[offset + 16 : offset + 24])
+            length, offset = _get_varint(data, offset + 24)
+            raw, offset = _get_bytes(data, offset)
+            row = json.loads(bytes(raw))
+            if row["owner_user_id"] is not None:
+                row["owner_user_id"] = UUID(row["owner_user_id"])
+            row["id"] = item_id
+            index._doc_items.append(item_id)
+            index._doc_len.append(length)
+            index._signatures.append(signature)
+            index._rows.append(row)
+            index._by_item[item_id] = doc
+            index._live_len += length
+        index._min_len = min(index._doc_len) if index._doc_len else 0
+        terms, offset = _get_varint(data, offset)
+        for _ in range(terms):
+            raw, offset = _get_bytes(data, offset)
+            postings = _Postings()
+            docs, offset = _get_bytes(data, offset)
+            tfs, offset = _get_bytes(data, offset)
+            postings.docs = _bytes_array(docs)
+            postings.tfs = _bytes_array(tfs)
+            postings.max_tf = max(postings.tfs)
+            index._postings[bytes(raw).decode("utf-8")] = postings
+        return index, header.get("checkpoint")
+
+    def _add_doc(self, item_id: UUID, signature: bytes, row: dict, counts: Mapping[str, int]) -> None:
+        doc = len(self._doc_items)
+        length = sum(counts.values())
+        self._doc_items.append(item_id)
+        self._doc_len.append(length)
+        self._signatures.append(signature)
+        self._rows.append(row)
+        self._by_item[item_id] = doc
+        for term, tf in counts.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = _Postings()
+            postings.docs.append(doc)
+            postings.tfs.append(tf)
+            postings.max_tf = max(postings.max_tf, tf)
+        self._live_len += length
+        self._min_len = length if len(self._by_item) == 1 else min(self._min_len, length)
+
+    def _remove_doc(self, doc: int) -> None:
+        del self._by_item[self._doc_items[doc]]
+        self._rows[doc] = None
+        self._live_len -= self._doc_len[doc]
+
+
+def _running_sum(values: Iterable[float]) -> Iterable[float]:
+    total = 0.0
+    for value in values:
+        total += value
+        yield total
+
+
+def _array_bytes(values: array) -> bytes:
+    if _SWAP:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _bytes_array(raw: memoryview) -> array:
+    values = array("I")
+    values.frombytes(raw)
+    if _SWAP:
+        values.byteswap()
+    return values
+
+
+def _put_varint(buf: bytearray, value: int) -> None:
+    while value >= 0x80:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def _get_varint(data: memoryview, offset: int) -> tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def _put_bytes(buf: bytearray, raw: bytes) -> None:
+    _put_varint(buf, len(raw))
+    buf += raw
+
+
+def _get_bytes(data: memoryview, offset: int) -> tuple[memoryview, int]:
+    size, offset = _get_varint(data, offset)
+    return data[offset : offset + size], offset + size
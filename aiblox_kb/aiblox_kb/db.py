@@ -1,12 +1,132 @@
 from __future__ import annotations
 
+import asyncio
+import time
+from dataclasses import dataclass
 from typing import Callable
 
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 
-def make_engine(db_dsn: str, echo: bool = False) -> AsyncEngine:
-    return create_async_engine(db_dsn, future=True, echo=echo)
+@dataclass(frozen=True)
+class PoolStats:
+    """Point-in-time view of an engine's connection pool."""
+
+    size: int
+    max_overflow: int
+    checked_out: int
+    overflow: int
+    checkouts: int
+    timeouts: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+
+    @property
+    def utilization(self) -> float:
+        capacity = self.size + max(self.max_overflow, 0)
+        return self.checked_out / capacity if capacity else 0.0
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait to check out a connection."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        # Called with each checkout's wait in seconds; set by the application to feed metrics.
+        self.on_checkout_wait: Callable[[float], None] | None = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except sa_exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+            if self.on_checkout_wait is not None:
+                self.on_checkout_wait(waited)
+
+
+def make_engine(
+    db_dsn: str,
+    echo: bool = False,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_timeout: float = 30.0,
+    pool_recycle: int = -1,
+    pool_pre_ping: bool = False,
+    statement_cache_size: int | None = None,
+    prepared_statement_cache_size: int | None = None,
+) -> AsyncEngine:
+    """
+    Create the async engine with an instrumented queue pool.
+
+    For asyncpg, every statement runs as a server-side prepared statement; SQLAlchemy keeps up to
+    ``prepared_statement_cache_size`` of them per connection keyed by SQL text, so the fixed search
+    shapes are parsed and planned once per connection. ``statement_cache_size`` sizes asyncpg's own
+    cache. Set both to 0 behind a transaction-pooling proxy such as pgbouncer.
+    """
+    url = make_url(db_dsn)
+    connect_args: dict = {}
+    if url.get_driver_name() == "asyncpg":
+        if statement_cache_size is not None:
+            connect_args["statement_cache_size"] = statement_cache_size
+        if prepared_statement_cache_size is not None:
+            url = url.update_query_dict({"prepared_statement_cache_size": str(prepared_statement_cache_size)})
+    return create_async_engine(
+        url,
+        future=True,
+        echo=echo,
+        poolclass=InstrumentedAsyncPool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_recycle=pool_recycle,
+        pool_pre_ping=pool_pre_ping,
+        connect_args=connect_args,
+    )
+
+
+async def prewarm_pool(engine: AsyncEngine, connections: int | None = None) -> int:
+    """Open ``connections`` (default: the pool size) connections concurrently and return them to the pool."""
+    count = engine.pool.size() if connections is None else connections
+    if count <= 0:
+        return 0
+    conns = await asyncio.gather(*(engine.connect() for _ in range(count)), return_exceptions=True)
+    opened = [conn for conn in conns if not isinstance(conn, BaseException)]
+    for conn in opened:
+        await conn.close()
+    failures = [conn for conn in conns if isinstance(conn, BaseException)]
+    if failures:
+        raise failures[0]
+    return len(opened)
+
+
+def pool_stats(engine: AsyncEngine) -> PoolStats | None:
+    pool = engine.pool
+    if not isinstance(pool, InstrumentedAsyncPool):
+        return None
+    return PoolStats(
+        size=pool.size(),
+        max_overflow=pool._max_overflow,
+        checked_out=pool.checkedout(),
+        overflow=max(pool.overflow(), 0),
+        checkouts=pool.checkouts,
+        timeouts=pool.timeouts,
+        wait_seconds_total=pool.wait_seconds_total,
+        wait_seconds_max=pool.wait_seconds_max,
+    )
 
 
 def make_sessionmaker(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
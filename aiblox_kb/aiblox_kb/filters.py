@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Mapping
+from uuid import UUID
+
+from sqlalchemy import Numeric, case, cast, func, literal, or_
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql.elements import ColumnElement
+
+from aiblox_kb.models import KbItem
+
+_RANGE_OPS = {
+    "gt": lambda col, v: col > v,
+    "gte": lambda col, v: col >= v,
+    "lt": lambda col, v: col < v,
+    "lte": lambda col, v: col <= v,
+    "ne": lambda col, v: col != v,
+}
+_OPS = set(_RANGE_OPS) | {"eq", "in"}
+# Columns that may be filtered directly; everything else is a metadata key.
+FILTER_COLUMNS = ("id", "owner_user_id", "kind", "source", "source_ref", "content_hash", "created_at", "updated_at")
+
+
+def compile_filters(filters: Mapping[str, Any] | None) -> list[ColumnElement]:
+    """
+    Compile ``prefs.filters`` into SQL predicates on ``kb_items``.
+
+    - ``{"kind": "doc"}``: equality; a list means IN; a dict of ``eq``/``in``/``gt``/``gte``/
+      ``lt``/``lte``/``ne`` applies each operator (ranges).
+    - ``{"metadata": {...}}``: JSONB containment (``metadata @> ...``).
+    - ``{"lang": "en"}`` or ``{"metadata.lang": "en"}``: any other key is a metadata key. Equality
+      and IN compile to ``@>`` so the ``jsonb_path_ops`` GIN index serves them; range operators
+      compare the extracted value (numeric for numbers) and are not index-driven.
+
+    Unknown operators raise ``ValueError`` rather than being dropped.
+    """
+    clauses: list[ColumnElement] = []
+    for key, value in (filters or {}).items():
+        if key == "metadata":
+            if not isinstance(value, Mapping):
+                raise ValueError("metadata filter must be an object")
+            clauses.append(KbItem.metadata_.op("@>")(_jsonb(dict(value))))
+        elif key in FILTER_COLUMNS:
+            clauses.extend(_column_clauses(getattr(KbItem, key), value))
+        else:
+            clauses.extend(_metadata_clauses(key.removeprefix("metadata."), value))
+    return clauses
+
+
+def matches_filters(filters: Mapping[str, Any] | None, row: Mapping[str, Any]) -> bool:
+    """
+    Evaluate ``prefs.filters`` in Python against one item, with the semantics of
+    ``compile_filters``; for backends that do not query ``kb_items`` directly.
+
+    ``row`` maps column names to values plus ``"metadata"`` to the item's metadata dict. Filtering
+    on a column the row does not carry raises ``ValueError``, as do unknown operators.
+    """
+    metadata = row.get("metadata") or {}
+    for key, value in (filters or {}).items():
+        if key == "metadata":
+            if not isinstance(value, Mapping):
+                raise ValueError("metadata filter must be an object")
+            if not _json_contains(metadata, dict(value)):
+                return False
+        elif key in FILTER_COLUMNS:
+            if key not in row:
+                raise ValueError(f"filter on {key} is not supported by this backend")
+            if not _column_matches(row[key], value):
+                return False
+        elif not _metadata_matches(metadata, key.removeprefix("metadata."), value):
+            return False
+    return True
+
+
+def _column_matches(actual: Any, value: Any) -> bool:
+    normalize = str if isinstance(actual, UUID) else (lambda v: v)
+    actual = normalize(actual)
+    for op, operand in _operators(value).items():
+        if op == "eq":
+            ok = actual == normalize(operand)
+        elif op == "in":
+            ok = actual in {normalize(option) for option in operand}
+        else:
+            ok = actual is not None and _RANGE_OPS[op](actual, normalize(operand))
+        if not ok:
+            return False
+    return True
+
+
+def _metadata_matches(metadata: Mapping[str, Any], key: str, value: Any) -> bool:
+    for op, operand in _operators(value).items():
+        if op == "eq":
+            ok = _json_contains(metadata, {key: operand})
+        elif op == "in":
+            ok = any(_json_contains(metadata, {key: option}) for option in operand)
+        else:
+            actual = metadata.get(key)
+            if isinstance(operand, (int, float)) and not isinstance(operand, bool):
+                # Like the SQL form: only numeric values take part in numeric comparisons.
+                ok = isinstance(actual, (int, float)) and not isinstance(actual, bool) and _RANGE_OPS[op](actual, operand)
+            else:
+                ok = actual is not None and _RANGE_OPS[op](_json_text(actual), operand)
+        if not ok:
+            return False
+    return True
+
+
+def _json_contains(doc: Any, query: Any) -> bool:
+    """PostgreSQL ``jsonb @>`` containment."""
+    if isinstance(query, Mapping):
+        return isinstance(doc, Mapping) and all(k in doc and _json_contains(doc[k], v) for k, v in query.items())
+    if isinstance(query, list):
+        if not isinstance(doc, list):
+            return False
+        return all(any(_json_contains(d, q) for d in doc) for q in query)
+    return doc == query and isinstance(doc, bool) == isinstance(query, bool)
+
+
+def _json_text(value: Any) -> str:
+    """``->>`` rendering of a JSON value."""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, separators=(", ", ": ")) if isinstance(value, (dict, list)) else json.dumps(value)
+
+
+def _operators(value: Any) -> dict[str, Any]:
+    if isinstance(value, Mapping):
+        unknown = set(value) - _OPS
+        if unknown:
+            raise ValueError(f"unsupported filter operators: {sorted(unknown)}")
+        return dict(value)
+    if isinstance(value, (list, tuple, set)):
+        return {"in": list(value)}
+    return {"eq": value}
+
+
+def _column_clauses(col, value: Any) -> list[ColumnElement]:
+    clauses: list[ColumnElement] = []
+    for op, operand in _operators(value).items():
+        if op == "eq":
+            clauses.append(col == operand)
+        elif op == "in":
+            clauses.append(col.in_(list(operand)))
+        else:
+            clauses.append(_RANGE_OPS[op](col, operand))
+    return clauses
+
+
+def _metadata_clauses(key: str, value: Any) -> list[ColumnElement]:
+    clauses: list[ColumnElement] = []
+    for op, operand in _operators(value).items():
+        if op == "eq":
+            clauses.append(KbItem.metadata_.op("@>")(_jsonb({key: operand})))
+        elif op == "in":
+            options = [KbItem.metadata_.op("@>")(_jsonb({key: option})) for option in operand]
+            clauses.append(or_(*options) if options else literal(False))
+        else:
+            value_json = KbItem.metadata_.op("->")(key)
+            if isinstance(operand, (int, float)) and not isinstance(operand, bool):
+                # Only cast numbers, so non-numeric values of the same key cannot fail the query.
+                extracted = case(
+                    (func.jsonb_typeof(value_json) == "number", cast(KbItem.metadata_.op("->>")(key), Numeric)),
+                    else_=None,
+                )
+            else:
+                extracted = KbItem.metadata_.op("->>")(key)
+            clauses.append(_RANGE_OPS[op](extracted, operand))
+    return clauses
+
+
+def _jsonb(value: dict) -> ColumnElement:
+    return literal(value, JSONB)
@@ -1,15 +1,33 @@
 from __future__ import annotations
 
 import os
+import re
 from datetime import datetime
 from typing import Any
 from uuid import UUID
 
-from sqlalchemy import JSON, DateTime, ForeignKey, Index, Text, func
-from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR, UUID as PGUUID
+from sqlalchemy import JSON, BigInteger, Computed, DateTime, Float, ForeignKey, Index, Integer, Text, func
+from sqlalchemy.dialects.postgresql import ARRAY, BYTEA, JSONB, TSVECTOR, UUID as PGUUID
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 SCHEMA = os.getenv("AIBLOX_DB_SCHEMA", "kb")
+FTS_CONFIG = os.getenv("AIBLOX_FTS_CONFIG", "simple")
+
+
+def tsv_expression(config: str) -> str:
+    """Weighted tsv of an item (title A, summary B, content C) under text search ``config``."""
+    # The config is inlined into DDL, so only accept a plain (optionally schema-qualified) name.
+    if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)?", config):
+        raise ValueError(f"invalid text search config: {config!r}")
+    return (
+        f"setweight(to_tsvector('{config}'::regconfig, coalesce(title, '')), 'A') || "
+        f"setweight(to_tsvector('{config}'::regconfig, coalesce(summary, '')), 'B') || "
+        f"setweight(to_tsvector('{config}'::regconfig, coalesce(content_text, '')), 'C')"
+    )
+
+
+# Same generated column as migration 20261018_000500 creates.
+TSV_EXPRESSION = tsv_expression(FTS_CONFIG)
 
 
 class Base(DeclarativeBase):
@@ -21,6 +39,14 @@ class KbItem(Base):
     __table_args__ = (
         Index("ix_kb_items_tsv", "tsv", postgresql_using="gin"),
         Index("ix_kb_items_owner_user_id", "owner_user_id"),
+        Index("ix_kb_items_updated_at_id", "updated_at", "id"),
+        Index("uq_kb_items_owner_source_ref", "owner_user_id", "source", "source_ref", unique=True),
+        Index(
+            "ix_kb_items_metadata_path_ops",
+            "metadata",
+            postgresql_using="gin",
+            postgresql_ops={"metadata": "jsonb_path_ops"},
+        ),
         {"schema": SCHEMA},
     )
 
@@ -33,9 +59,13 @@ class KbItem(Base):
     title: Mapped[str | None] = mapped_column(Text, nullable=True)
     summary: Mapped[str | None] = mapped_column(Text, nullable=True)
     content_text: Mapped[str] = mapped_column(Text, nullable=False)
+    # Generated by migration 20261018_000800; lets large items be read in slices.
+    content_length: Mapped[int | None] = mapped_column(
+        Integer, Computed("char_length(content_text)", persisted=True)
+    )
 
     content_hash: Mapped[str | None] = mapped_column(Text, nullable=True)
-    tsv: Mapped[Any | None] = mapped_column(TSVECTOR, nullable=True)
+    tsv: Mapped[Any | None] = mapped_column(TSVECTOR, Computed(TSV_EXPRESSION, persisted=True))
 
     metadata_: Mapped[dict] = mapped_column("metadata", JSONB, nullable=False, server_default="{}")
 
@@ -61,6 +91,8 @@ class KbChunkCache(Base):
             "chunk_index",
             unique=True,
         ),
+        Index("ix_kb_chunk_cache_owner_last_accessed", "owner_user_id", "last_accessed_at"),
+        Index("ix_kb_chunk_cache_last_accessed", "last_accessed_at"),
         {"schema": SCHEMA},
     )
 
@@ -79,6 +111,163 @@ class KbChunkCache(Base):
     start_idx: Mapped[int | None] = mapped_column(nullable=True)
     end_idx: Mapped[int | None] = mapped_column(nullable=True)
     token_count: Mapped[int | None] = mapped_column(nullable=True)
+    embedding: Mapped[list[float] | None] = mapped_column(ARRAY(Float), nullable=True)
+    byte_size: Mapped[int] = mapped_column(nullable=False, server_default="0")
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    last_accessed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class KbItemEmbedding(Base):
+    __tablename__ = "kb_item_embeddings"
+    __table_args__ = (
+        Index("uq_kb_item_embeddings_item_model", "item_id", "embed_model_id", unique=True),
+        Index("ix_kb_item_embeddings_owner_user_id", "owner_user_id"),
+        {"schema": SCHEMA},
+    )
+
+    id: Mapped[UUID] = mapped_column(PGUUID(as_uuid=True), primary_key=True)
+    item_id: Mapped[UUID] = mapped_column(
+        PGUUID(as_uuid=True),
+        ForeignKey(f"{SCHEMA}.kb_items.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    owner_user_id: Mapped[UUID] = mapped_column(PGUUID(as_uuid=True), nullable=False)
+    content_hash: Mapped[str] = mapped_column(Text, nullable=False)
+    embed_model_id: Mapped[str] = mapped_column(Text, nullable=False)
+    embedding: Mapped[list[float]] = mapped_column(ARRAY(Float), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+
+class KbIngestCheckpoint(Base):
+    __tablename__ = "kb_ingest_checkpoints"
+    __table_args__ = (
+        Index("uq_kb_ingest_checkpoints_worker_name", "worker_name", unique=True),
+        {"schema": SCHEMA},
+    )
+
+    id: Mapped[UUID] = mapped_column(PGUUID(as_uuid=True), primary_key=True)
+    worker_name: Mapped[str] = mapped_column(Text, nullable=False)
+    last_updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_item_id: Mapped[UUID | None] = mapped_column(PGUUID(as_uuid=True), nullable=True)
+    processed_count: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+
+class KbChunkStore(Base):
+    __tablename__ = "kb_chunk_store"
+    __table_args__ = (
+        Index(
+            "uq_kb_chunk_store_entry",
+            "content_hash",
+            "chunker_id",
+            "embed_model_id",
+            "chunk_index",
+            unique=True,
+        ),
+        {"schema": SCHEMA},
+    )
+
+    id: Mapped[UUID] = mapped_column(PGUUID(as_uuid=True), primary_key=True)
+    content_hash: Mapped[str] = mapped_column(Text, nullable=False)
+    chunker_id: Mapped[str] = mapped_column(Text, nullable=False)
+    embed_model_id: Mapped[str] = mapped_column(Text, nullable=False)
+    chunk_index: Mapped[int] = mapped_column(nullable=False)
+    chunk_text: Mapped[str] = mapped_column(Text, nullable=False)
+    start_idx: Mapped[int | None] = mapped_column(nullable=True)
+    end_idx: Mapped[int | None] = mapped_column(nullable=True)
+    token_count: Mapped[int | None] = mapped_column(nullable=True)
+    embedding: Mapped[list[float] | None] = mapped_column(ARRAY(Float), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class KbItemChunkRef(Base):
+    __tablename__ = "kb_item_chunk_refs"
+    __table_args__ = (
+        Index(
+            "uq_kb_item_chunk_refs_entry",
+            "item_id",
+            "content_hash",
+            "chunker_id",
+            "embed_model_id",
+            unique=True,
+        ),
+        Index("ix_kb_item_chunk_refs_content", "content_hash", "chunker_id", "embed_model_id"),
+        Index("ix_kb_item_chunk_refs_owner_user_id", "owner_user_id"),
+        Index("ix_kb_item_chunk_refs_owner_last_accessed", "owner_user_id", "last_accessed_at"),
+        Index("ix_kb_item_chunk_refs_last_accessed", "last_accessed_at"),
+        {"schema": SCHEMA},
+    )
+
+    id: Mapped[UUID] = mapped_column(PGUUID(as_uuid=True), primary_key=True)
+    item_id: Mapped[UUID] = mapped_column(
+        PGUUID(as_uuid=True),
+        ForeignKey(f"{SCHEMA}.kb_items.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    owner_user_id: Mapped[UUID] = mapped_column(PGUUID(as_uuid=True), nullable=False)
+    content_hash: Mapped[str] = mapped_column(Text, nullable=False)
+    chunker_id: Mapped[str] = mapped_column(Text, nullable=False)
+    embed_model_id: Mapped[str] = mapped_column(Text, nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
+    last_accessed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class KbChunkCachePacked(Base):
+    __tablename__ = "kb_chunk_cache_packed"
+    __table_args__ = (
+        Index(
+            "uq_kb_chunk_cache_packed_entry",
+            "item_id",
+            "content_hash",
+            "chunker_id",
+            "embed_model_id",
+            unique=True,
+        ),
+        Index("ix_kb_chunk_cache_packed_owner_user_id", "owner_user_id"),
+        Index("ix_kb_chunk_cache_packed_owner_last_accessed", "owner_user_id", "last_accessed_at"),
+        Index("ix_kb_chunk_cache_packed_last_accessed", "last_accessed_at"),
+        {"schema": SCHEMA},
+    )
+
+    id: Mapped[UUID] = mapped_column(PGUUID(as_uuid=True), primary_key=True)
+    item_id: Mapped[UUID] = mapped_column(
+        PGUUID(as_uuid=True),
+        ForeignKey(f"{SCHEMA}.kb_items.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    owner_user_id: Mapped[UUID] = mapped_column(PGUUID(as_uuid=True), nullable=False)
+    content_hash: Mapped[str] = mapped_column(Text, nullable=False)
+    chunker_id: Mapped[str] = mapped_column(Text, nullable=False)
+    embed_model_id: Mapped[str] = mapped_column(Text, nullable=False)
+    chunk_count: Mapped[int] = mapped_column(nullable=False)
+    chunk_indexes: Mapped[list[int]] = mapped_column(ARRAY(Integer), nullable=False)
+    start_idxs: Mapped[list[int | None]] = mapped_column(ARRAY(Integer), nullable=False)
+    end_idxs: Mapped[list[int | None]] = mapped_column(ARRAY(Integer), nullable=False)
+    token_counts: Mapped[list[int | None]] = mapped_column(ARRAY(Integer), nullable=False)
+    chunk_texts: Mapped[list[str]] = mapped_column(ARRAY(Text), nullable=False)
+    embedding_dim: Mapped[int] = mapped_column(nullable=False, server_default="0")
+    embeddings: Mapped[bytes | None] = mapped_column(BYTEA, nullable=True)
+    byte_size: Mapped[int] = mapped_column(nullable=False, server_default="0")
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    last_accessed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
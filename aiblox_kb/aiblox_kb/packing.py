@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import sys
+from array import array
+from typing import Sequence
+
+# Vectors are stored as little-endian float32 regardless of host byte order.
+_SWAP = sys.byteorder != "little"
+
+
+def pack_vectors(vectors: Sequence[Sequence[float] | None]) -> tuple[int, bytes | None]:
+    """Pack equal-length vectors into one float32 blob; returns (dim, blob)."""
+    present = [v for v in vectors if v is not None]
+    if not present or len(present) != len(vectors):
+        return 0, None
+    dim = len(present[0])
+    buf = array("f")
+    for vec in present:
+        if len(vec) != dim:
+            raise ValueError("all vectors must have the same dimension")
+        buf.extend(float(x) for x in vec)
+    if _SWAP:
+        buf.byteswap()
+    return dim, buf.tobytes()
+
+
+def unpack_vectors(blob: bytes | None, dim: int, count: int) -> list[list[float] | None]:
+    if not blob or not dim:
+        return [None] * count
+    buf = array("f")
+    buf.frombytes(blob)
+    if _SWAP:
+        buf.byteswap()
+    if len(buf) != dim * count:
+        raise ValueError("packed vector blob does not match dim * count")
+    return [buf[i * dim : (i + 1) * dim].tolist() for i in range(count)]
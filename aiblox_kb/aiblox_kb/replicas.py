@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import time
+from typing import Literal, Sequence
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from aiblox_kb.db import make_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+ReplicaStrategy = Literal["round_robin", "least_busy"]
+
+
+class ReplicaRouter:
+    """
+    Session factory that sends reads to healthy read replicas.
+
+    Pass it as ``read_session_factory`` to repos: each call returns a session bound to one replica,
+    chosen round-robin or by fewest checked-out connections (``least_busy``). A replica whose
+    connection fails is ejected for ``eject_seconds``; ``check_health`` probes ejected replicas and
+    re-admits them early once they answer. With no healthy replica, reads go to the primary.
+    Writes never go through the router; repos keep using their primary ``session_factory``.
+    """
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: Sequence[AsyncEngine],
+        strategy: ReplicaStrategy = "round_robin",
+        eject_seconds: float = 30.0,
+    ) -> None:
+        if strategy not in ("round_robin", "least_busy"):
+            raise ValueError(f"unsupported replica strategy: {strategy}")
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.strategy = strategy
+        self.eject_seconds = eject_seconds
+        self._sessionmakers: dict[AsyncEngine, async_sessionmaker[AsyncSession]] = {
+            engine: make_sessionmaker(engine) for engine in [primary, *self.replicas]
+        }
+        self._ejected_until: dict[AsyncEngine, float] = {}
+        self._rr = itertools.count()
+        for engine in self.replicas:
+            event.listen(engine.sync_engine, "handle_error", self._error_listener(engine))
+
+    def __call__(self) -> AsyncSession:
+        return self._sessionmakers[self.pick()]()
+
+    def healthy_replicas(self) -> list[AsyncEngine]:
+        now = time.monotonic()
+        return [engine for engine in self.replicas if self._ejected_until.get(engine, 0.0) <= now]
+
+    def pick(self) -> AsyncEngine:
+        healthy = self.healthy_replicas()
+        if not healthy:
+            return self.primary
+        if self.strategy == "least_busy":
+            return min(healthy, key=lambda engine: engine.pool.checkedout())
+        return healthy[next(self._rr) % len(healthy)]
+
+    def mark_failed(self, engine: AsyncEngine) -> None:
+        if engine in self._sessionmakers and engine is not self.primary:
+            if self._ejected_until.get(engine, 0.0) <= time.monotonic():
+                logger.warning("ejecting read replica %s", engine.url.render_as_string(hide_password=True))
+            self._ejected_until[engine] = time.monotonic() + self.eject_seconds
+
+    def mark_healthy(self, engine: AsyncEngine) -> None:
+        self._ejected_until.pop(engine, None)
+
+    async def check_health(self, timeout: float = 2.0) -> dict[AsyncEngine, bool]:
+        """Probe ejected replicas with ``SELECT 1`` and re-admit those that answer."""
+        results: dict[AsyncEngine, bool] = {}
+        for engine in list(self._ejected_until):
+            try:
+                await asyncio.wait_for(_ping(engine), timeout=timeout)
+            except Exception:  # noqa: BLE001
+                results[engine] = False
+                self.mark_failed(engine)
+            else:
+                results[engine] = True
+                self.mark_healthy(engine)
+        return results
+
+    async def run_health_checks(self, stop_event: asyncio.Event, interval_s: float = 5.0) -> None:
+        while not stop_event.is_set():
+            await self.check_health()
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=interval_s)
+            except asyncio.TimeoutError:
+                pass
+
+    def _error_listener(self, engine: AsyncEngine):
+        def on_error(context) -> None:
+            # Connection-level failures (refused, reset, pre-ping) eject; statement errors do not.
+            if context.is_disconnect or context.connection is None:
+                self.mark_failed(engine)
+
+        return on_error
+
+
+async def _ping(engine: AsyncEngine) -> None:
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
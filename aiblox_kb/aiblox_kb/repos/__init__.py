@@ -1,4 +1,21 @@
 from aiblox_kb.repos.item_repo import ItemRepo
 from aiblox_kb.repos.chunk_cache_repo import ChunkCacheRepo
+from aiblox_kb.repos.content_addressed_chunk_repo import ContentAddressedChunkCacheRepo
+from aiblox_kb.repos.packed_chunk_cache_repo import PackedChunkCacheRepo
+from aiblox_kb.repos.item_embedding_repo import ItemEmbeddingRepo
+from aiblox_kb.repos.ingest_checkpoint_repo import IngestCheckpointRepo
+from aiblox_kb.repos.sharded_item_repo import ShardedItemRepo
+from aiblox_kb.repos.sharded_chunk_cache_repo import ShardedChunkCacheRepo
+from aiblox_kb.repos.bm25_item_repo import Bm25ItemRepo
 
-__all__ = ["ItemRepo", "ChunkCacheRepo"]
+__all__ = [
+    "ItemRepo",
+    "ChunkCacheRepo",
+    "ContentAddressedChunkCacheRepo",
+    "PackedChunkCacheRepo",
+    "ItemEmbeddingRepo",
+    "IngestCheckpointRepo",
+    "ShardedItemRepo",
+    "ShardedChunkCacheRepo",
+    "Bm25ItemRepo",
+]
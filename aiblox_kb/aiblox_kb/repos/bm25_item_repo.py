@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Iterable, Sequence
+from uuid import UUID
+
+from aiblox_kb.bm25 import Bm25Index
+from aiblox_kb.models import KbItem
+from aiblox_kb.repos.item_repo import ItemRepo
+from aiblox_kb.repos.sharded_item_repo import ShardedItemRepo
+
+logger = logging.getLogger(__name__)
+
+
+class Bm25ItemRepo:
+    """
+    ``ItemRepo`` whose ``search_fts`` is answered by an in-process ``Bm25Index``.
+
+    Everything else (vector search, item fetches, writes) is delegated to the wrapped repo, so it
+    can replace an ``ItemRepo`` or ``ShardedItemRepo`` anywhere, including ``HybridRetriever``.
+    ``refresh`` indexes items changed since the last refresh (keyset over ``updated_at``, with an
+    ``overlap`` window for transactions that committed late; unchanged text is not re-indexed),
+    and ``reconcile_deletions`` drops items deleted from ``kb_items``. With ``snapshot_path``,
+    ``load_snapshot`` / ``save_snapshot`` persist the index and its checkpoint across restarts;
+    ``snapshot`` does so off the event loop, one save at a time.
+
+    Query text is tokenized into words; websearch operators (quotes, ``-``, ``OR``) are not
+    interpreted and ``prefs.fts`` options do not apply. ``min_score`` is the floor on raw BM25
+    scores (``prefs.fts["min_rank"]`` is on the ``ts_rank`` scale and is ignored). Searches over
+    more than ``thread_min_docs`` documents run in a worker thread so they do not stall the loop.
+    """
+
+    def __init__(
+        self,
+        item_repo: ItemRepo | ShardedItemRepo,
+        index: Bm25Index | None = None,
+        snapshot_path: str | None = None,
+        page_size: int = 1000,
+        overlap: timedelta = timedelta(seconds=5),
+        min_score: float | None = None,
+        thread_min_docs: int = 20_000,
+    ) -> None:
+        self.item_repo = item_repo
+        self.index = index or Bm25Index()
+        self.snapshot_path = snapshot_path
+        self.page_size = page_size
+        self.overlap = overlap
+        self.min_score = min_score
+        self.thread_min_docs = thread_min_docs
+        self.read_session_factory = getattr(item_repo, "read_session_factory", None)
+        self.require_owner = getattr(item_repo, "require_owner", False)
+        self._checkpoint: tuple[datetime | None, UUID | None] = (None, None)
+        self._refresh_lock = asyncio.Lock()
+        self._saving: asyncio.Future | None = None
+
+    async def search_fts(self, query_text: str, prefs) -> list[tuple[UUID, float]]:
+        owner = prefs.filters.get("owner_user_id") if prefs.filters else None
+        if self.require_owner and not isinstance(owner, (UUID, str)):
+            raise ValueError("owner_user_id is required for kb_items reads (require_owner=True)")
+        args = (query_text, prefs.top_k_items, prefs.filters, self.min_score)
+        if len(self.index) >= self.thread_min_docs:
+            return await asyncio.to_thread(self.index.search, *args)
+        return self.index.search(*args)
+
+    async def search_vec(self, query_vector, prefs) -> list[tuple[UUID, float]]:
+        return await self.item_repo.search_vec(query_vector, prefs)
+
+    async def fetch_items_by_ids(
+        self,
+        item_ids: Iterable[UUID],
+        owner_user_id: UUID | None = None,
+        max_content_chars: int | None = None,
+    ) -> list[KbItem]:
+        return await self.item_repo.fetch_items_by_ids(item_ids, owner_user_id, max_content_chars)
+
+    async def fetch_content_slices(
+        self,
+        spans: Iterable[tuple[UUID, int, int]],
+        owner_user_id: UUID | None = None,
+    ) -> dict[tuple[UUID, int, int], str]:
+        return await self.item_repo.fetch_content_slices(spans, owner_user_id)
+
+    async def list_items_updated_after(
+        self,
+        updated_after: datetime | None,
+        after_id: UUID | None,
+        limit: int,
+        min_age: timedelta | None = None,
+    ) -> list[KbItem]:
+        return await self.item_repo.list_items_updated_after(updated_after, after_id, limit, min_age)
+
+    def iter_items(
+        self,
+        columns: Sequence[str] | None = None,
+        owner_user_id: UUID | None = None,
+        updated_since: datetime | None = None,
+        page_size: int = 1000,
+        all_owners: bool = False,
+    ) -> AsyncIterator[Any]:
+        return self.item_repo.iter_items(columns, owner_user_id, updated_since, page_size, all_owners=all_owners)
+
+    async def refresh(self) -> int:
+        """Index items updated since the last refresh; returns how many were (re-)indexed."""
+        async with self._refresh_lock:
+            updated_at, _ = self._checkpoint
+            # Restart slightly before the checkpoint: rows stamped by transactions that were still
+            # open at the last refresh appear behind it. Re-reading them is cheap (no re-index).
+            cursor: tuple[datetime | None, UUID | None] = (updated_at - self.overlap if updated_at else None, None)
+            indexed = 0
+            while True:
+                items = await self.item_repo.list_items_updated_after(cursor[0], cursor[1], self.page_size)
+                for item in items:
+                    indexed += self.index.upsert(item)
+                if items:
+                    cursor = (items[-1].updated_at, items[-1].id)
+                    if updated_at is None or cursor[0] > updated_at:
+                        self._checkpoint = cursor
+                if len(items) < self.page_size:
+                    break
+                await asyncio.sleep(0)
+            self.index.maybe_compact()
+            return indexed
+
+    async def reconcile_deletions(self) -> int:
+        """Remove indexed items that no longer exist; walks item ids only."""
+        item_ids = [
+            row.id async for row in self.item_repo.iter_items(columns=["id"], page_size=self.page_size * 10, all_owners=True)
+        ]
+        removed = self.index.retain(item_ids)
+        self.index.maybe_compact()
+        return removed
+
+    def load_snapshot(self) -> bool:
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+        self.index, checkpoint = Bm25Index.load(self.snapshot_path)
+        if checkpoint and checkpoint.get("updated_at"):
+            self._checkpoint = (datetime.fromisoformat(checkpoint["updated_at"]), UUID(checkpoint["item_id"]))
+        return True
+
+    def save_snapshot(self) -> bool:
+        if not self.snapshot_path:
+            return False
+        updated_at, item_id = self._checkpoint
+        checkpoint = {"updated_at": updated_at.isoformat(), "item_id": str(item_id)} if updated_at else None
+        self.index.save(self.snapshot_path, checkpoint)
+        return True
+
+    async def snapshot(self) -> bool:
+        """
+        Compact and run ``save_snapshot`` in a worker thread. A save still in flight (e.g. one
+        whose caller was cancelled at shutdown) is awaited first, so saves never overlap.
+        """
+        while self._saving is not None and not self._saving.done():
+            await asyncio.wait([self._saving])
+        # Compact on the loop so searches never see a half-renumbered index; the snapshot
+        # itself then only reads and can be written off the loop.
+        self.index.compact()
+        self._saving = asyncio.ensure_future(asyncio.to_thread(self.save_snapshot))
+        return await asyncio.shield(self._saving)
+
+    async def run_forever(
+        self,
+        stop_event: asyncio.Event,
+        interval_s: float = 5.0,
+        reconcile_every: int = 60,
+    ) -> None:
+        """Refresh every ``interval_s``; reconcile deletions and snapshot every ``reconcile_every`` refreshes."""
+        rounds = 0
+        while not stop_event.is_set():
+            try:
+                await self.refresh()
+                rounds += 1
+                if rounds % reconcile_every == 0:
+                    await self.reconcile_deletions()
+                    await self.snapshot()
+            except Exception:  # noqa: BLE001
+                logger.exception("bm25: refresh failed")
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=interval_s)
+            except asyncio.TimeoutError:
+                pass
@@ -1,20 +1,51 @@
 from __future__ import annotations
 
+import asyncio
+import time
+from datetime import timedelta
 from typing import Callable, Iterable
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from sqlalchemy import select
+from sqlalchemy import delete, func, select, tuple_, update
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from aiblox_kb.models import KbChunkCache
+from aiblox_kb.models import KbChunkCache, KbItem
+from aiblox_kb.uow import current_unit_of_work, repo_session
+
+# Derived layouts keep embed_model_id NOT NULL so their unique indexes deduplicate;
+# chunking without an embedder is stored under this sentinel.
+NO_EMBED_MODEL = ""
+
+# Reads refresh last_accessed_at at most this often per entry, so cache hits rarely write.
+TOUCH_INTERVAL = timedelta(seconds=60)
+
+# Buffered touches are flushed early once this many entries are pending.
+TOUCH_BATCH = 1000
+
+
+def model_key(embed_model_id: str | None) -> str:
+    return embed_model_id or NO_EMBED_MODEL
 
 
 class ChunkCacheRepo:
     """Derived chunk cache repository."""
 
-    def __init__(self, session_factory: Callable[[], AsyncSession] | None = None) -> None:
+    # Table holding one or more rows per cache entry; maintenance methods operate on it.
+    model = KbChunkCache
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] | None = None,
+        read_session_factory: Callable[[], AsyncSession] | None = None,
+    ) -> None:
         self.session_factory = session_factory
+        # Cache reads may go to replicas; writes and maintenance always use ``session_factory``.
+        self.read_session_factory = read_session_factory or session_factory
+        # Cache hits are buffered here, keyed by (chunker_id, embed_model_id), and stamped in
+        # one write per TOUCH_INTERVAL instead of one per read.
+        self._pending_touches: dict[tuple[str, str | None], set[tuple[UUID, str]]] = {}
+        self._touches_flushed_at = time.monotonic()
 
     async def get_cached_chunks(
         self,
@@ -22,19 +53,78 @@ class ChunkCacheRepo:
         content_hash: str,
         chunker_id: str,
         embed_model_id: str | None,
+        ttl_seconds: int | None = None,
     ) -> list[dict]:
+        found = await self.get_cached_chunks_many([(item_id, content_hash)], chunker_id, embed_model_id, ttl_seconds)
+        return found.get((item_id, content_hash), [])
+
+    async def get_cached_chunks_many(
+        self,
+        keys: Iterable[tuple[UUID, str]],
+        chunker_id: str,
+        embed_model_id: str | None,
+        ttl_seconds: int | None = None,
+    ) -> dict[tuple[UUID, str], list[dict]]:
+        """Cached chunks for several (item_id, content_hash) pairs in one query; misses are absent."""
         if not self.session_factory:
-            return []
-        stmt = select(KbChunkCache).where(
-            KbChunkCache.item_id == item_id,
-            KbChunkCache.content_hash == content_hash,
-            KbChunkCache.chunker_id == chunker_id,
-            KbChunkCache.embed_model_id == embed_model_id,
+            return {}
+        keys = list(keys)
+        if not keys:
+            return {}
+        stmt = (
+            select(KbChunkCache)
+            .where(*self._entries_filter(keys, chunker_id, embed_model_id), *self._fresh_filter(ttl_seconds))
+            .order_by(KbChunkCache.item_id, KbChunkCache.chunk_index)
         )
-        async with self.session_factory() as session:
+        found: dict[tuple[UUID, str], list[dict]] = {}
+        async with repo_session(self.read_session_factory) as session:
             result = await session.execute(stmt)
-            rows = result.scalars().all()
-            return [row_to_dict(row) for row in rows]
+            for row in result.scalars().all():
+                found.setdefault((row.item_id, row.content_hash), []).append(row_to_dict(row))
+        await self._touch(found, chunker_id, embed_model_id)
+        return found
+
+    async def get_cached_keys(
+        self,
+        keys: Iterable[tuple[UUID, str]],
+        chunker_id: str,
+        embed_model_id: str | None,
+    ) -> set[tuple[UUID, str]]:
+        """Return the (item_id, content_hash) pairs that already have cached chunks."""
+        if not self.session_factory:
+            return set()
+        keys = list(keys)
+        if not keys:
+            return set()
+        stmt = (
+            select(KbChunkCache.item_id, KbChunkCache.content_hash)
+            .where(
+                tuple_(KbChunkCache.item_id, KbChunkCache.content_hash).in_(keys),
+                KbChunkCache.chunker_id == chunker_id,
+                KbChunkCache.embed_model_id == embed_model_id,
+            )
+            .distinct()
+        )
+        async with repo_session(self.read_session_factory) as session:
+            result = await session.execute(stmt)
+            return {(row.item_id, row.content_hash) for row in result.all()}
+
+    async def link_cached_content(
+        self,
+        entries: Iterable[dict],
+        chunker_id: str,
+        embed_model_id: str | None,
+    ) -> set[tuple[UUID, str]]:
+        """
+        Attach items to chunk content that is already cached and return the (item_id, content_hash)
+        pairs that need no chunking. Entries carry item_id, owner_user_id and content_hash.
+        Per-item rows cannot be shared, so this layout only reports existing entries.
+        """
+        return await self.get_cached_keys(
+            keys=[(entry["item_id"], entry["content_hash"]) for entry in entries],
+            chunker_id=chunker_id,
+            embed_model_id=embed_model_id,
+        )
 
     async def write_cached_chunks(
         self,
@@ -47,24 +137,16 @@ class ChunkCacheRepo:
     ) -> None:
         if not self.session_factory:
             return None
-        rows = []
-        for chunk in chunks:
-            rows.append(
-                {
-                    "id": chunk.get("id"),
-                    "item_id": item_id,
-                    "owner_user_id": owner_user_id,
-                    "content_hash": content_hash,
-                    "chunker_id": chunker_id,
-                    "embed_model_id": embed_model_id,
-                    "chunk_index": chunk.get("chunk_index"),
-                    "chunk_text": chunk.get("text") or chunk.get("chunk_text"),
-                    "start_idx": chunk.get("start_idx"),
-                    "end_idx": chunk.get("end_idx"),
-                    "token_count": chunk.get("token_count"),
-                }
-            )
-        if not rows:
+        rows = [
+            cache_row(item_id, owner_user_id, content_hash, chunker_id, embed_model_id, chunk)
+            for chunk in chunks
+        ]
+        await self.write_cache_rows(rows)
+        return None
+
+    async def write_cache_rows(self, rows: list[dict]) -> None:
+        """Insert prepared cache rows (see ``cache_row``) in a single statement."""
+        if not self.session_factory or not rows:
             return None
         stmt = insert(KbChunkCache).values(rows)
         stmt = stmt.on_conflict_do_nothing(
@@ -81,6 +163,225 @@ class ChunkCacheRepo:
                 await session.execute(stmt)
         return None
 
+    # Maintenance, used by the cache sweeper.
+
+    async def delete_expired(self, ttl_seconds: int, batch_size: int = 500) -> int:
+        """
+        Delete entries not read for ``ttl_seconds``; returns entries deleted. Hot entries stay
+        cached however old they are; a cold entry, prechunked or not, is rebuilt by the next read
+        that misses it (or by the prechunk worker once its item changes).
+        """
+        cutoff = func.now() - timedelta(seconds=ttl_seconds)
+        return await self._delete_entries_where(self.model.last_accessed_at < cutoff, batch_size)
+
+    async def delete_superseded(self, batch_size: int = 500) -> int:
+        """Delete entries whose content_hash no longer matches the item's current content_hash."""
+        stale = (
+            select(KbItem.id)
+            .where(KbItem.id == self.model.item_id, KbItem.content_hash.is_distinct_from(self.model.content_hash))
+            .exists()
+        )
+        return await self._delete_entries_where(stale, batch_size)
+
+    async def delete_orphans(self, batch_size: int = 500) -> int:
+        """Delete stored content no entry points at. Per-item layouts cascade from kb_items."""
+        return 0
+
+    async def cache_usage_by_owner(self) -> dict[UUID, int]:
+        """Cached bytes per owner, as recorded in ``byte_size`` at write time."""
+        if not self.session_factory:
+            return {}
+        stmt = (
+            select(self.model.owner_user_id, func.sum(self._entry_bytes()))
+            .select_from(self._sized_entries())
+            .group_by(self.model.owner_user_id)
+        )
+        async with self.session_factory() as session:
+            result = await session.execute(stmt)
+            return {owner: int(total or 0) for owner, total in result.all()}
+
+    async def evict_lru(self, owner_user_id: UUID, bytes_to_free: int, batch_size: int = 500) -> tuple[int, int]:
+        """
+        Delete one owner's least-recently-used entries until ``bytes_to_free`` is reached.
+        Returns (entries deleted, bytes freed).
+        """
+        if not self.session_factory:
+            return 0, 0
+        keys = self._entry_columns()
+        entries, freed = 0, 0
+        while freed < bytes_to_free:
+            stmt = (
+                select(*keys, func.sum(self._entry_bytes()).label("bytes"))
+                .select_from(self._sized_entries())
+                .where(self.model.owner_user_id == owner_user_id)
+                .group_by(*keys)
+                .order_by(func.max(self.model.last_accessed_at))
+                .limit(batch_size)
+            )
+            async with self.session_factory() as session:
+                candidates = (await session.execute(stmt)).all()
+            if not candidates:
+                break
+            chosen = []
+            for row in candidates:
+                chosen.append(tuple(row[: len(keys)]))
+                freed += int(row.bytes or 0)
+                if freed >= bytes_to_free:
+                    break
+            entries += await self._delete_entries(chosen)
+            await asyncio.sleep(0)
+        return entries, freed
+
+    async def flush_touches(self) -> int:
+        """Stamp ``last_accessed_at`` on buffered cache hits in one transaction; returns entries."""
+        stmts, entries = self._take_touches()
+        if stmts:
+            await self._write_from_read(stmts)
+        return entries
+
+    def _sized_entries(self):
+        """FROM clause that ``_entry_bytes`` is evaluated over."""
+        return self.model
+
+    def _entry_bytes(self):
+        """Bytes of one cache row, summed per entry and per owner for quotas."""
+        return self.model.byte_size
+
+    def _entry_columns(self) -> list:
+        return [
+            self.model.item_id,
+            self.model.content_hash,
+            self.model.chunker_id,
+            func.coalesce(self.model.embed_model_id, NO_EMBED_MODEL),
+        ]
+
+    def _embed_key(self, embed_model_id: str | None) -> str | None:
+        return embed_model_id
+
+    def _entries_filter(self, keys: list[tuple[UUID, str]], chunker_id: str, embed_model_id: str | None) -> list:
+        return [
+            tuple_(self.model.item_id, self.model.content_hash).in_(keys),
+            self.model.chunker_id == chunker_id,
+            self.model.embed_model_id == self._embed_key(embed_model_id),
+        ]
+
+    def _fresh_filter(self, ttl_seconds: int | None) -> list:
+        if not ttl_seconds:
+            return []
+        return [self.model.last_accessed_at >= func.now() - timedelta(seconds=ttl_seconds)]
+
+    async def _touch(self, found: Iterable[tuple[UUID, str]], chunker_id: str, embed_model_id: str | None) -> None:
+        """
+        Buffer cache hits for ``flush_touches``, which runs once per ``TOUCH_INTERVAL`` (or
+        ``TOUCH_BATCH`` entries).
+        """
+        if not self.session_factory:
+            return
+        self._pending_touches.setdefault((chunker_id, embed_model_id), set()).update(found)
+        due = time.monotonic() - self._touches_flushed_at >= TOUCH_INTERVAL.total_seconds()
+        if due or sum(len(keys) for keys in self._pending_touches.values()) >= TOUCH_BATCH:
+            await self.flush_touches()
+
+    async def _write_from_read(self, stmts: list) -> None:
+        """
+        Run writes a read path issues: as deferred writes of the ambient unit of work, whose
+        session may be read-only and must not be committed mid-request, or in one transaction.
+        """
+        uow = current_unit_of_work()
+        if uow is not None and uow.owns(self.read_session_factory):
+            for stmt in stmts:
+                uow.defer(stmt, self.session_factory)
+            return
+        async with self.session_factory() as session:
+            async with session.begin():
+                for stmt in stmts:
+                    await session.execute(stmt)
+
+    def _take_touches(self) -> tuple[list, int]:
+        pending, self._pending_touches = self._pending_touches, {}
+        self._touches_flushed_at = time.monotonic()
+        stmts = [
+            update(self.model)
+            .where(
+                *self._entries_filter(list(keys), chunker_id, embed_model_id),
+                self.model.last_accessed_at < func.now() - TOUCH_INTERVAL,
+            )
+            .values(last_accessed_at=func.now())
+            .execution_options(synchronize_session=False)
+            for (chunker_id, embed_model_id), keys in pending.items()
+            if keys
+        ]
+        return stmts, sum(len(keys) for keys in pending.values())
+
+    async def _delete_entries_where(self, condition, batch_size: int) -> int:
+        """
+        Delete whole entries matching ``condition``, ``batch_size`` entries per transaction.
+        Each statement removes complete entries, so readers never see a partially deleted
+        entry, and no transaction holds row locks for longer than one batch.
+        """
+        if not self.session_factory:
+            return 0
+        total = 0
+        while True:
+            stmt = select(*self._entry_columns()).where(condition).distinct().limit(batch_size)
+            async with self.session_factory() as session:
+                keys = [tuple(row) for row in (await session.execute(stmt)).all()]
+            if not keys:
+                return total
+            total += await self._delete_entries(keys)
+            if len(keys) < batch_size:
+                return total
+            await asyncio.sleep(0)
+
+    async def _delete_entries(self, keys: list[tuple]) -> int:
+        if not keys:
+            return 0
+        stmt = delete(self.model).where(tuple_(*self._entry_columns()).in_(keys))
+        async with self.session_factory() as session:
+            async with session.begin():
+                await session.execute(stmt)
+        return len(keys)
+
+
+def cache_row(
+    item_id: UUID,
+    owner_user_id: UUID,
+    content_hash: str,
+    chunker_id: str,
+    embed_model_id: str | None,
+    chunk: dict,
+) -> dict:
+    chunk_text = chunk.get("text")
+    if chunk_text is None:
+        chunk_text = chunk.get("chunk_text")
+    embedding = chunk.get("embedding")
+    embedding = [float(x) for x in embedding] if embedding is not None else None
+    return {
+        "id": chunk.get("id") or uuid4(),
+        "item_id": item_id,
+        "owner_user_id": owner_user_id,
+        "content_hash": content_hash,
+        "chunker_id": chunker_id,
+        "embed_model_id": embed_model_id,
+        "chunk_index": chunk.get("chunk_index"),
+        "chunk_text": chunk_text,
+        "start_idx": chunk.get("start_idx"),
+        "end_idx": chunk.get("end_idx"),
+        "token_count": chunk.get("token_count"),
+        "embedding": embedding,
+        "byte_size": len((chunk_text or "").encode("utf-8")) + 8 * len(embedding or ()),
+    }
+
+
+def span_only(chunk: dict) -> dict:
+    """
+    Cache form of a chunk of a large item: text dropped, offsets kept. Readers rebuild the text
+    from ``kb_items.content_text[start_idx:end_idx]``, so the cache does not hold a second copy.
+    """
+    if chunk.get("start_idx") is None or chunk.get("end_idx") is None:
+        return chunk
+    return {**chunk, "text": ""}
+
 
 def row_to_dict(row: KbChunkCache) -> dict:
     return {
@@ -94,4 +395,5 @@ def row_to_dict(row: KbChunkCache) -> dict:
         "start_idx": row.start_idx,
         "end_idx": row.end_idx,
         "token_count": row.token_count,
+        "embedding": list(row.embedding) if row.embedding is not None else None,
     }
@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+from typing import Callable, Iterable
+from uuid import UUID, uuid4
+
+from sqlalchemy import Select, and_, delete, func, join, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from aiblox_kb.models import KbChunkStore, KbItem, KbItemChunkRef
+from aiblox_kb.repos.chunk_cache_repo import ChunkCacheRepo, model_key
+from aiblox_kb.uow import repo_session
+
+
+class ContentAddressedChunkCacheRepo(ChunkCacheRepo):
+    """
+    Chunk cache keyed by content instead of item.
+
+    Chunks and vectors live once per ``(content_hash, chunker_id, embed_model_id)`` in
+    ``kb_chunk_store``; ``kb_item_chunk_refs`` points each item version at them. Identical text
+    attached to many items or owners is chunked, embedded and stored once, while reads still
+    return item-level rows through the ``ChunkCacheRepo`` interface.
+
+    A read that hits content stored for other items adds refs for the items it served, so every
+    item using an entry has a ref. Eviction works on the refs; stored content is removed once no
+    ref points at it. Each ref is charged the full size of the content it points at, so an owner's
+    usage and quota match what the item-keyed layout would store for them, and physical bytes are
+    at most the sum over owners. Evicting an owner's refs frees shared content only once no other
+    ref uses it.
+    """
+
+    model = KbItemChunkRef
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] | None = None,
+        read_session_factory: Callable[[], AsyncSession] | None = None,
+    ) -> None:
+        super().__init__(session_factory, read_session_factory)
+
+    async def get_cached_chunks_many(
+        self,
+        keys: Iterable[tuple[UUID, str]],
+        chunker_id: str,
+        embed_model_id: str | None,
+        ttl_seconds: int | None = None,
+    ) -> dict[tuple[UUID, str], list[dict]]:
+        if not self.session_factory:
+            return {}
+        keys = list(keys)
+        if not keys:
+            return {}
+        embed_key = model_key(embed_model_id)
+        stmt = (
+            select(KbChunkStore)
+            .where(
+                KbChunkStore.content_hash.in_({content_hash for _, content_hash in keys}),
+                KbChunkStore.chunker_id == chunker_id,
+                KbChunkStore.embed_model_id == embed_key,
+            )
+            .where(*self._fresh_filter(ttl_seconds))
+            .order_by(KbChunkStore.content_hash, KbChunkStore.chunk_index)
+        )
+        async with repo_session(self.read_session_factory) as session:
+            result = await session.execute(stmt)
+            by_content: dict[str, list[KbChunkStore]] = {}
+            for row in result.scalars().all():
+                by_content.setdefault(row.content_hash, []).append(row)
+            found = {
+                (item_id, content_hash): [store_row_to_dict(row, item_id) for row in by_content[content_hash]]
+                for item_id, content_hash in keys
+                if content_hash in by_content
+            }
+            unlinked = (await session.execute(_unlinked_items(found, chunker_id, embed_key))).all() if found else []
+        if unlinked:
+            # Hits on content stored for other items: attach these items so their owners are
+            # charged for it and eviction sees the entry.
+            refs = [_ref_row(row.id, row.owner_user_id, row.content_hash, chunker_id, embed_key) for row in unlinked]
+            await self._write_from_read([_insert_refs(refs)])
+        await self._touch(found, chunker_id, embed_model_id)
+        return found
+
+    async def get_cached_keys(
+        self,
+        keys: Iterable[tuple[UUID, str]],
+        chunker_id: str,
+        embed_model_id: str | None,
+    ) -> set[tuple[UUID, str]]:
+        if not self.session_factory:
+            return set()
+        keys = list(keys)
+        if not keys:
+            return set()
+        stmt = select(KbItemChunkRef.item_id, KbItemChunkRef.content_hash).where(
+            tuple_(KbItemChunkRef.item_id, KbItemChunkRef.content_hash).in_(keys),
+            KbItemChunkRef.chunker_id == chunker_id,
+            KbItemChunkRef.embed_model_id == model_key(embed_model_id),
+        )
+        async with repo_session(self.read_session_factory) as session:
+            result = await session.execute(stmt)
+            return {(row.item_id, row.content_hash) for row in result.all()}
+
+    async def link_cached_content(
+        self,
+        entries: Iterable[dict],
+        chunker_id: str,
+        embed_model_id: str | None,
+    ) -> set[tuple[UUID, str]]:
+        if not self.session_factory:
+            return set()
+        entries = list(entries)
+        if not entries:
+            return set()
+        embed_key = model_key(embed_model_id)
+        hashes = {entry["content_hash"] for entry in entries}
+        stored_stmt = (
+            select(KbChunkStore.content_hash)
+            .where(
+                KbChunkStore.content_hash.in_(hashes),
+                KbChunkStore.chunker_id == chunker_id,
+                KbChunkStore.embed_model_id == embed_key,
+            )
+            .distinct()
+        )
+        async with self.session_factory() as session:
+            async with session.begin():
+                stored = set((await session.execute(stored_stmt)).scalars().all())
+                linked = [entry for entry in entries if entry["content_hash"] in stored]
+                if linked:
+                    await session.execute(
+                        _insert_refs(
+                            [
+                                _ref_row(
+                                    entry["item_id"],
+                                    entry["owner_user_id"],
+                                    entry["content_hash"],
+                                    chunker_id,
+                                    embed_key,
+                                )
+                                for entry in linked
+                            ]
+                        )
+                    )
+        return {(entry["item_id"], entry["content_hash"]) for entry in linked}
+
+    async def delete_orphans(self, batch_size: int = 500) -> int:
+        if not self.session_factory:
+            return 0
+        unreferenced = ~(
+            select(KbItemChunkRef.id)
+            .where(
+                KbItemChunkRef.content_hash == KbChunkStore.content_hash,
+                KbItemChunkRef.chunker_id == KbChunkStore.chunker_id,
+                KbItemChunkRef.embed_model_id == KbChunkStore.embed_model_id,
+            )
+            .exists()
+        )
+        content_key = (KbChunkStore.content_hash, KbChunkStore.chunker_id, KbChunkStore.embed_model_id)
+        total = 0
+        while True:
+            stmt = select(*content_key).where(unreferenced).distinct().limit(batch_size)
+            async with self.session_factory() as session:
+                keys = [tuple(row) for row in (await session.execute(stmt)).all()]
+            if not keys:
+                return total
+            async with self.session_factory() as session:
+                async with session.begin():
+                    # Re-check under the delete so content linked in the meantime survives.
+                    await session.execute(delete(KbChunkStore).where(tuple_(*content_key).in_(keys), unreferenced))
+            total += len(keys)
+            if len(keys) < batch_size:
+                return total
+            await asyncio.sleep(0)
+
+    def _fresh_filter(self, ttl_seconds: int | None) -> list:
+        # Stored content has no access time of its own; it is fresh while any ref to it is.
+        if not ttl_seconds:
+            return []
+        fresh_ref = (
+            select(KbItemChunkRef.id)
+            .where(
+                KbItemChunkRef.content_hash == KbChunkStore.content_hash,
+                KbItemChunkRef.chunker_id == KbChunkStore.chunker_id,
+                KbItemChunkRef.embed_model_id == KbChunkStore.embed_model_id,
+                KbItemChunkRef.last_accessed_at >= func.now() - timedelta(seconds=ttl_seconds),
+            )
+            .exists()
+        )
+        return [fresh_ref]
+
+    def _sized_entries(self):
+        return join(
+            KbItemChunkRef,
+            KbChunkStore,
+            and_(
+                KbChunkStore.content_hash == KbItemChunkRef.content_hash,
+                KbChunkStore.chunker_id == KbItemChunkRef.chunker_id,
+                KbChunkStore.embed_model_id == KbItemChunkRef.embed_model_id,
+            ),
+        )
+
+    def _entry_bytes(self):
+        # Same measure as ``cache_row``'s byte_size: UTF-8 text plus 8 bytes per vector component.
+        return func.octet_length(KbChunkStore.chunk_text) + 8 * func.coalesce(
+            func.cardinality(KbChunkStore.embedding), 0
+        )
+
+    def _embed_key(self, embed_model_id: str | None) -> str:
+        return model_key(embed_model_id)
+
+    async def write_cache_rows(self, rows: list[dict]) -> None:
+        if not self.session_factory or not rows:
+            return None
+        store_rows: dict[tuple, dict] = {}
+        ref_rows: dict[tuple, dict] = {}
+        for row in rows:
+            embed_key = model_key(row["embed_model_id"])
+            content_key = (row["content_hash"], row["chunker_id"], embed_key)
+            store_rows.setdefault(
+                (*content_key, row["chunk_index"]),
+                {
+                    "id": uuid4(),
+                    "content_hash": row["content_hash"],
+                    "chunker_id": row["chunker_id"],
+                    "embed_model_id": embed_key,
+                    "chunk_index": row["chunk_index"],
+                    "chunk_text": row["chunk_text"],
+                    "start_idx": row["start_idx"],
+                    "end_idx": row["end_idx"],
+                    "token_count": row["token_count"],
+                    "embedding": row.get("embedding"),
+                },
+            )
+            ref_rows.setdefault(
+                (row["item_id"], *content_key),
+                _ref_row(row["item_id"], row["owner_user_id"], *content_key),
+            )
+
+        store_stmt = insert(KbChunkStore).values(list(store_rows.values()))
+        store_stmt = store_stmt.on_conflict_do_nothing(
+            index_elements=[
+                KbChunkStore.content_hash,
+                KbChunkStore.chunker_id,
+                KbChunkStore.embed_model_id,
+                KbChunkStore.chunk_index,
+            ]
+        )
+        async with self.session_factory() as session:
+            async with session.begin():
+                await session.execute(store_stmt)
+                await session.execute(_insert_refs(list(ref_rows.values())))
+        return None
+
+
+def _ref_row(item_id: UUID, owner_user_id: UUID, content_hash: str, chunker_id: str, embed_key: str) -> dict:
+    return {
+        "id": uuid4(),
+        "item_id": item_id,
+        "owner_user_id": owner_user_id,
+        "content_hash": content_hash,
+        "chunker_id": chunker_id,
+        "embed_model_id": embed_key,
+    }
+
+
+def _unlinked_items(keys: Iterable[tuple[UUID, str]], chunker_id: str, embed_key: str) -> Select:
+    """Items among ``keys`` (at their current content_hash) that have no ref to the content yet."""
+    linked = (
+        select(KbItemChunkRef.id)
+        .where(
+            KbItemChunkRef.item_id == KbItem.id,
+            KbItemChunkRef.content_hash == KbItem.content_hash,
+            KbItemChunkRef.chunker_id == chunker_id,
+            KbItemChunkRef.embed_model_id == embed_key,
+        )
+        .exists()
+    )
+    return select(KbItem.id, KbItem.owner_user_id, KbItem.content_hash).where(
+        tuple_(KbItem.id, KbItem.content_hash).in_(list(keys)), ~linked
+    )
+
+
+def _insert_refs(rows: list[dict]):
+    stmt = insert(KbItemChunkRef).values(rows)
+    return stmt.on_conflict_do_nothing(
+        index_elements=[
+            KbItemChunkRef.item_id,
+            KbItemChunkRef.content_hash,
+            KbItemChunkRef.chunker_id,
+            KbItemChunkRef.embed_model_id,
+        ]
+    )
+
+
+def store_row_to_dict(row: KbChunkStore, item_id: UUID) -> dict:
+    return {
+        "id": str(row.id),
+        "item_id": str(item_id),
+        "content_hash": row.content_hash,
+        "chunker_id": row.chunker_id,
+        "embed_model_id": row.embed_model_id or None,
+        "chunk_index": row.chunk_index,
+        "text": row.chunk_text,
+        "start_idx": row.start_idx,
+        "end_idx": row.end_idx,
+        "token_count": row.token_count,
+        "embedding": list(row.embedding) if row.embedding is not None else None,
+    }
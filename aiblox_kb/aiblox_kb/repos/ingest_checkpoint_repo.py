@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Callable
+from uuid import UUID, uuid4
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from aiblox_kb.models import KbIngestCheckpoint
+
+
+class IngestCheckpointRepo:
+    """Durable progress markers for resumable background ingestion workers."""
+
+    def __init__(self, session_factory: Callable[[], AsyncSession] | None = None) -> None:
+        self.session_factory = session_factory
+
+    async def get_checkpoint(self, worker_name: str) -> dict | None:
+        if not self.session_factory:
+            return None
+        stmt = select(KbIngestCheckpoint).where(KbIngestCheckpoint.worker_name == worker_name)
+        async with self.session_factory() as session:
+            result = await session.execute(stmt)
+            row = result.scalars().first()
+            if row is None:
+                return None
+            return {
+                "worker_name": row.worker_name,
+                "last_updated_at": row.last_updated_at,
+                "last_item_id": row.last_item_id,
+                "processed_count": row.processed_count,
+            }
+
+    async def save_checkpoint(
+        self,
+        worker_name: str,
+        last_updated_at: datetime | None,
+        last_item_id: UUID | None,
+        processed_count: int,
+    ) -> None:
+        if not self.session_factory:
+            return None
+        stmt = insert(KbIngestCheckpoint).values(
+            id=uuid4(),
+            worker_name=worker_name,
+            last_updated_at=last_updated_at,
+            last_item_id=last_item_id,
+            processed_count=processed_count,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[KbIngestCheckpoint.worker_name],
+            set_={
+                "last_updated_at": stmt.excluded.last_updated_at,
+                "last_item_id": stmt.excluded.last_item_id,
+                "processed_count": stmt.excluded.processed_count,
+                "updated_at": func.now(),
+            },
+        )
+        async with self.session_factory() as session:
+            async with session.begin():
+                await session.execute(stmt)
+        return None
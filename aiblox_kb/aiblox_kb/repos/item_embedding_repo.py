@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from typing import Callable, Iterable
+from uuid import UUID, uuid4
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from aiblox_kb.models import KbItemEmbedding
+
+
+class ItemEmbeddingRepo:
+    """Derived item-level embedding repository (one vector per item and embedding model)."""
+
+    def __init__(self, session_factory: Callable[[], AsyncSession] | None = None) -> None:
+        self.session_factory = session_factory
+
+    async def get_item_embeddings(
+        self,
+        item_ids: Iterable[UUID],
+        embed_model_id: str,
+    ) -> dict[UUID, dict]:
+        if not self.session_factory:
+            return {}
+        stmt = select(KbItemEmbedding).where(
+            KbItemEmbedding.item_id.in_(list(item_ids)),
+            KbItemEmbedding.embed_model_id == embed_model_id,
+        )
+        async with self.session_factory() as session:
+            result = await session.execute(stmt)
+            return {
+                row.item_id: {
+                    "content_hash": row.content_hash,
+                    "embedding": list(row.embedding),
+                }
+                for row in result.scalars().all()
+            }
+
+    async def upsert_item_embeddings(self, rows: Iterable[dict]) -> None:
+        """Insert or refresh item vectors; each row needs item_id, owner_user_id, content_hash,
+        embed_model_id and embedding."""
+        if not self.session_factory:
+            return None
+        values = [
+            {
+                "id": row.get("id") or uuid4(),
+                "item_id": row["item_id"],
+                "owner_user_id": row["owner_user_id"],
+                "content_hash": row["content_hash"],
+                "embed_model_id": row["embed_model_id"],
+                "embedding": [float(x) for x in row["embedding"]],
+            }
+            for row in rows
+        ]
+        if not values:
+            return None
+        stmt = insert(KbItemEmbedding).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[KbItemEmbedding.item_id, KbItemEmbedding.embed_model_id],
+            set_={
+                "content_hash": stmt.excluded.content_hash,
+                "embedding": stmt.excluded.embedding,
+                "updated_at": func.now(),
+            },
+        )
+        async with self.session_factory() as session:
+            async with session.begin():
+                await session.execute(stmt)
+        return None
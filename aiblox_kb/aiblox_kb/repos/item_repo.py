@@ -1,20 +1,39 @@
 from __future__ import annotations
 
-from typing import Callable, Iterable
-from uuid import UUID
+import hashlib
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Callable, Iterable, Sequence
+from uuid import UUID, uuid4
 
-from sqlalchemy import Select, desc, func, select
+from sqlalchemy import Integer, Select, and_, case, column, desc, func, or_, select, tuple_, values
+from sqlalchemy.dialects.postgresql import UUID as PGUUID, Insert, insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
+from sqlalchemy.orm.attributes import set_committed_value
 
-from aiblox_kb.models import KbItem
+from aiblox_kb.filters import compile_filters
+from aiblox_kb.models import FTS_CONFIG, KbItem
 from aiblox_kb.tsquery import build_tsquery
+from aiblox_kb.uow import repo_session
 
 
 class ItemRepo:
     """SQLAlchemy ORM repository for KB items."""
 
-    def __init__(self, session_factory: Callable[[], AsyncSession] | None = None) -> None:
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] | None = None,
+        read_session_factory: Callable[[], AsyncSession] | None = None,
+        fts_config: str | None = FTS_CONFIG,
+        require_owner: bool = False,
+    ) -> None:
         self.session_factory = session_factory
+        # Optional replica-routed factory (see ``ReplicaRouter``) for search and fetch reads.
+        self.read_session_factory = read_session_factory or session_factory
+        # Must match the config of the generated ``tsv`` column unless prefs override it.
+        self.fts_config = fts_config
+        # With owner-partitioned kb_items, every read must carry the owner to prune partitions.
+        self.require_owner = require_owner
 
     async def search_fts(
         self,
@@ -23,36 +42,287 @@ class ItemRepo:
     ) -> list[tuple[str, float]]:
         if not self.session_factory:
             return []
+        self._check_owner(prefs.filters.get("owner_user_id") if prefs.filters else None)
         tsquery = build_tsquery(
             query_text=query_text,
             mode=prefs.fts.get("mode", "web"),
-            config=prefs.fts.get("config"),
+            config=prefs.fts.get("config") or self.fts_config,
             allow_strict=prefs.fts.get("allow_strict", False),
         )
         rank_func_name = prefs.fts.get("rank_func", "ts_rank_cd")
         rank_func = getattr(func, rank_func_name, func.ts_rank_cd)
         rank_expr = rank_func(KbItem.tsv, tsquery).label("rank_text")
-        stmt: Select = select(KbItem.id, rank_expr).where(KbItem.tsv.op("@@")(tsquery))
-        for key, value in (prefs.filters or {}).items():
-            col = getattr(KbItem, key, None)
-            if col is not None:
-                stmt = stmt.where(col == value)
+        stmt: Select = select(KbItem.id, rank_expr).where(
+            KbItem.tsv.op("@@")(tsquery),
+            *compile_filters(prefs.filters),
+        )
         stmt = stmt.order_by(desc(rank_expr)).limit(prefs.top_k_items)
         if prefs.fts.get("min_rank") is not None:
             stmt = stmt.where(rank_expr >= prefs.fts["min_rank"])
-        async with self.session_factory() as session:
+        async with repo_session(self.read_session_factory) as session:
             result = await session.execute(stmt)
             rows = result.all()
             return [(row.id, float(row.rank_text)) for row in rows]
 
     async def search_vec(self, query_vector, prefs) -> list[tuple[str, float]]:
-        # v0.1: embeddings/pgvector not yet included (Option B)
+        # v0.1: embeddings/pgvector not yet included (Option B). Filters are still compiled so
+        # invalid filters fail the same way on both legs; the vector query must apply them too.
+        self._check_owner(prefs.filters.get("owner_user_id") if prefs.filters else None)
+        compile_filters(prefs.filters)
         return []
 
-    async def fetch_items_by_ids(self, item_ids: Iterable[UUID]) -> list[KbItem]:
+    async def fetch_items_by_ids(
+        self,
+        item_ids: Iterable[UUID],
+        owner_user_id: UUID | None = None,
+        max_content_chars: int | None = None,
+    ) -> list[KbItem]:
+        """
+        Items by id. With ``max_content_chars``, ``content_text`` is only loaded for items up to
+        that many characters; larger items come back with it unloaded (accessing it raises), to be
+        read piecewise with ``fetch_content_slices`` using ``content_length``. ``tsv``, which grows
+        with the text, is not loaded in this mode.
+        """
         if not self.session_factory:
             return []
+        self._check_owner(owner_user_id)
         stmt = select(KbItem).where(KbItem.id.in_(list(item_ids)))
-        async with self.session_factory() as session:
+        if owner_user_id is not None:
+            stmt = stmt.where(KbItem.owner_user_id == owner_user_id)
+        if max_content_chars is None:
+            async with repo_session(self.read_session_factory) as session:
+                result = await session.execute(stmt)
+                return list(result.scalars().all())
+        small_content = case((KbItem.content_length <= max_content_chars, KbItem.content_text))
+        stmt = stmt.options(
+            defer(KbItem.content_text, raiseload=True), defer(KbItem.tsv, raiseload=True)
+        ).add_columns(small_content.label("small_content"))
+        async with repo_session(self.read_session_factory) as session:
+            result = await session.execute(stmt)
+            items = []
+            for item, text in result.all():
+                if text is not None:
+                    set_committed_value(item, "content_text", text)
+                items.append(item)
+            return items
+
+    async def fetch_content_slices(
+        self,
+        spans: Iterable[tuple[UUID, int, int]],
+        owner_user_id: UUID | None = None,
+    ) -> dict[tuple[UUID, int, int], str]:
+        """
+        ``content_text[start:end]`` for each ``(item_id, start, end)`` span, in one query.
+
+        Offsets are character offsets as produced by the chunkers; the slicing happens in
+        PostgreSQL (``substr``), so only the requested text crosses the wire. Spans of missing
+        items are absent from the result.
+        """
+        if not self.session_factory:
+            return {}
+        self._check_owner(owner_user_id)
+        spans = list(dict.fromkeys(spans))
+        if not spans:
+            return {}
+        wanted = values(
+            column("item_id", PGUUID(as_uuid=True)),
+            column("start_idx", Integer),
+            column("end_idx", Integer),
+            name="spans",
+        ).data(spans)
+        stmt = select(
+            wanted.c.item_id,
+            wanted.c.start_idx,
+            wanted.c.end_idx,
+            func.substr(KbItem.content_text, wanted.c.start_idx + 1, wanted.c.end_idx - wanted.c.start_idx).label("text"),
+        ).select_from(KbItem).join(wanted, KbItem.id == wanted.c.item_id)
+        if owner_user_id is not None:
+            stmt = stmt.where(KbItem.owner_user_id == owner_user_id)
+        async with repo_session(self.read_session_factory) as session:
+            result = await session.execute(stmt)
+            return {(row.item_id, row.start_idx, row.end_idx): row.text for row in result.all()}
+
+    async def list_items_updated_after(
+        self,
+        updated_after: datetime | None,
+        after_id: UUID | None,
+        limit: int,
+        min_age: timedelta | None = None,
+    ) -> list[KbItem]:
+        """
+        Keyset page of items ordered by ``(updated_at, id)``, strictly after the given position.
+        With ``min_age``, only items whose ``updated_at`` is at least that old (database time).
+        """
+        if not self.session_factory:
+            return []
+        stmt = _after(select(KbItem).order_by(KbItem.updated_at, KbItem.id).limit(limit), updated_after, after_id)
+        if min_age is not None:
+            stmt = stmt.where(KbItem.updated_at <= func.now() - min_age)
+        async with repo_session(self.session_factory) as session:
             result = await session.execute(stmt)
             return list(result.scalars().all())
+
+    async def iter_items(
+        self,
+        columns: Sequence[str] | None = None,
+        owner_user_id: UUID | None = None,
+        updated_since: datetime | None = None,
+        page_size: int = 1000,
+        all_owners: bool = False,
+    ) -> AsyncIterator[Any]:
+        """
+        Walk items in ``(updated_at, id)`` order, ``page_size`` rows per query.
+
+        Yields ``KbItem`` objects, or rows with only ``columns`` (plus ``id`` and ``updated_at``,
+        which drive the keyset) when a projection is given, e.g. ``("id", "content_hash")`` for a
+        re-embedding job that does not need ``content_text``. Each page is a separate short
+        query on the ``ix_kb_items_updated_at_id`` index, so no transaction or cursor is held
+        between pages and memory stays bounded by one page.
+
+        The walk is bounded by the database time at its start, so it always ends, even when the
+        job doing the walk updates the items it yields. An item updated during the walk before
+        the walk reaches it moves past that bound and is skipped; run a follow-up walk with
+        ``updated_since`` set to the start of this one to catch it. Reads go to ``read_session_factory``; with ``require_owner`` an
+        ``owner_user_id`` is needed unless ``all_owners`` marks a deliberate full scan.
+        """
+        if not self.session_factory:
+            return
+        if page_size <= 0:
+            raise ValueError("page_size must be positive")
+        if not all_owners:
+            self._check_owner(owner_user_id)
+        if columns:
+            unknown = [name for name in columns if name not in KbItem.__table__.c]
+            if unknown:
+                raise ValueError(f"unknown kb_items columns: {unknown}")
+            names = list(dict.fromkeys(["id", "updated_at", *columns]))
+            base = select(*(KbItem.__table__.c[name] for name in names))
+        else:
+            base = select(KbItem)
+        base = base.order_by(KbItem.updated_at, KbItem.id).limit(page_size)
+        if owner_user_id is not None:
+            base = base.where(KbItem.owner_user_id == owner_user_id)
+        if updated_since is not None:
+            base = base.where(KbItem.updated_at >= updated_since)
+        async with repo_session(self.read_session_factory) as session:
+            snapshot = (await session.execute(select(func.now()))).scalar_one()
+        base = base.where(KbItem.updated_at <= snapshot)
+        last_updated_at: datetime | None = None
+        last_id: UUID | None = None
+        while True:
+            async with repo_session(self.read_session_factory) as session:
+                result = await session.execute(_after(base, last_updated_at, last_id))
+                page = list(result.scalars().all()) if not columns else list(result.all())
+            for item in page:
+                yield item
+            if len(page) < page_size:
+                return
+            last_updated_at, last_id = page[-1].updated_at, page[-1].id
+
+    def _check_owner(self, owner_user_id) -> None:
+        if self.require_owner and not isinstance(owner_user_id, (UUID, str)):
+            raise ValueError("owner_user_id is required for kb_items reads (require_owner=True)")
+
+    async def upsert_items_bulk(self, items: Iterable[dict], batch_size: int = 1000) -> int:
+        """
+        Insert or update many items, ``batch_size`` rows per statement; returns rows processed.
+
+        Items are dicts with ``owner_user_id``, ``kind``, ``source`` and ``content_text`` and
+        optionally ``id``, ``source_ref``, ``title``, ``summary`` and ``metadata``. ``content_hash``
+        is computed here and ``tsv`` by the database. Items with a ``source_ref`` upsert on
+        ``(owner_user_id, source, source_ref)``; items without one need an ``id`` and upsert on
+        the primary key (``ValueError`` otherwise, since NULL ``source_ref``s never conflict and
+        would be inserted again). Existing rows are only rewritten (and their ``updated_at``
+        bumped) when something changed, and never across owners. Each batch is at most two
+        multi-row ``INSERT ... ON CONFLICT`` statements through the driver's executemany path.
+        """
+        if not self.session_factory:
+            return 0
+        processed = 0
+        by_ref: dict[tuple, dict] = {}
+        by_id: dict[tuple, dict] = {}
+        for item in items:
+            if not item.get("source_ref") and not item.get("id"):
+                raise ValueError("kb items without a source_ref need an id to be upserted")
+            row = item_row(item)
+            # A statement may not touch the same conflict key twice; the last version wins.
+            if row["source_ref"]:
+                by_ref[(row["owner_user_id"], row["source"], row["source_ref"])] = row
+            else:
+                by_id[(row["id"],)] = row
+            if len(by_ref) + len(by_id) >= batch_size:
+                processed += await self._upsert_batch(list(by_ref.values()), list(by_id.values()))
+                by_ref, by_id = {}, {}
+        if by_ref or by_id:
+            processed += await self._upsert_batch(list(by_ref.values()), list(by_id.values()))
+        return processed
+
+    async def _upsert_batch(self, by_ref: list[dict], by_id: list[dict]) -> int:
+        async with self.session_factory() as session:
+            async with session.begin():
+                if by_ref:
+                    stmt = _upsert_statement(index_elements=[KbItem.owner_user_id, KbItem.source, KbItem.source_ref])
+                    await session.execute(stmt, by_ref)
+                if by_id:
+                    # The primary key is (id) or, with owner partitions, (id, owner_user_id); naming
+                    # the constraint covers both.
+                    await session.execute(_upsert_statement(constraint="kb_items_pkey"), by_id)
+        return len(by_ref) + len(by_id)
+
+
+def _upsert_statement(**conflict_target) -> Insert:
+    """Multi-row item upsert; rewrites a conflicting row of the same owner only if it changed."""
+    stmt = insert(KbItem)
+    excluded = stmt.excluded
+    changed = or_(
+        KbItem.content_hash.is_distinct_from(excluded.content_hash),
+        KbItem.kind.is_distinct_from(excluded.kind),
+        KbItem.title.is_distinct_from(excluded.title),
+        KbItem.summary.is_distinct_from(excluded.summary),
+        KbItem.metadata_.is_distinct_from(excluded.metadata),
+    )
+    return stmt.on_conflict_do_update(
+        **conflict_target,
+        set_={
+            "kind": excluded.kind,
+            "title": excluded.title,
+            "summary": excluded.summary,
+            "content_text": excluded.content_text,
+            "content_hash": excluded.content_hash,
+            "metadata": excluded.metadata,
+            "updated_at": func.now(),
+        },
+        where=and_(KbItem.owner_user_id == excluded.owner_user_id, changed),
+    )
+
+
+def _after(stmt: Select, updated_at: datetime | None, item_id: UUID | None) -> Select:
+    """Restrict a ``(updated_at, id)``-ordered select to rows strictly after the given position."""
+    if updated_at is None:
+        return stmt
+    if item_id is None:
+        return stmt.where(KbItem.updated_at > updated_at)
+    return stmt.where(tuple_(KbItem.updated_at, KbItem.id) > tuple_(updated_at, item_id))
+
+
+def content_hash(content_text: str) -> str:
+    return hashlib.sha256(content_text.encode("utf-8")).hexdigest()
+
+
+def item_row(item: dict) -> dict:
+    """Validate one ingest dict and turn it into ``kb_items`` insert parameters."""
+    missing = [key for key in ("owner_user_id", "kind", "source", "content_text") if not item.get(key)]
+    if missing:
+        raise ValueError(f"kb item missing required fields: {', '.join(missing)}")
+    return {
+        "id": item.get("id") or uuid4(),
+        "owner_user_id": item["owner_user_id"],
+        "kind": item["kind"],
+        "source": item["source"],
+        "source_ref": item.get("source_ref"),
+        "title": item.get("title"),
+        "summary": item.get("summary"),
+        "content_text": item["content_text"],
+        "content_hash": content_hash(item["content_text"]),
+        "metadata": item.get("metadata") or {},
+    }
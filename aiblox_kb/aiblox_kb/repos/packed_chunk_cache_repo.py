@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from typing import Callable, Iterable
+from uuid import UUID, uuid4
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from aiblox_kb.models import KbChunkCachePacked
+from aiblox_kb.packing import pack_vectors, unpack_vectors
+from aiblox_kb.repos.chunk_cache_repo import ChunkCacheRepo, model_key
+from aiblox_kb.uow import repo_session
+
+
+class PackedChunkCacheRepo(ChunkCacheRepo):
+    """
+    Chunk cache with one row per ``(item_id, content_hash, chunker_id, embed_model_id)``.
+
+    Chunk fields are stored as parallel arrays and vectors as one little-endian float32 blob,
+    so a cache read is a single index lookup and a write is a single row.
+    """
+
+    model = KbChunkCachePacked
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] | None = None,
+        read_session_factory: Callable[[], AsyncSession] | None = None,
+    ) -> None:
+        super().__init__(session_factory, read_session_factory)
+
+    async def get_cached_chunks_many(
+        self,
+        keys: Iterable[tuple[UUID, str]],
+        chunker_id: str,
+        embed_model_id: str | None,
+        ttl_seconds: int | None = None,
+    ) -> dict[tuple[UUID, str], list[dict]]:
+        if not self.session_factory:
+            return {}
+        keys = list(keys)
+        if not keys:
+            return {}
+        stmt = select(KbChunkCachePacked).where(
+            *self._entries_filter(keys, chunker_id, embed_model_id), *self._fresh_filter(ttl_seconds)
+        )
+        async with repo_session(self.read_session_factory) as session:
+            result = await session.execute(stmt)
+            found = {(row.item_id, row.content_hash): unpack_row(row) for row in result.scalars().all()}
+        await self._touch(found, chunker_id, embed_model_id)
+        return found
+
+    async def get_cached_keys(
+        self,
+        keys: Iterable[tuple[UUID, str]],
+        chunker_id: str,
+        embed_model_id: str | None,
+    ) -> set[tuple[UUID, str]]:
+        if not self.session_factory:
+            return set()
+        keys = list(keys)
+        if not keys:
+            return set()
+        stmt = select(KbChunkCachePacked.item_id, KbChunkCachePacked.content_hash).where(
+            tuple_(KbChunkCachePacked.item_id, KbChunkCachePacked.content_hash).in_(keys),
+            KbChunkCachePacked.chunker_id == chunker_id,
+            KbChunkCachePacked.embed_model_id == model_key(embed_model_id),
+        )
+        async with repo_session(self.read_session_factory) as session:
+            result = await session.execute(stmt)
+            return {(row.item_id, row.content_hash) for row in result.all()}
+
+    def _embed_key(self, embed_model_id: str | None) -> str:
+        return model_key(embed_model_id)
+
+    async def write_cache_rows(self, rows: list[dict]) -> None:
+        if not self.session_factory or not rows:
+            return None
+        stmt = insert(KbChunkCachePacked).values(pack_rows(rows))
+        stmt = stmt.on_conflict_do_nothing(
+            index_elements=[
+                KbChunkCachePacked.item_id,
+                KbChunkCachePacked.content_hash,
+                KbChunkCachePacked.chunker_id,
+                KbChunkCachePacked.embed_model_id,
+            ]
+        )
+        async with self.session_factory() as session:
+            async with session.begin():
+                await session.execute(stmt)
+        return None
+
+
+def pack_rows(rows: Iterable[dict]) -> list[dict]:
+    """Group per-chunk cache rows (see ``cache_row``) into one packed row per item version."""
+    groups: dict[tuple, list[dict]] = {}
+    for row in rows:
+        key = (row["item_id"], row["content_hash"], row["chunker_id"], model_key(row["embed_model_id"]))
+        groups.setdefault(key, []).append(row)
+    packed: list[dict] = []
+    for (item_id, content_hash, chunker_id, embed_key), chunks in groups.items():
+        chunks.sort(key=lambda c: c["chunk_index"])
+        dim, blob = pack_vectors([c.get("embedding") for c in chunks])
+        texts = [c["chunk_text"] for c in chunks]
+        packed.append(
+            {
+                "id": uuid4(),
+                "item_id": item_id,
+                "owner_user_id": chunks[0]["owner_user_id"],
+                "content_hash": content_hash,
+                "chunker_id": chunker_id,
+                "embed_model_id": embed_key,
+                "chunk_count": len(chunks),
+                "chunk_indexes": [c["chunk_index"] for c in chunks],
+                "start_idxs": [c.get("start_idx") for c in chunks],
+                "end_idxs": [c.get("end_idx") for c in chunks],
+                "token_counts": [c.get("token_count") for c in chunks],
+                "chunk_texts": texts,
+                "embedding_dim": dim,
+                "embeddings": blob,
+                "byte_size": sum(len(t.encode("utf-8")) for t in texts) + len(blob or b""),
+            }
+        )
+    return packed
+
+
+def unpack_row(row: KbChunkCachePacked) -> list[dict]:
+    vectors = unpack_vectors(row.embeddings, row.embedding_dim, row.chunk_count)
+    return [
+        {
+            "id": f"{row.id}:{row.chunk_indexes[i]}",
+            "item_id": str(row.item_id),
+            "content_hash": row.content_hash,
+            "chunker_id": row.chunker_id,
+            "embed_model_id": row.embed_model_id or None,
+            "chunk_index": row.chunk_indexes[i],
+            "text": row.chunk_texts[i],
+            "start_idx": row.start_idxs[i],
+            "end_idx": row.end_idxs[i],
+            "token_count": row.token_counts[i],
+            "embedding": vectors[i],
+        }
+        for i in range(row.chunk_count)
+    ]
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Iterable, Mapping
+from uuid import UUID
+
+from aiblox_kb.repos.chunk_cache_repo import ChunkCacheRepo, cache_row
+from aiblox_kb.sharding import ShardMap
+
+
+class ShardedChunkCacheRepo:
+    """
+    Chunk cache spread over the item shards: each entry lives on its item's shard.
+
+    Writes are routed by ``item_id``/``owner_user_id``. Reads are routed by ``item_id`` under the
+    ``item_hash`` strategy and fan out in parallel under ``owner`` (reads carry no owner).
+    Maintenance methods run on every shard.
+    """
+
+    def __init__(self, shards: Mapping[str, ChunkCacheRepo], shard_map: ShardMap) -> None:
+        missing = set(shard_map.shard_names) - set(shards)
+        if missing:
+            raise ValueError(f"no repo for shards: {sorted(missing)}")
+        self.shards = dict(shards)
+        self.shard_map = shard_map
+
+    async def get_cached_chunks(
+        self,
+        item_id: UUID,
+        content_hash: str,
+        chunker_id: str,
+        embed_model_id: str | None,
+        ttl_seconds: int | None = None,
+    ) -> list[dict]:
+        found = await self.get_cached_chunks_many([(item_id, content_hash)], chunker_id, embed_model_id, ttl_seconds)
+        return found.get((item_id, content_hash), [])
+
+    async def get_cached_chunks_many(
+        self,
+        keys: Iterable[tuple[UUID, str]],
+        chunker_id: str,
+        embed_model_id: str | None,
+        ttl_seconds: int | None = None,
+    ) -> dict[tuple[UUID, str], list[dict]]:
+        results = await asyncio.gather(
+            *(
+                self.shards[name].get_cached_chunks_many(shard_keys, chunker_id, embed_model_id, ttl_seconds)
+                for name, shard_keys in self._keys_by_shard(keys).items()
+            )
+        )
+        return {key: rows for found in results for key, rows in found.items()}
+
+    async def get_cached_keys(
+        self,
+        keys: Iterable[tuple[UUID, str]],
+        chunker_id: str,
+        embed_model_id: str | None,
+    ) -> set[tuple[UUID, str]]:
+        results = await asyncio.gather(
+            *(
+                self.shards[name].get_cached_keys(shard_keys, chunker_id, embed_model_id)
+                for name, shard_keys in self._keys_by_shard(keys).items()
+            )
+        )
+        return set().union(*results)
+
+    async def link_cached_content(
+        self,
+        entries: Iterable[dict],
+        chunker_id: str,
+        embed_model_id: str | None,
+    ) -> set[tuple[UUID, str]]:
+        by_shard: dict[str, list[dict]] = {}
+        for entry in entries:
+            by_shard.setdefault(self._shard_for(entry["item_id"], entry["owner_user_id"]), []).append(entry)
+        results = await asyncio.gather(
+            *(
+                self.shards[name].link_cached_content(shard_entries, chunker_id, embed_model_id)
+                for name, shard_entries in by_shard.items()
+            )
+        )
+        return set().union(*results)
+
+    async def write_cached_chunks(
+        self,
+        item_id: UUID,
+        owner_user_id: UUID,
+        content_hash: str,
+        chunker_id: str,
+        embed_model_id: str | None,
+        chunks: Iterable[dict],
+    ) -> None:
+        rows = [cache_row(item_id, owner_user_id, content_hash, chunker_id, embed_model_id, c) for c in chunks]
+        await self.write_cache_rows(rows)
+
+    async def write_cache_rows(self, rows: list[dict]) -> None:
+        by_shard: dict[str, list[dict]] = {}
+        for row in rows:
+            by_shard.setdefault(self._shard_for(row["item_id"], row["owner_user_id"]), []).append(row)
+        await asyncio.gather(*(self.shards[name].write_cache_rows(r) for name, r in by_shard.items()))
+
+    async def delete_expired(self, ttl_seconds: int, batch_size: int = 500) -> int:
+        return sum(await asyncio.gather(*(r.delete_expired(ttl_seconds, batch_size) for r in self.shards.values())))
+
+    async def delete_superseded(self, batch_size: int = 500) -> int:
+        return sum(await asyncio.gather(*(r.delete_superseded(batch_size) for r in self.shards.values())))
+
+    async def delete_orphans(self, batch_size: int = 500) -> int:
+        return sum(await asyncio.gather(*(r.delete_orphans(batch_size) for r in self.shards.values())))
+
+    async def cache_usage_by_owner(self) -> dict[UUID, int]:
+        usage: dict[UUID, int] = {}
+        for shard_usage in await asyncio.gather(*(r.cache_usage_by_owner() for r in self.shards.values())):
+            for owner, total in shard_usage.items():
+                usage[owner] = usage.get(owner, 0) + total
+        return usage
+
+    async def flush_touches(self) -> int:
+        return sum(await asyncio.gather(*(r.flush_touches() for r in self.shards.values())))
+
+    async def evict_lru(self, owner_user_id: UUID, bytes_to_free: int, batch_size: int = 500) -> tuple[int, int]:
+        if self.shard_map.strategy == "owner":
+            names = [self.shard_map.shard_for_owner(owner_user_id)]
+        else:
+            names = self.shard_map.shard_names
+        entries, freed = 0, 0
+        for name in names:
+            if freed >= bytes_to_free:
+                break
+            shard_entries, shard_freed = await self.shards[name].evict_lru(owner_user_id, bytes_to_free - freed, batch_size)
+            entries += shard_entries
+            freed += shard_freed
+        return entries, freed
+
+    def _shard_for(self, item_id: UUID, owner_user_id: UUID) -> str:
+        return self.shard_map.shard_for_item(item_id, owner_user_id)
+
+    def _keys_by_shard(self, keys: Iterable[tuple[UUID, str]]) -> dict[str, list[tuple[UUID, str]]]:
+        by_shard: dict[str, list[tuple[UUID, str]]] = {}
+        for key in keys:
+            shard = self.shard_map.shard_for_item(key[0])
+            for name in [shard] if shard else self.shard_map.shard_names:
+                by_shard.setdefault(name, []).append(key)
+        return by_shard
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Mapping, Sequence
+from uuid import UUID
+
+from aiblox_kb.models import KbItem
+from aiblox_kb.repos.item_repo import ItemRepo
+from aiblox_kb.sharding import ShardMap, ShardResult, merge_top_k
+
+
+class ShardedItemRepo:
+    """
+    ``ItemRepo`` over several databases, one ``ItemRepo`` per shard.
+
+    Searches fan out in parallel to the shards the filters require (see ``ShardMap``).
+    ``search_fts_by_shard`` / ``search_vec_by_shard`` return each shard's top-k with its latency
+    so callers can merge and report; ``search_fts`` / ``search_vec`` return the merged global
+    top-k. A failing shard is reported in its ``ShardResult`` and contributes no results.
+    """
+
+    def __init__(self, shards: Mapping[str, ItemRepo], shard_map: ShardMap) -> None:
+        missing = set(shard_map.shard_names) - set(shards)
+        if missing:
+            raise ValueError(f"no repo for shards: {sorted(missing)}")
+        self.shards = dict(shards)
+        self.shard_map = shard_map
+
+    @property
+    def require_owner(self) -> bool:
+        return any(repo.require_owner for repo in self.shards.values())
+
+    async def search_fts_by_shard(self, query_text: str, prefs) -> list[ShardResult]:
+        self._check_owner(prefs)
+        return await self._fan_out(
+            self.shard_map.shards_for_filters(prefs.filters),
+            lambda repo: repo.search_fts(query_text, prefs),
+        )
+
+    async def search_vec_by_shard(self, query_vector, prefs) -> list[ShardResult]:
+        self._check_owner(prefs)
+        return await self._fan_out(
+            self.shard_map.shards_for_filters(prefs.filters),
+            lambda repo: repo.search_vec(query_vector, prefs),
+        )
+
+    async def search_fts(self, query_text: str, prefs) -> list[tuple[str, float]]:
+        per_shard = await self.search_fts_by_shard(query_text, prefs)
+        return merge_top_k((r.results for r in per_shard), prefs.top_k_items)
+
+    async def search_vec(self, query_vector, prefs) -> list[tuple[str, float]]:
+        per_shard = await self.search_vec_by_shard(query_vector, prefs)
+        return merge_top_k((r.results for r in per_shard), prefs.top_k_items)
+
+    async def fetch_items_by_ids(
+        self,
+        item_ids: Iterable[UUID],
+        owner_user_id: UUID | None = None,
+        max_content_chars: int | None = None,
+    ) -> list[KbItem]:
+        item_ids = list(item_ids)
+        if not item_ids:
+            return []
+        by_shard: dict[str, list[UUID]] = {}
+        for item_id in item_ids:
+            for name in self._shards_for_item(item_id, owner_user_id):
+                by_shard.setdefault(name, []).append(item_id)
+        results = await asyncio.gather(
+            *(
+                self.shards[name].fetch_items_by_ids(ids, owner_user_id, max_content_chars)
+                for name, ids in by_shard.items()
+            )
+        )
+        return [item for items in results for item in items]
+
+    async def fetch_content_slices(
+        self,
+        spans: Iterable[tuple[UUID, int, int]],
+        owner_user_id: UUID | None = None,
+    ) -> dict[tuple[UUID, int, int], str]:
+        by_shard: dict[str, list[tuple[UUID, int, int]]] = {}
+        for span in spans:
+            for name in self._shards_for_item(span[0], owner_user_id):
+                by_shard.setdefault(name, []).append(span)
+        results = await asyncio.gather(
+            *(self.shards[name].fetch_content_slices(shard_spans, owner_user_id) for name, shard_spans in by_shard.items())
+        )
+        return {span: text for found in results for span, text in found.items()}
+
+    async def list_items_updated_after(
+        self,
+        updated_after: datetime | None,
+        after_id: UUID | None,
+        limit: int,
+        min_age: timedelta | None = None,
+    ) -> list[KbItem]:
+        """Keyset page across shards: each shard's first ``limit`` rows merged by ``(updated_at, id)``."""
+        pages = await asyncio.gather(
+            *(repo.list_items_updated_after(updated_after, after_id, limit, min_age) for repo in self.shards.values())
+        )
+        merged = sorted((item for page in pages for item in page), key=lambda i: (i.updated_at, i.id))
+        return merged[:limit]
+
+    async def iter_items(
+        self,
+        columns: Sequence[str] | None = None,
+        owner_user_id: UUID | None = None,
+        updated_since: datetime | None = None,
+        page_size: int = 1000,
+        all_owners: bool = False,
+    ) -> AsyncIterator[Any]:
+        """``ItemRepo.iter_items`` over the shards holding the owner, merged in ``(updated_at, id)`` order."""
+        filters = {"owner_user_id": owner_user_id} if owner_user_id is not None else None
+        streams = [
+            self.shards[name].iter_items(columns, owner_user_id, updated_since, page_size, all_owners=all_owners)
+            for name in self.shard_map.shards_for_filters(filters)
+        ]
+        # One buffered head per shard keeps memory at one page per shard.
+        heads: dict[int, Any] = {}
+        for index, stream in enumerate(streams):
+            head = await anext(stream, None)
+            if head is not None:
+                heads[index] = head
+        while heads:
+            index = min(heads, key=lambda i: (heads[i].updated_at, heads[i].id))
+            yield heads[index]
+            head = await anext(streams[index], None)
+            if head is None:
+                del heads[index]
+            else:
+                heads[index] = head
+
+    def _shards_for_item(self, item_id: UUID, owner_user_id: UUID | None) -> list[str]:
+        shard = self.shard_map.shard_for_item(item_id, owner_user_id)
+        return [shard] if shard else self.shard_map.shard_names
+
+    def _check_owner(self, prefs) -> None:
+        # Checked before fanning out: a shard's own check would only surface as a shard error.
+        owner = prefs.filters.get("owner_user_id") if prefs.filters else None
+        if self.require_owner and not isinstance(owner, (UUID, str)):
+            raise ValueError("owner_user_id is required for kb_items reads (require_owner=True)")
+
+    async def _fan_out(
+        self,
+        shard_names: list[str],
+        call: Callable[[ItemRepo], Awaitable[list]],
+    ) -> list[ShardResult]:
+        async def run(name: str) -> ShardResult:
+            start = time.perf_counter()
+            try:
+                results = await call(self.shards[name])
+            except Exception as exc:  # noqa: BLE001
+                return ShardResult(shard=name, elapsed_ms=(time.perf_counter() - start) * 1000, error=repr(exc))
+            return ShardResult(shard=name, results=list(results), elapsed_ms=(time.perf_counter() - start) * 1000)
+
+        return list(await asyncio.gather(*(run(name) for name in shard_names)))
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass, field
+from typing import Iterable, Literal, Mapping, Sequence
+from uuid import UUID
+
+ShardStrategy = Literal["item_hash", "owner"]
+
+
+def _as_uuid(value: UUID | str) -> UUID:
+    return value if isinstance(value, UUID) else UUID(str(value))
+
+
+class ShardMap:
+    """
+    Placement of items across shards.
+
+    ``item_hash`` spreads items by ``item_id``; every search fans out to all shards, but an item's
+    shard is known from its id alone. ``owner`` keeps each owner's items on one shard (explicit
+    ``owner_assignments`` first, then a hash of ``owner_user_id``), so owner-filtered searches hit a
+    single shard while item-keyed lookups without an owner fan out.
+    """
+
+    def __init__(
+        self,
+        shard_names: Sequence[str],
+        strategy: ShardStrategy = "item_hash",
+        owner_assignments: Mapping[UUID, str] | None = None,
+    ) -> None:
+        if not shard_names:
+            raise ValueError("ShardMap needs at least one shard")
+        if strategy not in ("item_hash", "owner"):
+            raise ValueError(f"unsupported shard strategy: {strategy}")
+        self.shard_names = list(shard_names)
+        self.strategy = strategy
+        self.owner_assignments = {_as_uuid(k): v for k, v in (owner_assignments or {}).items()}
+        unknown = set(self.owner_assignments.values()) - set(self.shard_names)
+        if unknown:
+            raise ValueError(f"owner assignments name unknown shards: {sorted(unknown)}")
+
+    def shard_for_owner(self, owner_user_id: UUID | str) -> str:
+        owner = _as_uuid(owner_user_id)
+        assigned = self.owner_assignments.get(owner)
+        if assigned is not None:
+            return assigned
+        return self.shard_names[owner.int % len(self.shard_names)]
+
+    def shard_for_item(self, item_id: UUID | str, owner_user_id: UUID | str | None = None) -> str | None:
+        """Shard holding an item, or None if it cannot be known without the owner."""
+        if self.strategy == "item_hash":
+            return self.shard_names[_as_uuid(item_id).int % len(self.shard_names)]
+        if owner_user_id is not None:
+            return self.shard_for_owner(owner_user_id)
+        return None
+
+    def shards_for_filters(self, filters: Mapping[str, object] | None) -> list[str]:
+        """Shards a search with these filters must visit."""
+        owner = (filters or {}).get("owner_user_id")
+        if self.strategy == "owner" and isinstance(owner, (UUID, str)):
+            return [self.shard_for_owner(owner)]
+        return list(self.shard_names)
+
+
+@dataclass
+class ShardResult:
+    shard: str
+    results: list = field(default_factory=list)
+    elapsed_ms: float = 0.0
+    error: str | None = None
+
+
+def merge_top_k(per_shard: Iterable[Sequence[tuple]], top_k: int) -> list[tuple]:
+    """
+    Merge per-shard ``(item_id, score)`` lists into the global top-k by score.
+
+    Text rank and vector similarity are computed per document, not from corpus statistics, so
+    scores are comparable across shards and the first ``top_k`` of each shard suffice.
+    """
+    ordered = [sorted(results, key=lambda r: r[1], reverse=True) for results in per_shard]
+    merged: list[tuple] = []
+    seen: set = set()
+    for row in heapq.merge(*ordered, key=lambda r: r[1], reverse=True):
+        if row[0] in seen:
+            continue
+        seen.add(row[0])
+        merged.append(row)
+        if len(merged) >= top_k:
+            break
+    return merged
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar, Token
+from typing import AsyncIterator, Awaitable, Callable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+_current: ContextVar["UnitOfWork | None"] = ContextVar("aiblox_kb_unit_of_work", default=None)
+
+
+class UnitOfWork:
+    """
+    Request-scoped session shared by every repo call made inside it.
+
+    While active, repo reads bound to the same ``session_factory`` run on one session, so a
+    retrieval checks out one pooled connection and starts one transaction instead of one per call.
+    With ``read_only=True`` the transaction is ``READ ONLY``; incidental writes that repos make on
+    read paths (e.g. cache access stamps) are deferred and applied in a single write transaction
+    when the unit of work exits. Writes that need their own transaction always open a new session.
+
+    Statements on the shared session are serialized by a lock, since an ``AsyncSession`` (and the
+    asyncpg connection beneath it) runs one statement at a time; asyncpg has no pipeline mode, so
+    round trips are saved by batching statements in the repos rather than by pipelining.
+
+    Exiting always finishes the transaction and closes the session, even if the exiting task is
+    cancelled again meanwhile, so a cancelled request does not strand its pooled connection.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession] | None, read_only: bool = True) -> None:
+        self.session_factory = session_factory
+        self.read_only = read_only
+        self.lock = asyncio.Lock()
+        self._session: AsyncSession | None = None
+        self._deferred: list[tuple[Callable[[], AsyncSession], object]] = []
+        self._token: Token | None = None
+
+    def owns(self, session_factory: Callable[[], AsyncSession] | None) -> bool:
+        return session_factory is not None and session_factory is self.session_factory
+
+    def defer(self, stmt, session_factory: Callable[[], AsyncSession] | None = None) -> None:
+        """
+        Queue a write statement to run after the unit of work's transaction ends, on
+        ``session_factory`` (the primary when reads go to replicas) or the unit of work's own.
+        """
+        self._deferred.append((session_factory or self.session_factory, stmt))
+
+    async def session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self.session_factory()
+            if self.read_only:
+                await self._session.execute(text("SET TRANSACTION READ ONLY"))
+        return self._session
+
+    async def __aenter__(self) -> "UnitOfWork":
+        if self.session_factory is not None:
+            self._token = _current.set(self)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if self._token is not None:
+            _current.reset(self._token)
+            self._token = None
+        session, self._session = self._session, None
+        if session is not None:
+            # Committing (rather than rolling back) keeps loaded objects usable afterwards.
+            await _run_to_completion(_end_session(session, commit=exc_type is None))
+        deferred, self._deferred = self._deferred, []
+        if deferred and exc_type is None:
+            by_factory: dict[Callable[[], AsyncSession], list] = {}
+            for factory, stmt in deferred:
+                by_factory.setdefault(factory, []).append(stmt)
+            for factory, stmts in by_factory.items():
+                async with factory() as write_session:
+                    async with write_session.begin():
+                        for stmt in stmts:
+                            await write_session.execute(stmt)
+
+
+async def _end_session(session: AsyncSession, commit: bool) -> None:
+    try:
+        if commit:
+            await session.commit()
+        else:
+            await session.rollback()
+    finally:
+        await session.close()
+
+
+async def _run_to_completion(coro: Awaitable[None]) -> None:
+    """
+    Await ``coro`` in a task of its own that the caller's cancellation cannot interrupt, then
+    re-raise that cancellation. A request cancelled again while its unit of work is rolling back
+    still returns the connection to the pool before unwinding.
+    """
+    task = asyncio.ensure_future(coro)
+    cancelled: asyncio.CancelledError | None = None
+    while not task.done():
+        try:
+            await asyncio.shield(task)
+        except asyncio.CancelledError as exc:
+            cancelled = exc
+    task.result()
+    if cancelled is not None:
+        raise cancelled
+
+
+def current_unit_of_work() -> UnitOfWork | None:
+    return _current.get()
+
+
+@asynccontextmanager
+async def repo_session(session_factory: Callable[[], AsyncSession]) -> AsyncIterator[AsyncSession]:
+    """Yield the ambient unit-of-work session for ``session_factory``, or a new session."""
+    uow = current_unit_of_work()
+    if uow is not None and uow.owns(session_factory):
+        async with uow.lock:
+            yield await uow.session()
+        return
+    async with session_factory() as session:
+        yield session
@@ -28,6 +28,8 @@ if config.config_file_name is not None:
 settings = load_settings()
 target_metadata = Base.metadata
 config.attributes["schema"] = settings.db_schema
+config.attributes["fts_config"] = settings.fts_config
+config.attributes["item_partitions"] = settings.item_partitions
 
 
 def run_migrations_offline() -> None:
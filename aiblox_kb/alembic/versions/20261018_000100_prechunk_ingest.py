@@ -0,0 +1,89 @@
+"""Chunk embeddings, item embeddings and ingest checkpoints for pre-chunking."""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "20261018_000100"
+down_revision = "20250101_000000"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    schema = op.get_context().config.attributes.get("schema", None) or "kb"
+
+    op.add_column(
+        "kb_chunk_cache",
+        sa.Column("embedding", postgresql.ARRAY(sa.Float()), nullable=True),
+        schema=schema,
+    )
+    op.create_index(
+        "ix_kb_items_updated_at_id",
+        "kb_items",
+        ["updated_at", "id"],
+        unique=False,
+        schema=schema,
+    )
+
+    op.create_table(
+        "kb_item_embeddings",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column("item_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("owner_user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("content_hash", sa.Text(), nullable=False),
+        sa.Column("embed_model_id", sa.Text(), nullable=False),
+        sa.Column("embedding", postgresql.ARRAY(sa.Float()), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["item_id"], [f"{schema}.kb_items.id"], ondelete="CASCADE"),
+        schema=schema,
+    )
+    op.create_index(
+        "uq_kb_item_embeddings_item_model",
+        "kb_item_embeddings",
+        ["item_id", "embed_model_id"],
+        unique=True,
+        schema=schema,
+    )
+    op.create_index(
+        "ix_kb_item_embeddings_owner_user_id",
+        "kb_item_embeddings",
+        ["owner_user_id"],
+        unique=False,
+        schema=schema,
+    )
+
+    op.create_table(
+        "kb_ingest_checkpoints",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column("worker_name", sa.Text(), nullable=False),
+        sa.Column("last_updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_item_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("processed_count", sa.BigInteger(), server_default=sa.text("0"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        schema=schema,
+    )
+    op.create_index(
+        "uq_kb_ingest_checkpoints_worker_name",
+        "kb_ingest_checkpoints",
+        ["worker_name"],
+        unique=True,
+        schema=schema,
+    )
+
+
+def downgrade() -> None:
+    schema = op.get_context().config.attributes.get("schema", None) or "kb"
+    op.drop_index("uq_kb_ingest_checkpoints_worker_name", table_name="kb_ingest_checkpoints", schema=schema)
+    op.drop_table("kb_ingest_checkpoints", schema=schema)
+
+    op.drop_index("ix_kb_item_embeddings_owner_user_id", table_name="kb_item_embeddings", schema=schema)
+    op.drop_index("uq_kb_item_embeddings_item_model", table_name="kb_item_embeddings", schema=schema)
+    op.drop_table("kb_item_embeddings", schema=schema)
+
+    op.drop_index("ix_kb_items_updated_at_id", table_name="kb_items", schema=schema)
+    op.drop_column("kb_chunk_cache", "embedding", schema=schema)
@@ -0,0 +1,85 @@
+"""Content-addressed chunk store shared across items."""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "20261018_000200"
+down_revision = "20261018_000100"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    schema = op.get_context().config.attributes.get("schema", None) or "kb"
+
+    op.create_table(
+        "kb_chunk_store",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column("content_hash", sa.Text(), nullable=False),
+        sa.Column("chunker_id", sa.Text(), nullable=False),
+        sa.Column("embed_model_id", sa.Text(), nullable=False),
+        sa.Column("chunk_index", sa.Integer(), nullable=False),
+        sa.Column("chunk_text", sa.Text(), nullable=False),
+        sa.Column("start_idx", sa.Integer(), nullable=True),
+        sa.Column("end_idx", sa.Integer(), nullable=True),
+        sa.Column("token_count", sa.Integer(), nullable=True),
+        sa.Column("embedding", postgresql.ARRAY(sa.Float()), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        schema=schema,
+    )
+    op.create_index(
+        "uq_kb_chunk_store_entry",
+        "kb_chunk_store",
+        ["content_hash", "chunker_id", "embed_model_id", "chunk_index"],
+        unique=True,
+        schema=schema,
+    )
+
+    op.create_table(
+        "kb_item_chunk_refs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column("item_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("owner_user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("content_hash", sa.Text(), nullable=False),
+        sa.Column("chunker_id", sa.Text(), nullable=False),
+        sa.Column("embed_model_id", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["item_id"], [f"{schema}.kb_items.id"], ondelete="CASCADE"),
+        schema=schema,
+    )
+    op.create_index(
+        "uq_kb_item_chunk_refs_entry",
+        "kb_item_chunk_refs",
+        ["item_id", "content_hash", "chunker_id", "embed_model_id"],
+        unique=True,
+        schema=schema,
+    )
+    op.create_index(
+        "ix_kb_item_chunk_refs_content",
+        "kb_item_chunk_refs",
+        ["content_hash", "chunker_id", "embed_model_id"],
+        unique=False,
+        schema=schema,
+    )
+    op.create_index(
+        "ix_kb_item_chunk_refs_owner_user_id",
+        "kb_item_chunk_refs",
+        ["owner_user_id"],
+        unique=False,
+        schema=schema,
+    )
+
+
+def downgrade() -> None:
+    schema = op.get_context().config.attributes.get("schema", None) or "kb"
+    op.drop_index("ix_kb_item_chunk_refs_owner_user_id", table_name="kb_item_chunk_refs", schema=schema)
+    op.drop_index("ix_kb_item_chunk_refs_content", table_name="kb_item_chunk_refs", schema=schema)
+    op.drop_index("uq_kb_item_chunk_refs_entry", table_name="kb_item_chunk_refs", schema=schema)
+    op.drop_table("kb_item_chunk_refs", schema=schema)
+
+    op.drop_index("uq_kb_chunk_store_entry", table_name="kb_chunk_store", schema=schema)
+    op.drop_table("kb_chunk_store", schema=schema)
@@ -0,0 +1,59 @@
+"""Packed per-item chunk cache layout (one row per item version)."""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "20261018_000300"
+down_revision = "20261018_000200"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    schema = op.get_context().config.attributes.get("schema", None) or "kb"
+
+    op.create_table(
+        "kb_chunk_cache_packed",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column("item_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("owner_user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("content_hash", sa.Text(), nullable=False),
+        sa.Column("chunker_id", sa.Text(), nullable=False),
+        sa.Column("embed_model_id", sa.Text(), nullable=False),
+        sa.Column("chunk_count", sa.Integer(), nullable=False),
+        sa.Column("chunk_indexes", postgresql.ARRAY(sa.Integer()), nullable=False),
+        sa.Column("start_idxs", postgresql.ARRAY(sa.Integer()), nullable=False),
+        sa.Column("end_idxs", postgresql.ARRAY(sa.Integer()), nullable=False),
+        sa.Column("token_counts", postgresql.ARRAY(sa.Integer()), nullable=False),
+        sa.Column("chunk_texts", postgresql.ARRAY(sa.Text()), nullable=False),
+        sa.Column("embedding_dim", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column("embeddings", postgresql.BYTEA(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["item_id"], [f"{schema}.kb_items.id"], ondelete="CASCADE"),
+        schema=schema,
+    )
+    op.create_index(
+        "uq_kb_chunk_cache_packed_entry",
+        "kb_chunk_cache_packed",
+        ["item_id", "content_hash", "chunker_id", "embed_model_id"],
+        unique=True,
+        schema=schema,
+    )
+    op.create_index(
+        "ix_kb_chunk_cache_packed_owner_user_id",
+        "kb_chunk_cache_packed",
+        ["owner_user_id"],
+        unique=False,
+        schema=schema,
+    )
+
+
+def downgrade() -> None:
+    schema = op.get_context().config.attributes.get("schema", None) or "kb"
+    op.drop_index("ix_kb_chunk_cache_packed_owner_user_id", table_name="kb_chunk_cache_packed", schema=schema)
+    op.drop_index("uq_kb_chunk_cache_packed_entry", table_name="kb_chunk_cache_packed", schema=schema)
+    op.drop_table("kb_chunk_cache_packed", schema=schema)
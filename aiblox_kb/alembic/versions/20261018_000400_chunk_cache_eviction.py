@@ -0,0 +1,58 @@
+"""Track last access and size of chunk-cache entries for TTL and quota eviction."""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261018_000400"
+down_revision = "20261018_000300"
+branch_labels = None
+depends_on = None
+
+_SIZED_TABLES = ("kb_chunk_cache", "kb_chunk_cache_packed")
+_TRACKED_TABLES = _SIZED_TABLES + ("kb_item_chunk_refs",)
+
+
+def upgrade() -> None:
+    schema = op.get_context().config.attributes.get("schema", None) or "kb"
+
+    for table in _TRACKED_TABLES:
+        op.add_column(
+            table,
+            sa.Column("last_accessed_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+            schema=schema,
+        )
+        op.create_index(f"ix_{table}_owner_last_accessed", table, ["owner_user_id", "last_accessed_at"], schema=schema)
+        op.create_index(f"ix_{table}_created_at", table, ["created_at"], schema=schema)
+    for table in _SIZED_TABLES:
+        op.add_column(
+            table,
+            sa.Column("byte_size", sa.Integer(), server_default=sa.text("0"), nullable=False),
+            schema=schema,
+        )
+
+    op.execute(
+        sa.text(
+            f'UPDATE "{schema}".kb_chunk_cache '
+            "SET byte_size = octet_length(chunk_text) + 8 * coalesce(array_length(embedding, 1), 0)"
+        )
+    )
+    op.execute(
+        sa.text(
+            f'UPDATE "{schema}".kb_chunk_cache_packed '
+            "SET byte_size = (SELECT coalesce(sum(octet_length(t)), 0) FROM unnest(chunk_texts) AS t)"
+            " + coalesce(octet_length(embeddings), 0)"
+        )
+    )
+
+
+def downgrade() -> None:
+    schema = op.get_context().config.attributes.get("schema", None) or "kb"
+    for table in _SIZED_TABLES:
+        op.drop_column(table, "byte_size", schema=schema)
+    for table in _TRACKED_TABLES:
+        op.drop_index(f"ix_{table}_created_at", table_name=table, schema=schema)
+        op.drop_index(f"ix_{table}_owner_last_accessed", table_name=table, schema=schema)
+        op.drop_column(table, "last_accessed_at", schema=schema)
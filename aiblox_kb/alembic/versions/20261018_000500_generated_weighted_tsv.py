@@ -0,0 +1,61 @@
+"""Generated, weighted kb_items.tsv and the upsert key for bulk ingest."""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from aiblox_kb.models import tsv_expression
+
+# revision identifiers, used by Alembic.
+revision = "20261018_000500"
+down_revision = "20261018_000400"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    attributes = op.get_context().config.attributes
+    schema = attributes.get("schema", None) or "kb"
+    config = attributes.get("fts_config", None) or "simple"
+
+    op.drop_index("ix_kb_items_tsv", table_name="kb_items", schema=schema)
+    op.drop_column("kb_items", "tsv", schema=schema)
+    op.add_column(
+        "kb_items",
+        sa.Column("tsv", postgresql.TSVECTOR(), sa.Computed(tsv_expression(config), persisted=True)),
+        schema=schema,
+    )
+    op.create_index("ix_kb_items_tsv", "kb_items", ["tsv"], unique=False, postgresql_using="gin", schema=schema)
+    # Existing duplicates would fail the unique index: keep the most recently updated item per
+    # (owner_user_id, source, source_ref); the others and their derived rows (cascade) go.
+    op.execute(
+        f"""
+        DELETE FROM "{schema}".kb_items AS dup
+        USING (
+            SELECT id, row_number() OVER (
+                PARTITION BY owner_user_id, source, source_ref ORDER BY updated_at DESC, id DESC
+            ) AS rank
+            FROM "{schema}".kb_items
+            WHERE source_ref IS NOT NULL
+        ) AS ranked
+        WHERE dup.id = ranked.id AND ranked.rank > 1
+        """
+    )
+    op.create_index(
+        "uq_kb_items_owner_source_ref",
+        "kb_items",
+        ["owner_user_id", "source", "source_ref"],
+        unique=True,
+        schema=schema,
+    )
+
+
+def downgrade() -> None:
+    schema = op.get_context().config.attributes.get("schema", None) or "kb"
+    op.drop_index("uq_kb_items_owner_source_ref", table_name="kb_items", schema=schema)
+    op.drop_index("ix_kb_items_tsv", table_name="kb_items", schema=schema)
+    op.drop_column("kb_items", "tsv", schema=schema)
+    op.add_column("kb_items", sa.Column("tsv", postgresql.TSVECTOR(), nullable=True), schema=schema)
+    op.create_index("ix_kb_items_tsv", "kb_items", ["tsv"], unique=False, postgresql_using="gin", schema=schema)
@@ -0,0 +1,29 @@
+"""GIN (jsonb_path_ops) index on kb_items.metadata for containment filters."""
+
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261018_000600"
+down_revision = "20261018_000500"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    schema = op.get_context().config.attributes.get("schema", None) or "kb"
+    op.create_index(
+        "ix_kb_items_metadata_path_ops",
+        "kb_items",
+        ["metadata"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"metadata": "jsonb_path_ops"},
+        schema=schema,
+    )
+
+
+def downgrade() -> None:
+    schema = op.get_context().config.attributes.get("schema", None) or "kb"
+    op.drop_index("ix_kb_items_metadata_path_ops", table_name="kb_items", schema=schema)
@@ -0,0 +1,139 @@
+"""Optionally hash-partition kb_items by owner_user_id (AIBLOX_KB_ITEM_PARTITIONS > 0).
+
+With partitions configured, kb_items becomes ``PARTITION BY HASH (owner_user_id)`` with
+``kb_items_p{n}`` partitions. Indexes are created on the parent and therefore exist per partition.
+The primary key becomes (id, owner_user_id), so tables referencing items switch to a composite
+(item_id, owner_user_id) foreign key. With 0 partitions (the default) this revision is a no-op;
+to partition later, downgrade to 20261018_000600 and upgrade again with the setting.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261018_000700"
+down_revision = "20261018_000600"
+branch_labels = None
+depends_on = None
+
+# Tables with an item_id -> kb_items.id foreign key; all of them also carry owner_user_id.
+_ITEM_CHILDREN = ("kb_chunk_cache", "kb_item_embeddings", "kb_item_chunk_refs", "kb_chunk_cache_packed")
+_COLUMNS = "id, owner_user_id, kind, source, source_ref, title, summary, content_text, content_hash, metadata, created_at, updated_at"
+
+
+def _partitions() -> int:
+    return int(op.get_context().config.attributes.get("item_partitions", None) or 0)
+
+
+def _tsv_expression(schema: str) -> str:
+    # Reuse the generated expression installed by 20261018_000500 (and its text search config).
+    bind = op.get_bind()
+    return bind.exec_driver_sql(
+        "SELECT pg_get_expr(d.adbin, d.adrelid) FROM pg_attrdef d "
+        "JOIN pg_attribute a ON a.attrelid = d.adrelid AND a.attnum = d.adnum "
+        f"WHERE d.adrelid = '\"{schema}\".kb_items'::regclass AND a.attname = 'tsv'"
+    ).scalar_one()
+
+
+def _create_items_table(schema: str, name: str, tsv_expression: str, partition_by: str = "") -> None:
+    pk = "id, owner_user_id" if partition_by else "id"
+    op.execute(
+        f"""
+        CREATE TABLE "{schema}".{name} (
+            id uuid NOT NULL,
+            owner_user_id uuid NOT NULL,
+            kind text NOT NULL,
+            source text NOT NULL,
+            source_ref text,
+            title text,
+            summary text,
+            content_text text NOT NULL,
+            content_hash text,
+            tsv tsvector GENERATED ALWAYS AS ({tsv_expression}) STORED,
+            metadata jsonb NOT NULL DEFAULT '{{}}'::jsonb,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            updated_at timestamptz NOT NULL DEFAULT now(),
+            CONSTRAINT {name}_pkey PRIMARY KEY ({pk})
+        ) {partition_by}
+        """
+    )
+
+
+def _swap_items_table(schema: str, new_name: str) -> None:
+    op.execute(f'INSERT INTO "{schema}".{new_name} ({_COLUMNS}) SELECT {_COLUMNS} FROM "{schema}".kb_items')
+    op.execute(f'DROP TABLE "{schema}".kb_items')
+    op.execute(f'ALTER TABLE "{schema}".{new_name} RENAME TO kb_items')
+    op.execute(f'ALTER TABLE "{schema}".kb_items RENAME CONSTRAINT {new_name}_pkey TO kb_items_pkey')
+    op.create_index("ix_kb_items_tsv", "kb_items", ["tsv"], postgresql_using="gin", schema=schema)
+    op.create_index("ix_kb_items_owner_user_id", "kb_items", ["owner_user_id"], schema=schema)
+    op.create_index("ix_kb_items_updated_at_id", "kb_items", ["updated_at", "id"], schema=schema)
+    op.create_index(
+        "uq_kb_items_owner_source_ref", "kb_items", ["owner_user_id", "source", "source_ref"], unique=True, schema=schema
+    )
+    op.create_index(
+        "ix_kb_items_metadata_path_ops",
+        "kb_items",
+        ["metadata"],
+        postgresql_using="gin",
+        postgresql_ops={"metadata": "jsonb_path_ops"},
+        schema=schema,
+    )
+
+
+def _drop_child_fks(schema: str) -> None:
+    for table in _ITEM_CHILDREN:
+        op.execute(f'ALTER TABLE "{schema}".{table} DROP CONSTRAINT IF EXISTS {table}_item_id_fkey')
+
+
+def upgrade() -> None:
+    partitions = _partitions()
+    if partitions <= 0:
+        return
+    schema = op.get_context().config.attributes.get("schema", None) or "kb"
+    tsv_expression = _tsv_expression(schema)
+
+    _drop_child_fks(schema)
+    _create_items_table(schema, "kb_items_partitioned", tsv_expression, "PARTITION BY HASH (owner_user_id)")
+    for remainder in range(partitions):
+        op.execute(
+            f'CREATE TABLE "{schema}".kb_items_p{remainder} PARTITION OF "{schema}".kb_items_partitioned '
+            f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+        )
+    _swap_items_table(schema, "kb_items_partitioned")
+    for table in _ITEM_CHILDREN:
+        op.create_foreign_key(
+            f"{table}_item_id_fkey",
+            table,
+            "kb_items",
+            ["item_id", "owner_user_id"],
+            ["id", "owner_user_id"],
+            source_schema=schema,
+            referent_schema=schema,
+            ondelete="CASCADE",
+        )
+
+
+def downgrade() -> None:
+    schema = op.get_context().config.attributes.get("schema", None) or "kb"
+    is_partitioned = op.get_bind().exec_driver_sql(
+        f"SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = '\"{schema}\".kb_items'::regclass)"
+    ).scalar_one()
+    if not is_partitioned:
+        return
+    tsv_expression = _tsv_expression(schema)
+
+    _drop_child_fks(schema)
+    _create_items_table(schema, "kb_items_plain", tsv_expression)
+    _swap_items_table(schema, "kb_items_plain")
+    for table in _ITEM_CHILDREN:
+        op.create_foreign_key(
+            f"{table}_item_id_fkey",
+            table,
+            "kb_items",
+            ["item_id"],
+            ["id"],
+            source_schema=schema,
+            referent_schema=schema,
+            ondelete="CASCADE",
+        )
@@ -0,0 +1,28 @@
+"""Generated kb_items.content_length (characters of content_text).
+
+Lets readers decide whether to load ``content_text`` or only slices of it without detoasting the
+text. Adding a stored generated column rewrites kb_items once.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261018_000800"
+down_revision = "20261018_000700"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    schema = op.get_context().config.attributes.get("schema", None) or "kb"
+    op.execute(
+        f'ALTER TABLE "{schema}".kb_items '
+        "ADD COLUMN content_length integer GENERATED ALWAYS AS (char_length(content_text)) STORED"
+    )
+
+
+def downgrade() -> None:
+    schema = op.get_context().config.attributes.get("schema", None) or "kb"
+    op.drop_column("kb_items", "content_length", schema=schema)
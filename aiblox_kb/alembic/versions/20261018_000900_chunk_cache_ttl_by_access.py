@@ -0,0 +1,31 @@
+"""Index chunk-cache entries by last access instead of creation.
+
+TTL expiry now removes entries that have not been read for the TTL, so the sweeper scans
+``last_accessed_at``; the ``created_at`` indexes added for it in 000400 are no longer used.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261018_000900"
+down_revision = "20261018_000800"
+branch_labels = None
+depends_on = None
+
+_TRACKED_TABLES = ("kb_chunk_cache", "kb_chunk_cache_packed", "kb_item_chunk_refs")
+
+
+def upgrade() -> None:
+    schema = op.get_context().config.attributes.get("schema", None) or "kb"
+    for table in _TRACKED_TABLES:
+        op.create_index(f"ix_{table}_last_accessed", table, ["last_accessed_at"], schema=schema)
+        op.drop_index(f"ix_{table}_created_at", table_name=table, schema=schema)
+
+
+def downgrade() -> None:
+    schema = op.get_context().config.attributes.get("schema", None) or "kb"
+    for table in _TRACKED_TABLES:
+        op.create_index(f"ix_{table}_created_at", table, ["created_at"], schema=schema)
+        op.drop_index(f"ix_{table}_last_accessed", table_name=table, schema=schema)
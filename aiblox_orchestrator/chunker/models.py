@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import hashlib
+import json
 from typing import List, Optional
 
 from pydantic import BaseModel, Field
@@ -22,3 +24,16 @@ class ChunkingOptions(BaseModel):
     max_chunk_chars: Optional[int] = None
     overlap_chars: Optional[int] = None
     strategy: Optional[str] = None
+
+
+def cache_chunker_id(chunker_id: str, options: ChunkingOptions) -> str:
+    """
+    Chunker id under which chunks made with ``options`` are cached. Default options keep the
+    plain chunker id; any other options get a short digest suffix, so entries chunked
+    differently never share a cache key.
+    """
+    changed = options.model_dump(exclude_defaults=True)
+    if not changed:
+        return chunker_id
+    digest = hashlib.sha256(json.dumps(changed, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    return f"{chunker_id}#{digest}"
@@ -11,6 +11,10 @@ class Chunker(Protocol):
     def chunk(self, text: str, options: ChunkingOptions) -> List[Chunk]:
         ...
 
+    def span_text(self, text: str) -> str:
+        """Rebuild a chunk's text from the source slice ``text[start_idx:end_idx]``."""
+        ...
+
 
 class ChunkerRegistry(Protocol):
     def get(self, chunker_id: str) -> Chunker: ...
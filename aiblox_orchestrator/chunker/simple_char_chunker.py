@@ -39,3 +39,6 @@ class SimpleCharChunker(Chunker):
                 break
             idx = max(0, end - overlap)
         return chunks
+
+    def span_text(self, text: str) -> str:
+        return text
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import re
 from typing import List
 
 from aiblox_orchestrator.chunker.models import Chunk, ChunkingOptions
@@ -15,12 +16,16 @@ class SimpleTokenLikeChunker(Chunker):
 
     chunker_id = "simple_token_like@v1"
 
+    _TOKEN = re.compile(r"\S+")
+
     def chunk(self, text: str, options: ChunkingOptions) -> List[Chunk]:
         if not text:
             return []
         max_tokens = options.max_chunk_tokens or 200
         overlap_tokens = options.overlap_tokens or 0
-        tokens = text.split()
+        # Token spans give each chunk its start/end offsets in the source text.
+        spans = [m.span() for m in self._TOKEN.finditer(text)]
+        tokens = [text[a:b] for a, b in spans]
         chunks: List[Chunk] = []
         start = 0
         chunk_index = 0
@@ -33,8 +38,8 @@ class SimpleTokenLikeChunker(Chunker):
                     Chunk(
                         chunk_index=chunk_index,
                         text=chunk_text,
-                        start_idx=None,
-                        end_idx=None,
+                        start_idx=spans[start][0],
+                        end_idx=spans[end - 1][1],
                         token_count=len(chunk_tokens),
                     )
                 )
@@ -43,3 +48,7 @@ class SimpleTokenLikeChunker(Chunker):
                 break
             start = max(0, end - overlap_tokens)
         return chunks
+
+    def span_text(self, text: str) -> str:
+        """Chunk text for a ``text[start_idx:end_idx]`` slice (whitespace is collapsed)."""
+        return " ".join(text.split())
@@ -0,0 +1 @@
+"""WebSocket gateway helpers: admission control and outbound event delivery."""
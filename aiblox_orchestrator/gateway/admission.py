@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Hashable
+
+from aiblox_orchestrator.observability.metrics import MetricsRegistry, get_metrics
+
+
+class Overloaded(Exception):
+    """Raised when a request is not admitted; ``reason`` names the limit, ``retry_after_s`` hints a backoff."""
+
+    def __init__(self, reason: str, retry_after_s: float) -> None:
+        self.reason = reason
+        self.retry_after_s = retry_after_s
+        super().__init__(f"overloaded: {reason}")
+
+
+class AdmissionController:
+    """
+    Admission control for requests entering the gateway.
+
+    At most ``max_concurrent`` requests run per process. Beyond that, requests wait FIFO in a
+    queue of ``max_queue`` for up to ``queue_timeout_s``; a full queue or an expired wait
+    rejects. Requests over ``max_per_connection`` (per websocket) or ``max_per_owner`` (running
+    plus queued; ``0`` disables either) are rejected immediately, without queueing. A queued
+    request whose ``cancelled`` event is set leaves the queue at once with ``CancelledError``.
+
+    Metrics: ``admission_active`` / ``admission_queue_depth`` gauges, ``admission_admitted`` and
+    ``admission_rejected{reason=...}`` counters, ``admission_queue_wait_seconds`` summary.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 64,
+        max_per_connection: int = 8,
+        max_per_owner: int = 16,
+        max_queue: int = 128,
+        queue_timeout_s: float = 5.0,
+        retry_after_s: float = 1.0,
+        metrics: MetricsRegistry | None = None,
+    ) -> None:
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be >= 1")
+        self.max_concurrent = max_concurrent
+        self.max_per_connection = max_per_connection
+        self.max_per_owner = max_per_owner
+        self.max_queue = max_queue
+        self.queue_timeout_s = queue_timeout_s
+        self.retry_after_s = retry_after_s
+        self.metrics = metrics or get_metrics()
+        self.active = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._per_connection: Dict[Hashable, int] = {}
+        self._per_owner: Dict[Hashable, int] = {}
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def admit(
+        self,
+        connection_id: Hashable,
+        owner: Hashable | None = None,
+        cancelled: asyncio.Event | None = None,
+    ) -> AsyncIterator[None]:
+        """Hold an admission slot for the body; raises ``Overloaded`` if not admitted."""
+        await self.acquire(connection_id, owner, cancelled)
+        try:
+            yield
+        finally:
+            self.release(connection_id, owner)
+
+    async def acquire(
+        self,
+        connection_id: Hashable,
+        owner: Hashable | None = None,
+        cancelled: asyncio.Event | None = None,
+    ) -> None:
+        if self.max_per_connection and self._per_connection.get(connection_id, 0) >= self.max_per_connection:
+            self._reject("connection_limit")
+        if owner is not None and self.max_per_owner and self._per_owner.get(owner, 0) >= self.max_per_owner:
+            self._reject("owner_limit")
+        if self.active < self.max_concurrent and not self._waiters:
+            self._hold(connection_id, owner)
+            self.active += 1
+            self._admitted(0.0)
+            return
+        if len(self._waiters) >= self.max_queue:
+            self._reject("queue_full")
+
+        self._hold(connection_id, owner)
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._publish()
+        start = time.perf_counter()
+        # asyncio.wait never cancels the waiter itself, so a handed-over slot is seen below.
+        stop = asyncio.ensure_future(cancelled.wait()) if cancelled is not None else None
+        try:
+            done, _ = await asyncio.wait(
+                {waiter, stop} if stop is not None else {waiter},
+                timeout=self.queue_timeout_s,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if cancelled is not None and cancelled.is_set():
+                raise asyncio.CancelledError("cancelled while queued for admission")
+            if waiter not in done:
+                raise asyncio.TimeoutError
+        except BaseException as exc:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the wait ended; pass it on.
+                self.active -= 1
+                self._wake_next()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            self._unhold(connection_id, owner)
+            self._publish()
+            if isinstance(exc, asyncio.TimeoutError):
+                self._reject("queue_timeout")
+            raise
+        finally:
+            if stop is not None:
+                stop.cancel()
+        self._admitted(time.perf_counter() - start)
+
+    def release(self, connection_id: Hashable, owner: Hashable | None = None) -> None:
+        self._unhold(connection_id, owner)
+        self.active -= 1
+        self._wake_next()
+        self._publish()
+
+    def _wake_next(self) -> None:
+        while self._waiters and self.active < self.max_concurrent:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.active += 1
+                waiter.set_result(None)
+
+    def _hold(self, connection_id: Hashable, owner: Hashable | None) -> None:
+        self._per_connection[connection_id] = self._per_connection.get(connection_id, 0) + 1
+        if owner is not None:
+            self._per_owner[owner] = self._per_owner.get(owner, 0) + 1
+
+    def _unhold(self, connection_id: Hashable, owner: Hashable | None) -> None:
+        for counts, key in ((self._per_connection, connection_id), (self._per_owner, owner)):
+            if key is None or key not in counts:
+                continue
+            counts[key] -= 1
+            if counts[key] <= 0:
+                del counts[key]
+
+    def _admitted(self, waited_s: float) -> None:
+        self.metrics.inc("admission_admitted")
+        self.metrics.observe("admission_queue_wait_seconds", waited_s)
+        self._publish()
+
+    def _reject(self, reason: str) -> None:
+        self.metrics.inc("admission_rejected", reason=reason)
+        raise Overloaded(reason, self.retry_after_s)
+
+    def _publish(self) -> None:
+        self.metrics.set_gauge("admission_active", self.active)
+        self.metrics.set_gauge("admission_queue_depth", len(self._waiters))
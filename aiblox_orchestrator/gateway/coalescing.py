@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List
+
+from aiblox_orchestrator.observability.metrics import MetricsRegistry, get_metrics
+from aiblox_orchestrator.protocol.event_sink import EventSink
+from aiblox_orchestrator.protocol.events import EventEnvelope
+
+
+@dataclass
+class _TokenBatch:
+    first: EventEnvelope
+    last_seq: int
+    last_ts: datetime
+    tokens: List[str] = field(default_factory=list)
+    size: int = 0
+
+
+class CoalescingEventSink(EventSink):
+    """
+    Sink that batches ``rag.token`` events per request into ``rag.tokens`` frames.
+
+    A batch is sent after ``flush_interval_s``, once it reaches ``max_batch_bytes``, or before
+    any other event of the same request, so events stay in ``seq`` order. A ``rag.tokens``
+    event carries ``seq`` of its last token and ``payload = {"tokens": [...], "first_seq": n}``;
+    together the two cover every token seq. A batch of one token is sent as the original
+    ``rag.token``.
+
+    Sends are serialized. While one is in progress, a request whose batch is full waits in
+    ``emit``. A slow socket therefore slows token producers down instead of letting batches grow,
+    and each request buffers at most ``max_batch_bytes``.
+    """
+
+    def __init__(
+        self,
+        inner: EventSink,
+        flush_interval_s: float = 0.02,
+        max_batch_bytes: int = 4096,
+        metrics: MetricsRegistry | None = None,
+    ) -> None:
+        self.inner = inner
+        self.flush_interval_s = flush_interval_s
+        self.max_batch_bytes = max_batch_bytes
+        self.metrics = metrics or get_metrics()
+        self._batches: Dict[str, _TokenBatch] = {}
+        self._timers: Dict[str, asyncio.Task] = {}
+        self._send_lock = asyncio.Lock()
+
+    async def emit(self, event: EventEnvelope) -> None:
+        token = (event.payload or {}).get("token") if event.type == "rag.token" else None
+        if not isinstance(token, str):
+            async with self._send_lock:
+                await self._flush_locked(event.request_id)
+                await self.inner.emit(event)
+            return
+
+        batch = self._batches.get(event.request_id)
+        if batch is None:
+            batch = self._batches[event.request_id] = _TokenBatch(first=event, last_seq=event.seq, last_ts=event.ts)
+            if event.request_id not in self._timers:
+                self._timers[event.request_id] = asyncio.create_task(self._flush_later(event.request_id))
+        batch.tokens.append(token)
+        batch.last_seq = event.seq
+        batch.last_ts = event.ts
+        batch.size += len(token.encode())
+        if batch.size >= self.max_batch_bytes:
+            async with self._send_lock:
+                await self._flush_locked(event.request_id)
+
+    async def flush(self) -> None:
+        """Send every pending batch."""
+        async with self._send_lock:
+            for request_id in list(self._batches):
+                await self._flush_locked(request_id)
+
+    async def aclose(self, flush: bool = True) -> None:
+        """Stop flush timers and send pending batches, or drop them (``flush=False``, socket gone)."""
+        timers = list(self._timers.values())
+        for task in timers:
+            task.cancel()
+        await asyncio.gather(*timers, return_exceptions=True)
+        self._timers.clear()
+        if flush:
+            await self.flush()
+        else:
+            self._batches.clear()
+
+    async def _flush_later(self, request_id: str) -> None:
+        try:
+            await asyncio.sleep(self.flush_interval_s)
+        finally:
+            self._timers.pop(request_id, None)
+        async with self._send_lock:
+            await self._flush_locked(request_id)
+
+    async def _flush_locked(self, request_id: str) -> None:
+        batch = self._batches.pop(request_id, None)
+        if batch is None:
+            return
+        self.metrics.observe("ws_token_batch_size", len(batch.tokens))
+        if len(batch.tokens) == 1:
+            await self.inner.emit(batch.first)
+            return
+        await self.inner.emit(
+            EventEnvelope(
+                type="rag.tokens",
+                request_id=request_id,
+                seq=batch.last_seq,
+                ts=batch.last_ts,
+                payload={"tokens": batch.tokens, "first_seq": batch.first.seq},
+            )
+        )
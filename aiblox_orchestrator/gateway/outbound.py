@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Iterable
+
+from aiblox_orchestrator.protocol.event_sink import EventSink
+from aiblox_orchestrator.protocol.events import EventEnvelope
+
+# Small, latency-sensitive events; everything else (sources, results, messages) is bulk.
+PRIORITY_EVENT_TYPES = frozenset({"rag.token", "rag.tokens", "rag.started", "rag.done", "rag.error"})
+
+
+@dataclass
+class _RequestQueue:
+    events: Deque[EventEnvelope] = field(default_factory=deque)
+    deficit: int = 0
+    space: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class OutboundScheduler(EventSink):
+    """
+    Per-connection outbound scheduler: one queue per request, one writer task.
+
+    ``emit`` only enqueues; it waits solely when its request already has
+    ``max_queued_per_request`` events queued, never on the socket. The writer serves requests
+    by deficit round-robin: each turn a request earns ``quantum`` credits, a priority event
+    (tokens, started/done/error) costs 1 and any other event ``bulk_cost``. A request streaming
+    tokens therefore keeps flowing while another sends large ``rag.sources`` payloads. Events
+    of one request keep their order.
+
+    If sending fails (socket gone), queued events are dropped and later ``emit`` calls raise.
+    """
+
+    def __init__(
+        self,
+        inner: EventSink,
+        max_queued_per_request: int = 256,
+        quantum: int = 4,
+        bulk_cost: int = 4,
+        priority_types: Iterable[str] = PRIORITY_EVENT_TYPES,
+    ) -> None:
+        if max_queued_per_request < 1:
+            raise ValueError("max_queued_per_request must be >= 1")
+        self.inner = inner
+        self.max_queued_per_request = max_queued_per_request
+        self.quantum = quantum
+        self.bulk_cost = bulk_cost
+        self.priority_types = frozenset(priority_types)
+        self._queues: Dict[str, _RequestQueue] = {}
+        self._rotation: Deque[str] = deque()
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._writer: asyncio.Task | None = None
+        self._error: BaseException | None = None
+
+    @property
+    def queued(self) -> int:
+        return sum(len(queue.events) for queue in self._queues.values())
+
+    async def emit(self, event: EventEnvelope) -> None:
+        while True:
+            if self._error is not None:
+                raise self._error
+            queue = self._queue(event.request_id)
+            if len(queue.events) < self.max_queued_per_request:
+                break
+            queue.space.clear()
+            await queue.space.wait()
+        queue.events.append(event)
+        self._idle.clear()
+        self._wakeup.set()
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._run())
+
+    async def drain(self) -> None:
+        """Wait until every queued event has been sent (or sending failed)."""
+        await self._idle.wait()
+
+    async def aclose(self) -> None:
+        """Stop the writer; events still queued are dropped."""
+        if self._writer is not None:
+            self._writer.cancel()
+            await asyncio.gather(self._writer, return_exceptions=True)
+            self._writer = None
+        self._fail(ConnectionError("outbound scheduler closed"))
+
+    def _queue(self, request_id: str) -> _RequestQueue:
+        queue = self._queues.get(request_id)
+        if queue is None:
+            queue = self._queues[request_id] = _RequestQueue()
+            self._rotation.append(request_id)
+        return queue
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                if not self._rotation:
+                    self._idle.set()
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+                # Only the writer removes from the rotation, so its head stays put across sends.
+                request_id = self._rotation[0]
+                queue = self._queues[request_id]
+                queue.deficit += self.quantum
+                while queue.events:
+                    cost = 1 if queue.events[0].type in self.priority_types else self.bulk_cost
+                    if cost > queue.deficit:
+                        break
+                    event = queue.events.popleft()
+                    queue.deficit -= cost
+                    queue.space.set()
+                    await self.inner.emit(event)
+                self._rotation.popleft()
+                if queue.events:
+                    self._rotation.append(request_id)
+                else:
+                    del self._queues[request_id]
+        except Exception as exc:  # noqa: BLE001
+            self._fail(exc)
+
+    def _fail(self, exc: BaseException) -> None:
+        if self._error is None:
+            self._error = exc
+        for queue in self._queues.values():
+            queue.events.clear()
+            queue.space.set()
+        self._queues.clear()
+        self._rotation.clear()
+        self._idle.set()
@@ -0,0 +1,78 @@
+"""In-process metrics registry (counters, gauges, summaries) exported as a JSON snapshot."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+@dataclass
+class Summary:
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+
+def _series_name(name: str, labels: LabelKey) -> str:
+    if not labels:
+        return name
+    return name + "{" + ",".join(f"{k}={v}" for k, v in labels) + "}"
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class MetricsRegistry:
+    """Minimal metrics store. Single event loop, so no locking is needed."""
+
+    def __init__(self) -> None:
+        self._counters: Dict[Tuple[str, LabelKey], float] = {}
+        self._gauges: Dict[Tuple[str, LabelKey], float] = {}
+        self._summaries: Dict[Tuple[str, LabelKey], Summary] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels: object) -> None:
+        key = (name, _label_key(labels))
+        self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: object) -> None:
+        self._gauges[(name, _label_key(labels))] = float(value)
+
+    def observe(self, name: str, value: float, **labels: object) -> None:
+        key = (name, _label_key(labels))
+        summary = self._summaries.get(key)
+        if summary is None:
+            summary = self._summaries[key] = Summary()
+        summary.observe(float(value))
+
+    def counter_value(self, name: str, **labels: object) -> float:
+        return self._counters.get((name, _label_key(labels)), 0.0)
+
+    def gauge_value(self, name: str, **labels: object) -> float | None:
+        return self._gauges.get((name, _label_key(labels)))
+
+    def snapshot(self) -> dict:
+        return {
+            "counters": {_series_name(n, l): v for (n, l), v in self._counters.items()},
+            "gauges": {_series_name(n, l): v for (n, l), v in self._gauges.items()},
+            "summaries": {
+                _series_name(n, l): {"count": s.count, "sum": s.total, "max": s.max}
+                for (n, l), s in self._summaries.items()
+            },
+        }
+
+
+_default_registry = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Process-wide default registry; components accept an explicit registry for tests."""
+    return _default_registry
@@ -5,6 +5,19 @@ class OrchestratorError(Exception):
 class RequiredStepFailed(OrchestratorError):
     """Raised when a required step fails and execution must halt."""
 
+    code = "required_step_failed"
+
     def __init__(self, step_id: str, message: str | None = None) -> None:
         self.step_id = step_id
         super().__init__(message or f"Required step failed: {step_id}")
+
+
+class StepTimedOut(RequiredStepFailed):
+    """Raised when a required step runs past its timeout or the request deadline."""
+
+    code = "step_timeout"
+
+    def __init__(self, step_id: str, timeout_s: float | None = None) -> None:
+        self.timeout_s = timeout_s
+        budget = f" after {timeout_s:.3f}s" if timeout_s is not None else ""
+        super().__init__(step_id, f"Required step timed out{budget}: {step_id}")
@@ -26,6 +26,10 @@ class ValidationResult(BaseModel):
     details: dict = Field(default_factory=dict)
 
 
+# Components receive the step's context: ``ctx.remaining_s()`` is the time left for the step
+# (its timeout or the request deadline, whichever is sooner), to bound outbound calls with.
+
+
 class DSPyRuntime(Protocol):
     async def stream_answer(
         self,
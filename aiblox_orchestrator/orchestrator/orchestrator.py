@@ -2,23 +2,56 @@ from __future__ import annotations
 
 import asyncio
 from dataclasses import dataclass, field
-from typing import Dict, List
+from typing import Dict, Iterable, List
 
-from aiblox_orchestrator.orchestrator.errors import RequiredStepFailed
+from aiblox_orchestrator.observability.metrics import MetricsRegistry, get_metrics
+from aiblox_orchestrator.orchestrator.errors import RequiredStepFailed, StepTimedOut
+from aiblox_orchestrator.orchestrator.speculation import SpeculativeRetrieval
 from aiblox_orchestrator.orchestrator.step_runner import StepRunner, StepState
 from aiblox_orchestrator.protocol.context import ConversationWindow, ProductProfile, RequestContext, UserInput
 from aiblox_orchestrator.protocol.event_sink import EventSink
 from aiblox_orchestrator.protocol.events import EventEnvelope
-from aiblox_orchestrator.protocol.plans import ExecutionPlan
+from aiblox_orchestrator.protocol.plans import ExecutionPlan, PlanStep
 from aiblox_orchestrator.router.decision_router import DecisionRouter
 
 
 class Orchestrator:
-    """Execution engine that runs ExecutionPlans and emits events."""
+    """
+    Execution engine that runs ExecutionPlans and emits events.
 
-    def __init__(self, decision_router: DecisionRouter, step_runner: StepRunner) -> None:
+    Plans are scheduled as a DAG over ``depends_on``: a step starts as soon as its dependencies
+    have finished, so independent steps run concurrently, at most ``max_parallel_steps`` at a
+    time per request (``1`` runs steps one by one in plan order).
+
+    Each step is bounded by the sooner of its ``timeout_s`` and the request's ``deadline``; the
+    step sees that budget as its context's deadline. A timed-out optional step is treated as
+    skipped, a timed-out required step ends the request with ``rag.error`` code ``step_timeout``.
+
+    For requests whose mode is in ``speculative_modes``, retrieval for the user text starts before
+    routing (see ``SpeculativeRetrieval``), with the prefs the router will give the retrieve step
+    (gate adjustments included). A matching retrieve step adopts it; it is cancelled when the plan
+    has no retrieve step or the step's prefs differ, before the step searches itself.
+
+    Step tasks are bound to the request context, so ``ctx.cancel()`` cancels them where they
+    are: a pending DB query, embedding batch or tool call is interrupted rather than awaited
+    (asyncpg cancels the query server-side), and the step's resources are released on unwind.
+    """
+
+    def __init__(
+        self,
+        decision_router: DecisionRouter,
+        step_runner: StepRunner,
+        max_parallel_steps: int = 4,
+        metrics: MetricsRegistry | None = None,
+        speculative_modes: Iterable[str] = (),
+    ) -> None:
+        if max_parallel_steps < 1:
+            raise ValueError("max_parallel_steps must be >= 1")
         self.decision_router = decision_router
         self.step_runner = step_runner
+        self.max_parallel_steps = max_parallel_steps
+        self.metrics = metrics or get_metrics()
+        self.speculative_modes = {mode.lower() for mode in speculative_modes}
 
     async def run(
         self,
@@ -29,38 +62,74 @@ class Orchestrator:
         event_sink: EventSink,
     ) -> None:
         seq = 0
+        # Concurrent steps share one sink; the lock keeps delivery order equal to seq order.
+        emit_lock = asyncio.Lock()
 
         async def emit(event_type: str, payload: dict | None = None) -> None:
             nonlocal seq
-            seq += 1
-            await event_sink.emit(
-                EventEnvelope(
-                    type=event_type,
-                    request_id=ctx.request_id,
-                    seq=seq,
-                    payload=payload,
+            async with emit_lock:
+                seq += 1
+                await event_sink.emit(
+                    EventEnvelope(
+                        type=event_type,
+                        request_id=ctx.request_id,
+                        seq=seq,
+                        payload=payload,
+                    )
                 )
-            )
 
         await emit("rag.started", {"status": "running"})
 
+        speculative: SpeculativeRetrieval | None = None
         try:
+            speculative = self._speculate(ctx, user_input, conversation)
             plan = self.decision_router.build_plan(
                 ctx=ctx,
                 user_input=user_input,
                 conversation=conversation,
                 product_profile=product_profile,
             )
-            await self._execute_plan(ctx, plan, user_input, emit)
+            if user_input.debug:
+                await emit("rag.debug", self._plan_summary(plan))
+            if speculative is not None and not any(step.kind == "retrieve" for step in plan.steps):
+                await speculative.discard()
+            await self._execute_plan(ctx, plan, user_input, emit, speculative)
             await emit("rag.done", {"status": "ok"})
         except asyncio.CancelledError:
             await emit("rag.done", {"status": "cancelled"})
         except RequiredStepFailed as exc:
-            await emit("rag.error", {"message": str(exc), "step_id": exc.step_id})
+            await emit("rag.error", {"message": str(exc), "step_id": exc.step_id, "code": exc.code})
             await emit("rag.done", {"status": "error"})
         except Exception as exc:  # noqa: BLE001
             await emit("rag.error", {"message": str(exc)})
             await emit("rag.done", {"status": "error"})
+        finally:
+            if speculative is not None:
+                await speculative.discard()
+
+    @staticmethod
+    def _plan_summary(plan: ExecutionPlan) -> dict:
+        return {
+            "plan_id": plan.plan_id,
+            "steps": [
+                {"step_id": step.step_id, "kind": step.kind, "required": step.required, "depends_on": list(step.depends_on)}
+                for step in plan.steps
+            ],
+            "metadata": plan.metadata,
+        }
+
+    def _speculate(
+        self,
+        ctx: RequestContext,
+        user_input: UserInput,
+        conversation: ConversationWindow,
+    ) -> SpeculativeRetrieval | None:
+        mode = (user_input.mode or "chat").lower()
+        if mode not in self.speculative_modes:
+            return None
+        prefs_data = self.decision_router.retrieval_prefs(user_input, conversation)
+        prefs = self.step_runner.retrieval_prefs(prefs_data, user_input)
+        return SpeculativeRetrieval(self.step_runner.retriever, ctx, prefs, mode, self.metrics)
 
     async def _execute_plan(
         self,
@@ -68,29 +137,97 @@ class Orchestrator:
         plan: ExecutionPlan,
         user_input: UserInput,
         emit,
+        speculative: SpeculativeRetrieval | None = None,
     ) -> None:
         statuses: Dict[str, str] = {}
         required_map: Dict[str, bool] = {step.step_id: step.required for step in plan.steps}
-        state = StepState()
-
-        for step in plan.steps:
-            if ctx.cancelled():
-                raise asyncio.CancelledError()
-            if not self._dependencies_satisfied(step, statuses, required_map):
-                statuses[step.step_id] = "skipped"
-                continue
-
-            status = await self.step_runner.run_step(ctx, step, user_input, state, emit)
-            statuses[step.step_id] = status
-            if status == "failed" and step.required:
-                raise RequiredStepFailed(step.step_id)
-
-    def _dependencies_satisfied(self, step, statuses: Dict[str, str], required_map: Dict[str, bool]) -> bool:
-        if not step.depends_on:
-            return True
+        state = StepState(speculative_retrieval=speculative)
+        pending: List[PlanStep] = list(plan.steps)
+        running: Dict[asyncio.Task, PlanStep] = {}
+
+        try:
+            while pending or running:
+                if ctx.cancelled():
+                    raise asyncio.CancelledError()
+                self._start_ready_steps(ctx, pending, running, statuses, required_map, user_input, state, emit)
+                if not running:
+                    # Whatever is left waits on itself (a cycle); it can never run.
+                    for step in pending:
+                        statuses[step.step_id] = "skipped"
+                    break
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=lambda t: plan.steps.index(running[t])):
+                    step = running.pop(task)
+                    status = task.result()
+                    statuses[step.step_id] = status
+                    if status == "failed" and step.required:
+                        raise RequiredStepFailed(step.step_id)
+        finally:
+            # A required failure, an error or cancellation stops the plan: cancel in-flight siblings.
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+    def _start_ready_steps(
+        self,
+        ctx: RequestContext,
+        pending: List[PlanStep],
+        running: Dict[asyncio.Task, PlanStep],
+        statuses: Dict[str, str],
+        required_map: Dict[str, bool],
+        user_input: UserInput,
+        state: StepState,
+        emit,
+    ) -> None:
+        progressed = True
+        while progressed:
+            # Skipping a step can settle the dependencies of later ones, so repeat until stable.
+            progressed = False
+            for step in list(pending):
+                readiness = self._readiness(step, statuses, required_map)
+                if readiness == "skip":
+                    pending.remove(step)
+                    statuses[step.step_id] = "skipped"
+                    progressed = True
+                elif readiness == "ready" and len(running) < self.max_parallel_steps:
+                    pending.remove(step)
+                    task = asyncio.create_task(self._run_step(ctx, step, user_input, state, emit))
+                    ctx.bind_task(task)
+                    running[task] = step
+
+    async def _run_step(
+        self,
+        ctx: RequestContext,
+        step: PlanStep,
+        user_input: UserInput,
+        state: StepState,
+        emit,
+    ) -> str:
+        step_ctx = ctx.with_timeout(step.timeout_s)
+        budget = step_ctx.remaining_s()
+        try:
+            if budget is None:
+                return await self.step_runner.run_step(step_ctx, step, user_input, state, emit)
+            if budget <= 0:
+                raise TimeoutError()
+            async with asyncio.timeout(budget):
+                return await self.step_runner.run_step(step_ctx, step, user_input, state, emit)
+        except TimeoutError:
+            self.metrics.inc("orchestrator_step_timeouts", kind=step.kind)
+            if step.required:
+                raise StepTimedOut(step.step_id, max(budget, 0.0)) from None
+            return "timed_out"
+
+    def _readiness(self, step: PlanStep, statuses: Dict[str, str], required_map: Dict[str, bool]) -> str:
+        """``ready``, ``wait`` (a dependency is still pending or running) or ``skip``."""
+        waiting = False
         for dep in step.depends_on:
+            if dep not in required_map:
+                return "skip"
             if dep not in statuses:
-                return False
-            if statuses[dep] == "failed" and required_map.get(dep, True):
-                return False
-        return True
+                waiting = True
+            elif statuses[dep] == "failed" and required_map[dep]:
+                return "skip"
+        return "wait" if waiting else "ready"
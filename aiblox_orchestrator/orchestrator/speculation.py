@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import asyncio
+
+from aiblox_orchestrator.observability.metrics import MetricsRegistry
+from aiblox_orchestrator.protocol.context import RequestContext
+from aiblox_orchestrator.retriever.models import RetrievalBundle, RetrievalPrefs
+from aiblox_orchestrator.retriever.protocols import Retriever
+
+
+class SpeculativeRetrieval:
+    """
+    Retrieval started when a request arrives, before the plan is known.
+
+    A retrieve step whose prefs equal the speculated ones adopts the running search (a hit)
+    instead of starting its own; one whose prefs differ, or a plan without a retrieve step,
+    cancels it with ``discard`` (waste). Counters
+    ``speculative_retrieval_{started,hits,wasted}`` and the ``speculative_retrieval_hit_ratio`` /
+    ``speculative_retrieval_waste_ratio`` gauges are kept per mode.
+    """
+
+    def __init__(
+        self,
+        retriever: Retriever,
+        ctx: RequestContext,
+        prefs: RetrievalPrefs,
+        mode: str,
+        metrics: MetricsRegistry,
+    ) -> None:
+        self.prefs = prefs
+        self.mode = mode
+        self.metrics = metrics
+        self._settled = False
+        self.task: asyncio.Task[RetrievalBundle] = asyncio.create_task(retriever.search(ctx, prefs))
+        ctx.bind_task(self.task)
+        metrics.inc("speculative_retrieval_started", mode=mode)
+
+    def take(self, prefs: RetrievalPrefs) -> asyncio.Task[RetrievalBundle] | None:
+        """The speculative search if it matches ``prefs`` and was not adopted or discarded yet."""
+        if self._settled or prefs != self.prefs:
+            return None
+        self._settled = True
+        self._record("speculative_retrieval_hits")
+        return self.task
+
+    async def discard(self) -> None:
+        if self._settled:
+            return
+        self._settled = True
+        self._record("speculative_retrieval_wasted")
+        self.task.cancel()
+        await asyncio.gather(self.task, return_exceptions=True)
+
+    def _record(self, counter: str) -> None:
+        self.metrics.inc(counter, mode=self.mode)
+        started = self.metrics.counter_value("speculative_retrieval_started", mode=self.mode)
+        hits = self.metrics.counter_value("speculative_retrieval_hits", mode=self.mode)
+        wasted = self.metrics.counter_value("speculative_retrieval_wasted", mode=self.mode)
+        self.metrics.set_gauge("speculative_retrieval_hit_ratio", hits / started, mode=self.mode)
+        self.metrics.set_gauge("speculative_retrieval_waste_ratio", wasted / started, mode=self.mode)
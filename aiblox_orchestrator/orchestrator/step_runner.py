@@ -2,15 +2,18 @@ from __future__ import annotations
 
 import asyncio
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 
 from aiblox_orchestrator.orchestrator.errors import RequiredStepFailed
 from aiblox_orchestrator.orchestrator.interfaces import AgentResult, AgentRunner, DSPyRuntime, ToolResult, ToolRunner, Validator
 from aiblox_orchestrator.protocol.context import RequestContext, UserInput
-from aiblox_orchestrator.protocol.plans import PlanStep
+from aiblox_orchestrator.protocol.plans import PlanStep, thaw
 from aiblox_orchestrator.retriever.models import CandidateItem, RetrievalBundle, RetrievalPrefs
 from aiblox_orchestrator.retriever.protocols import Retriever
 
+if TYPE_CHECKING:
+    from aiblox_orchestrator.orchestrator.speculation import SpeculativeRetrieval
+
 
 @dataclass
 class StepState:
@@ -18,10 +21,16 @@ class StepState:
     tool_results: List[ToolResult] = field(default_factory=list)
     agent_results: List[AgentResult] = field(default_factory=list)
     results_payload: dict = field(default_factory=dict)
+    speculative_retrieval: Optional["SpeculativeRetrieval"] = None
 
 
 class StepRunner:
-    """Runs individual ExecutionPlan steps."""
+    """
+    Runs individual ExecutionPlan steps.
+
+    Step params are frozen (they may be shared with the router's plan templates), so runners
+    receive a mutable copy.
+    """
 
     def __init__(
         self,
@@ -57,7 +66,7 @@ class StepRunner:
         if kind == "synthesize":
             return await self._run_synthesize(ctx, user_input, state, emit)
         if kind == "emit_results":
-            await emit("rag.results", step.params or {})
+            await emit("rag.results", thaw(step.params))
             return "completed"
         if kind == "finalize":
             return "completed"
@@ -71,27 +80,39 @@ class StepRunner:
         state: StepState,
         emit,
     ) -> str:
-        prefs_data = step.params.get("retrieval_prefs", {}) if step.params else {}
-        if "query_text" not in prefs_data:
-            prefs_data["query_text"] = user_input.text
-        prefs = RetrievalPrefs(**prefs_data)
-        bundle = await self.retriever.search(ctx, prefs)
+        prefs = self.retrieval_prefs(step.params.get("retrieval_prefs"), user_input)
+        speculation = state.speculative_retrieval
+        speculative = speculation.take(prefs) if speculation else None
+        if speculative is not None:
+            bundle = await speculative
+        else:
+            if speculation is not None:
+                # Different prefs: stop the speculative search before running a second one.
+                await speculation.discard()
+            bundle = await self.retriever.search(ctx, prefs)
         state.retrieval = bundle
         await emit("rag.sources", {"sources": self._pack_sources(bundle)})
         return "completed"
 
+    @staticmethod
+    def retrieval_prefs(prefs_data: dict | None, user_input: UserInput) -> RetrievalPrefs:
+        """RetrievalPrefs for a retrieve step; the query defaults to the user's text."""
+        prefs_data = thaw(prefs_data or {})
+        prefs_data.setdefault("query_text", user_input.text)
+        return RetrievalPrefs(**prefs_data)
+
     async def _run_tool_call(self, ctx: RequestContext, step: PlanStep, state: StepState) -> str:
-        result = await self.tool_runner.call(ctx, step.params or {})
+        result = await self.tool_runner.call(ctx, thaw(step.params))
         state.tool_results.append(result)
         return "completed" if result.success else "failed"
 
     async def _run_agent_run(self, ctx: RequestContext, step: PlanStep, state: StepState) -> str:
-        result = await self.agent_runner.run(ctx, step.params or {})
+        result = await self.agent_runner.run(ctx, thaw(step.params))
         state.agent_results.append(result)
         return "completed" if result.success else "failed"
 
     async def _run_validate(self, ctx: RequestContext, step: PlanStep) -> str:
-        validation = await self.validator.validate(ctx, step.params or {})
+        validation = await self.validator.validate(ctx, thaw(step.params))
         return "completed" if validation.success else "failed"
 
     async def _run_synthesize(
@@ -110,6 +131,8 @@ class StepRunner:
         ):
             if ctx.cancelled():
                 raise asyncio.CancelledError()
+            if ctx.expired():
+                raise TimeoutError()
             tokens.append(token)
             await emit("rag.token", {"token": token})
         if tokens:
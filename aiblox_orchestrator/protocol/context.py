@@ -1,8 +1,8 @@
 from __future__ import annotations
 
 import asyncio
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -13,10 +13,14 @@ class RequestContext(BaseModel):
     request_id: str
     trace_id: Optional[str] = None
     started_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # Absolute time by which the request must finish; None means unbounded.
+    deadline: Optional[datetime] = None
     metadata: Dict[str, Any] = Field(default_factory=dict)
     cancellation_event: asyncio.Event = Field(
         default_factory=asyncio.Event, exclude=True
     )
+    # Tasks doing this request's work; cancel() cancels them (see bind_task).
+    bound_tasks: Set[asyncio.Task] = Field(default_factory=set, exclude=True)
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
@@ -24,7 +28,43 @@ class RequestContext(BaseModel):
         return self.cancellation_event.is_set()
 
     def cancel(self) -> None:
+        """Set the cancellation event and cancel every bound task, interrupting whatever it awaits."""
         self.cancellation_event.set()
+        for task in list(self.bound_tasks):
+            task.cancel()
+
+    def bind_task(self, task: asyncio.Task) -> None:
+        """
+        Cancel ``task`` when this request is cancelled (at once if it already is). The task is
+        unbound when it finishes.
+        """
+        if self.cancelled():
+            task.cancel()
+            return
+        self.bound_tasks.add(task)
+        task.add_done_callback(self.bound_tasks.discard)
+
+    def remaining_s(self) -> Optional[float]:
+        """Seconds left before ``deadline`` (negative once passed), or None without a deadline."""
+        if self.deadline is None:
+            return None
+        return (self.deadline - datetime.now(timezone.utc)).total_seconds()
+
+    def expired(self) -> bool:
+        remaining = self.remaining_s()
+        return remaining is not None and remaining <= 0
+
+    def with_timeout(self, timeout_s: Optional[float]) -> "RequestContext":
+        """
+        Context whose deadline is the earlier of this one's and ``timeout_s`` from now. It shares
+        the cancellation event, bound tasks and metadata, so cancelling either cancels both.
+        """
+        if timeout_s is None:
+            return self
+        deadline = datetime.now(timezone.utc) + timedelta(seconds=timeout_s)
+        if self.deadline is not None and self.deadline <= deadline:
+            return self
+        return self.model_copy(update={"deadline": deadline})
 
 
 class UserInput(BaseModel):
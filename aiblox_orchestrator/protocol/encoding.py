@@ -0,0 +1,361 @@
+"""
+Wire encodings for EventEnvelope.
+
+``JsonEnvelopeEncoder`` writes the same JSON as ``json.dumps(event.model_dump(mode="json"))``
+without going through pydantic: the envelope's fixed head (type, protocol_version, request_id) is
+cached per request and only ``seq``, ``ts`` and the payload are encoded per event.
+``MsgpackEnvelopeEncoder`` writes the same document as MessagePack, for clients that negotiate
+the ``aiblox.msgpack.v1`` websocket subprotocol.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Dict, Protocol, Sequence, Tuple
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from aiblox_orchestrator.protocol.events import EventEnvelope
+
+JSON_SUBPROTOCOL = "aiblox.json.v1"
+MSGPACK_SUBPROTOCOL = "aiblox.msgpack.v1"
+
+_encode_str = json.encoder.encode_basestring_ascii  # type: ignore[attr-defined]
+
+
+class EnvelopeEncoder(Protocol):
+    binary: bool
+    subprotocol: str
+
+    def encode(self, event: EventEnvelope) -> str | bytes:
+        ...
+
+
+def _iso(value: datetime | date | time) -> str:
+    text = value.isoformat()
+    # pydantic renders UTC as "Z".
+    return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+
+def _json_default(value: Any) -> Any:
+    """Fallback for payload values ``json`` cannot encode, converted as pydantic's JSON mode does."""
+    if isinstance(value, (datetime, date, time)):
+        return _iso(value)
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class _HeadCache:
+    """Bounded cache of per-(request, type) envelope heads."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._heads: Dict[Tuple[str, str, str], Any] = {}
+
+    def get(self, event: EventEnvelope, build) -> Any:
+        key = (event.request_id, event.type, event.protocol_version)
+        head = self._heads.get(key)
+        if head is None:
+            if len(self._heads) >= self.max_entries:
+                self._heads.clear()
+            head = self._heads[key] = build(event)
+        return head
+
+
+class JsonEnvelopeEncoder:
+    binary = False
+    subprotocol = JSON_SUBPROTOCOL
+
+    def __init__(self, max_cached_heads: int = 1024) -> None:
+        self._heads = _HeadCache(max_cached_heads)
+
+    def encode(self, event: EventEnvelope) -> str:
+        head = self._heads.get(event, self._head)
+        payload = event.payload
+        if payload is None:
+            body = "null"
+        elif len(payload) == 1 and type(payload.get("token")) is str:
+            # The token stream: one string field, no need for the general encoder.
+            body = '{"token": ' + _encode_str(payload["token"]) + "}"
+        else:
+            body = json.dumps(payload, default=_json_default)
+        return f'{head}{event.seq}, "ts": "{_iso(event.ts)}", "payload": {body}}}'
+
+    @staticmethod
+    def _head(event: EventEnvelope) -> str:
+        return (
+            f'{{"type": {_encode_str(event.type)}, "protocol_version": {_encode_str(event.protocol_version)}, '
+            f'"request_id": {_encode_str(event.request_id)}, "seq": '
+        )
+
+
+class MsgpackEnvelopeEncoder:
+    binary = True
+    subprotocol = MSGPACK_SUBPROTOCOL
+
+    def __init__(self, max_cached_heads: int = 1024) -> None:
+        self._heads = _HeadCache(max_cached_heads)
+
+    def encode(self, event: EventEnvelope) -> bytes:
+        out = bytearray(self._heads.get(event, self._head))
+        _pack(out, "seq")
+        _pack(out, event.seq)
+        _pack(out, "ts")
+        _pack(out, _iso(event.ts))
+        _pack(out, "payload")
+        _pack(out, event.payload)
+        return bytes(out)
+
+    @staticmethod
+    def _head(event: EventEnvelope) -> bytes:
+        out = bytearray(b"\x86")  # fixmap, 6 entries
+        for key, value in (
+            ("type", event.type),
+            ("protocol_version", event.protocol_version),
+            ("request_id", event.request_id),
+        ):
+            _pack(out, key)
+            _pack(out, value)
+        return bytes(out)
+
+
+def packb(value: Any) -> bytes:
+    """MessagePack-encode JSON-like data (payload fallbacks as in the JSON encoder)."""
+    out = bytearray()
+    _pack(out, value)
+    return bytes(out)
+
+
+def _pack(out: bytearray, value: Any) -> None:
+    if value is None:
+        out.append(0xC0)
+    elif value is True:
+        out.append(0xC3)
+    elif value is False:
+        out.append(0xC2)
+    elif isinstance(value, int):
+        _pack_int(out, value)
+    elif isinstance(value, float):
+        out.append(0xCB)
+        out += struct.pack(">d", value)
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        n = len(data)
+        if n < 32:
+            out.append(0xA0 | n)
+        elif n < 0x100:
+            out += bytes((0xD9, n))
+        elif n < 0x10000:
+            out += b"\xda" + struct.pack(">H", n)
+        else:
+            out += b"\xdb" + struct.pack(">I", n)
+        out += data
+    elif isinstance(value, dict):
+        _pack_len(out, len(value), 0x80, 0xDE, 0xDF)
+        for key, item in value.items():
+            _pack(out, key if isinstance(key, str) else str(key))
+            _pack(out, item)
+    elif isinstance(value, (list, tuple)):
+        _pack_len(out, len(value), 0x90, 0xDC, 0xDD)
+        for item in value:
+            _pack(out, item)
+    else:
+        _pack(out, _json_default(value))
+
+
+def _pack_int(out: bytearray, value: int) -> None:
+    if 0 <= value < 0x80:
+        out.append(value)
+    elif -32 <= value < 0:
+        out.append(value & 0xFF)
+    elif 0 <= value < 0x100000000:
+        out += b"\xce" + struct.pack(">I", value)
+    elif 0 <= value < 0x10000000000000000:
+        out += b"\xcf" + struct.pack(">Q", value)
+    elif -0x8000000000000000 <= value < 0:
+        out += b"\xd3" + struct.pack(">q", value)
+    else:
+        raise OverflowError("integer out of MessagePack range")
+
+
+def _pack_len(out: bytearray, n: int, fix: int, marker16: int, marker32: int) -> None:
+    if n < 16:
+        out.append(fix | n)
+    elif n < 0x10000:
+        out.append(marker16)
+        out += struct.pack(">H", n)
+    else:
+        out.append(marker32)
+        out += struct.pack(">I", n)
+
+
+# Fixed-size scalars: marker -> (struct format, size).
+_SCALARS = {
+    0xCA: (">f", 4),
+    0xCB: (">d", 8),
+    0xCC: (">B", 1),
+    0xCD: (">H", 2),
+    0xCE: (">I", 4),
+    0xCF: (">Q", 8),
+    0xD0: (">b", 1),
+    0xD1: (">h", 2),
+    0xD2: (">i", 4),
+    0xD3: (">q", 8),
+}
+# Length-prefixed values: marker -> (length format, length size).
+_STR = {0xD9: (">B", 1), 0xDA: (">H", 2), 0xDB: (">I", 4)}
+_BIN = {0xC4: (">B", 1), 0xC5: (">H", 2), 0xC6: (">I", 4)}
+_ARRAY = {0xDC: (">H", 2), 0xDD: (">I", 4)}
+_MAP = {0xDE: (">H", 2), 0xDF: (">I", 4)}
+_EXT = {0xC7: (">B", 1), 0xC8: (">H", 2), 0xC9: (">I", 4)}
+_FIXEXT = {0xD4: 1, 0xD5: 2, 0xD6: 4, 0xD7: 8, 0xD8: 16}
+_TIMESTAMP_EXT = -1
+MAX_UNPACK_DEPTH = 64
+
+
+def unpackb(data: bytes, max_depth: int = MAX_UNPACK_DEPTH) -> Any:
+    """
+    Decode one MessagePack value (any format of the spec). bin becomes ``bytes`` and the timestamp
+    extension a UTC ``datetime``; other extension types, truncated or trailing data and nesting
+    deeper than ``max_depth`` raise ``ValueError``.
+    """
+    try:
+        value, offset = _unpack(memoryview(data), 0, max_depth)
+    except (IndexError, struct.error) as exc:
+        raise ValueError("truncated MessagePack data") from exc
+    except TypeError as exc:  # an array or map used as a map key
+        raise ValueError(f"invalid MessagePack map key: {exc}") from exc
+    if offset != len(data):
+        raise ValueError("trailing bytes after MessagePack value")
+    return value
+
+
+def _unpack(data: memoryview, offset: int, depth: int) -> Tuple[Any, int]:
+    marker = data[offset]
+    offset += 1
+    if marker < 0x80:
+        return marker, offset
+    if marker >= 0xE0:
+        return marker - 0x100, offset
+    if 0xA0 <= marker < 0xC0:
+        return _read_str(data, offset, marker & 0x1F)
+    if marker < 0xA0:
+        if depth <= 0:
+            raise ValueError("MessagePack value nested too deeply")
+        if marker < 0x90:
+            return _unpack_map(data, offset, marker & 0x0F, depth - 1)
+        return _unpack_array(data, offset, marker & 0x0F, depth - 1)
+    if marker == 0xC0:
+        return None, offset
+    if marker in (0xC2, 0xC3):
+        return marker == 0xC3, offset
+    if marker in _SCALARS:
+        fmt, size = _SCALARS[marker]
+        return struct.unpack_from(fmt, data, offset)[0], offset + size
+    if marker in _STR:
+        n, offset = _read_length(data, offset, _STR[marker])
+        return _read_str(data, offset, n)
+    if marker in _BIN:
+        n, offset = _read_length(data, offset, _BIN[marker])
+        return bytes(_read_bytes(data, offset, n)), offset + n
+    if marker in _ARRAY or marker in _MAP:
+        if depth <= 0:
+            raise ValueError("MessagePack value nested too deeply")
+        if marker in _ARRAY:
+            n, offset = _read_length(data, offset, _ARRAY[marker])
+            return _unpack_array(data, offset, n, depth - 1)
+        n, offset = _read_length(data, offset, _MAP[marker])
+        return _unpack_map(data, offset, n, depth - 1)
+    if marker in _FIXEXT or marker in _EXT:
+        if marker in _FIXEXT:
+            n = _FIXEXT[marker]
+        else:
+            n, offset = _read_length(data, offset, _EXT[marker])
+        ext_type = struct.unpack_from(">b", data, offset)[0]
+        payload = _read_bytes(data, offset + 1, n)
+        return _unpack_ext(ext_type, payload), offset + 1 + n
+    raise ValueError(f"unsupported MessagePack marker 0x{marker:02x}")
+
+
+def _read_length(data: memoryview, offset: int, spec: Tuple[str, int]) -> Tuple[int, int]:
+    fmt, size = spec
+    return struct.unpack_from(fmt, data, offset)[0], offset + size
+
+
+def _read_bytes(data: memoryview, offset: int, n: int) -> memoryview:
+    if offset + n > len(data):
+        raise ValueError("truncated MessagePack data")
+    return data[offset : offset + n]
+
+
+def _read_str(data: memoryview, offset: int, n: int) -> Tuple[str, int]:
+    try:
+        return str(_read_bytes(data, offset, n), "utf-8"), offset + n
+    except UnicodeDecodeError as exc:
+        raise ValueError(f"invalid UTF-8 in MessagePack string: {exc}") from exc
+
+
+def _unpack_ext(ext_type: int, payload: memoryview) -> Any:
+    if ext_type != _TIMESTAMP_EXT:
+        raise ValueError(f"unsupported MessagePack extension type {ext_type}")
+    if len(payload) == 4:
+        seconds, nanos = struct.unpack(">I", payload)[0], 0
+    elif len(payload) == 8:
+        value = struct.unpack(">Q", payload)[0]
+        seconds, nanos = value & 0x3_FFFF_FFFF, value >> 34
+    elif len(payload) == 12:
+        nanos, seconds = struct.unpack(">Iq", payload)
+    else:
+        raise ValueError("invalid MessagePack timestamp")
+    try:
+        return datetime.fromtimestamp(seconds, timezone.utc) + timedelta(microseconds=nanos // 1000)
+    except (OverflowError, OSError) as exc:
+        raise ValueError(f"MessagePack timestamp out of range: {exc}") from exc
+
+
+def _unpack_array(data: memoryview, offset: int, n: int, depth: int) -> Tuple[list, int]:
+    items = []
+    for _ in range(n):
+        item, offset = _unpack(data, offset, depth)
+        items.append(item)
+    return items, offset
+
+
+def _unpack_map(data: memoryview, offset: int, n: int, depth: int) -> Tuple[dict, int]:
+    result = {}
+    for _ in range(n):
+        key, offset = _unpack(data, offset, depth)
+        result[key], offset = _unpack(data, offset, depth)
+    return result, offset
+
+
+def negotiate_encoder(offered: Sequence[str], allow_binary: bool) -> EnvelopeEncoder:
+    """Pick the encoder for a websocket from the client's offered subprotocols."""
+    if allow_binary and MSGPACK_SUBPROTOCOL in offered:
+        return MsgpackEnvelopeEncoder()
+    return JsonEnvelopeEncoder()
+
+
+def decode_client_message(text: str | None, data: bytes | None) -> Dict[str, Any]:
+    """Decode an inbound websocket frame (JSON text or MessagePack bytes) into a message object."""
+    try:
+        message = json.loads(text) if text is not None else unpackb(data or b"")
+    except (ValueError, RecursionError) as exc:
+        raise ValueError(f"invalid message payload: {exc}") from exc
+    if not isinstance(message, dict):
+        raise ValueError("invalid message payload: expected an object")
+    return message
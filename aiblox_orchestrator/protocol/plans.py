@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from typing import Dict, List, Literal
+from types import MappingProxyType
+from typing import Any, Dict, List, Literal, Mapping, Optional, Tuple
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_serializer, field_validator
 
 
 PlanStepKind = Literal[
@@ -16,14 +17,49 @@ PlanStepKind = Literal[
 ]
 
 
+def freeze(value: Any) -> Any:
+    """Read-only deep copy: mappings become ``MappingProxyType``s, lists and tuples tuples."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Mutable deep copy of a ``freeze``d value: mappings become dicts, tuples lists."""
+    if isinstance(value, Mapping):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(item) for item in value]
+    return value
+
+
 class PlanStep(BaseModel):
-    """Single execution step in a plan."""
+    """
+    Single execution step in a plan. Deeply immutable: router templates share steps across
+    requests, so ``depends_on`` is a tuple and ``params`` is ``freeze``d; use ``thaw`` for a
+    mutable copy.
+    """
+
+    model_config = ConfigDict(frozen=True)
 
     step_id: str
     kind: PlanStepKind
     required: bool = True
-    depends_on: List[str] = Field(default_factory=list)
-    params: Dict[str, object] = Field(default_factory=dict)
+    depends_on: Tuple[str, ...] = ()
+    params: Mapping[str, object] = Field(default_factory=lambda: MappingProxyType({}))
+    # Upper bound on this step's run time; the request deadline still applies when it is sooner.
+    timeout_s: Optional[float] = None
+
+    @field_validator("params", mode="after")
+    @classmethod
+    def _freeze_params(cls, value: Mapping[str, object]) -> Mapping[str, object]:
+        return freeze(value)
+
+    @field_serializer("params")
+    def _dump_params(self, value: Mapping[str, object]) -> Dict[str, object]:
+        return thaw(value)
 
 
 class ExecutionPlan(BaseModel):
@@ -31,3 +67,5 @@ class ExecutionPlan(BaseModel):
 
     plan_id: str
     steps: List[PlanStep] = Field(default_factory=list)
+    # Router decisions worth surfacing in rag.debug (never prompts or model reasoning).
+    metadata: Dict[str, object] = Field(default_factory=dict)
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, Iterable, List, Tuple
+from uuid import UUID
+
+from aiblox_kb import ChunkCacheRepo
+from aiblox_kb.repos.chunk_cache_repo import cache_row
+from aiblox_orchestrator.observability.metrics import MetricsRegistry, get_metrics
+
+logger = logging.getLogger(__name__)
+
+EntryKey = Tuple[UUID, str, str, str | None]
+
+
+class WriteBehindChunkCacheWriter:
+    """
+    Background chunk-cache writer shared by all requests.
+
+    ``submit`` only enqueues and never awaits, so cache population adds no latency to the
+    request path. A single flusher coalesces queued entries from many requests into one
+    ``INSERT ... ON CONFLICT DO NOTHING`` per batch, flushing when ``max_batch_rows`` is reached
+    or ``flush_interval_s`` has passed. Entries are never split across batches. When more than
+    ``max_pending_rows`` are queued, new entries are dropped (the cache is derived data), which
+    bounds memory under write pressure. ``chunk_cache_write_dropped_total`` counts entries, whether
+    dropped on backpressure, in a failed batch or on shutdown.
+    """
+
+    def __init__(
+        self,
+        chunk_cache_repo: ChunkCacheRepo,
+        max_batch_rows: int = 2000,
+        flush_interval_s: float = 0.05,
+        max_pending_rows: int = 50_000,
+        metrics: MetricsRegistry | None = None,
+    ) -> None:
+        self.chunk_cache_repo = chunk_cache_repo
+        self.max_batch_rows = max_batch_rows
+        self.flush_interval_s = flush_interval_s
+        self.max_pending_rows = max_pending_rows
+        self.metrics = metrics or get_metrics()
+        self._queue: Deque[Tuple[EntryKey, List[dict]]] = deque()
+        self._queued_keys: set[EntryKey] = set()
+        self._pending_rows = 0
+        self._has_data = asyncio.Event()
+        self._batch_full = asyncio.Event()
+        self._closing = False
+        self._task: asyncio.Task | None = None
+
+    @property
+    def pending_rows(self) -> int:
+        return self._pending_rows
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._closing = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """
+        Stop accepting entries and drain the queue, waiting at most ``timeout`` seconds. Without a
+        running flusher (``start`` never called) the queue is drained by this call.
+        """
+        self._closing = True
+        self._has_data.set()
+        self._batch_full.set()
+        task, self._task = self._task, None
+        try:
+            if task is None or task.done():
+                await asyncio.wait_for(self.flush(), timeout=timeout)
+            else:
+                await asyncio.wait_for(task, timeout=timeout)
+        except asyncio.TimeoutError:
+            if task is not None:
+                task.cancel()
+            self.metrics.inc("chunk_cache_write_dropped_total", len(self._queue), reason="shutdown")
+            logger.warning("chunk cache writer: dropped %d entries on shutdown", len(self._queue))
+
+    def submit(
+        self,
+        item_id: UUID,
+        owner_user_id: UUID,
+        content_hash: str,
+        chunker_id: str,
+        embed_model_id: str | None,
+        chunks: Iterable[dict],
+    ) -> bool:
+        """Queue one cache entry; returns False if it was dropped or is already queued."""
+        key = (item_id, content_hash, chunker_id, embed_model_id)
+        if self._closing or key in self._queued_keys:
+            return False
+        rows = [cache_row(item_id, owner_user_id, content_hash, chunker_id, embed_model_id, c) for c in chunks]
+        if not rows:
+            return False
+        if self._pending_rows + len(rows) > self.max_pending_rows:
+            self.metrics.inc("chunk_cache_write_dropped_total", reason="backpressure")
+            return False
+        self._queue.append((key, rows))
+        self._queued_keys.add(key)
+        self._pending_rows += len(rows)
+        self.metrics.set_gauge("chunk_cache_write_pending_rows", self._pending_rows)
+        self._has_data.set()
+        if self._pending_rows >= self.max_batch_rows:
+            self._batch_full.set()
+        return True
+
+    async def flush(self) -> None:
+        """Write everything queued so far (used by tests and shutdown)."""
+        while self._queue:
+            await self._flush_batch()
+
+    async def _run(self) -> None:
+        while True:
+            await self._has_data.wait()
+            if not self._closing and self._pending_rows < self.max_batch_rows:
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), timeout=self.flush_interval_s)
+                except asyncio.TimeoutError:
+                    pass
+            await self._flush_batch()
+            if not self._queue:
+                self._has_data.clear()
+                self._batch_full.clear()
+                if self._closing:
+                    return
+
+    async def _flush_batch(self) -> None:
+        batch: List[dict] = []
+        keys: List[EntryKey] = []
+        while self._queue and (not batch or len(batch) + len(self._queue[0][1]) <= self.max_batch_rows):
+            key, rows = self._queue.popleft()
+            keys.append(key)
+            batch.extend(rows)
+        if self._pending_rows - len(batch) < self.max_batch_rows:
+            self._batch_full.clear()
+        try:
+            await self.chunk_cache_repo.write_cache_rows(batch)
+            self.metrics.inc("chunk_cache_write_rows_total", len(batch))
+            self.metrics.observe("chunk_cache_write_batch_rows", len(batch))
+        except Exception:  # noqa: BLE001
+            logger.exception("chunk cache writer: batch of %d entries (%d rows) failed", len(keys), len(batch))
+            self.metrics.inc("chunk_cache_write_dropped_total", len(keys), reason="error")
+        finally:
+            self._pending_rows -= len(batch)
+            self._queued_keys.difference_update(keys)
+            self.metrics.set_gauge("chunk_cache_write_pending_rows", self._pending_rows)
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Literal, Tuple
+from typing import Dict, Iterable, Literal, Sequence, Tuple
+
+from aiblox_kb.sharding import merge_top_k
 
 BlendMode = Literal["rrf", "linear"]
 NormalizeMode = Literal["sigmoid", "none"]
@@ -73,6 +75,20 @@ class HybridScorer:
         fused.sort(key=lambda s: s.score, reverse=True)
         return fused[:top_k]
 
+    def merge_shards(
+        self,
+        per_shard: Iterable[Sequence[Tuple[str, float]]],
+        top_k: int,
+    ) -> list[Tuple[str, float]]:
+        """
+        Merge per-shard result lists (each best-first) into one global list for ``fuse``.
+
+        RRF uses ranks, so shard-local ranks must not be fused directly: rank 1 on every shard
+        would tie. A k-way merge by raw score restores global ranks; FTS rank and vector
+        similarity do not depend on corpus statistics, so scores compare across shards.
+        """
+        return merge_top_k(per_shard, top_k)
+
     def _rrf_score(self, rank_text: int | None, rank_vec: int | None) -> float:
         score = 0.0
         if rank_text is not None:
@@ -97,6 +97,8 @@ class EvidenceChunk(BaseModel):
 
 class RetrievalStats(BaseModel):
     timing_ms: Dict[str, float] = Field(default_factory=dict)
+    # Per-leg, per-shard latency when the item repo is sharded, e.g. {"fts": {"s0": 4.2}}.
+    shard_timing_ms: Dict[str, Dict[str, float]] = Field(default_factory=dict)
     counts: Dict[str, int] = Field(default_factory=dict)
     params: Dict[str, object] = Field(default_factory=dict)
 
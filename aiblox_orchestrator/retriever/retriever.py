@@ -3,17 +3,24 @@ from __future__ import annotations
 import asyncio
 import time
 from typing import Iterable, List, Sequence
+from uuid import UUID
 
-from aiblox_orchestrator.chunker.models import ChunkingOptions
+from aiblox_orchestrator.chunker.models import ChunkingOptions, cache_chunker_id as cache_chunker_id_for
 from aiblox_orchestrator.chunker.protocols import ChunkerRegistry
 from aiblox_orchestrator.protocol.context import RequestContext
+from aiblox_orchestrator.retriever.cache_writer import WriteBehindChunkCacheWriter
 from aiblox_orchestrator.retriever.embedder import DeterministicEmbedder
 from aiblox_orchestrator.retriever.hybrid_scorer import HybridScorer
-from aiblox_kb import KbItem, ChunkCacheRepo, ItemRepo
+from aiblox_kb import KbItem, ChunkCacheRepo, ItemRepo, ShardedItemRepo, ShardResult, UnitOfWork
+from aiblox_kb.repos.chunk_cache_repo import span_only
 from aiblox_orchestrator.retriever.models import CandidateItem, EvidenceChunk, RetrievalBundle, RetrievalPrefs, RetrievalStats
 from aiblox_orchestrator.retriever.protocols import Embedder, Retriever
 
 
+def _as_uuid(value) -> UUID:
+    return value if isinstance(value, UUID) else UUID(str(value))
+
+
 def _cosine_similarity(a: Sequence[float], b: Sequence[float]) -> float:
     if not a or not b:
         return 0.0
@@ -28,57 +35,54 @@ def _cosine_similarity(a: Sequence[float], b: Sequence[float]) -> float:
 class HybridRetriever(Retriever):
     def __init__(
         self,
-        item_repo: ItemRepo,
+        item_repo: ItemRepo | ShardedItemRepo,
         chunker_registry: ChunkerRegistry,
         embedder: Embedder | None = None,
         chunk_cache_repo: ChunkCacheRepo | None = None,
         hybrid_scorer: HybridScorer | None = None,
+        cache_writer: WriteBehindChunkCacheWriter | None = None,
+        large_item_chars: int | None = None,
     ) -> None:
         self.item_repo = item_repo
         self.chunker_registry = chunker_registry
         self.embedder = embedder or DeterministicEmbedder()
         self.chunk_cache_repo = chunk_cache_repo or ChunkCacheRepo()
         self.hybrid_scorer = hybrid_scorer or HybridScorer()
+        self.cache_writer = cache_writer
+        # Items longer than this are never loaded whole: evidence text is fetched as slices.
+        self.large_item_chars = large_item_chars
 
     async def search(self, ctx: RequestContext, prefs: RetrievalPrefs) -> RetrievalBundle:
         timings: dict[str, float] = {}
         counts: dict[str, int] = {}
+        shard_timings: dict[str, dict[str, float]] = {}
         params = {"fts": prefs.fts, "vector": prefs.vector, "chunking": prefs.chunking}
 
-        start = time.perf_counter()
-        fts_results = await self.item_repo.search_fts(prefs.query_text, prefs)
-        timings["fts_ms"] = (time.perf_counter() - start) * 1000
-        counts["fts"] = len(fts_results)
-
+        # Embedding is network-bound; do it before the unit of work checks out a connection.
         query_vec: Sequence[float] | None = None
-        vec_results: list[tuple[str, float]] = []
         if prefs.vector.get("embed_query", True):
             start = time.perf_counter()
             query_vec = await self.embedder.embed_query(prefs.query_text)
-            vec_results = await self.item_repo.search_vec(query_vec, prefs)
-            timings["vec_ms"] = (time.perf_counter() - start) * 1000
-            counts["vec"] = len(vec_results)
+            timings["embed_ms"] = (time.perf_counter() - start) * 1000
 
-        fused = self.hybrid_scorer.fuse(
-            text_results=fts_results,
-            vec_results=vec_results,
-            top_k=prefs.top_k_items,
-        )
-
-        item_ids = [score.item_id for score in fused]
-        items = await self.item_repo.fetch_items_by_ids(item_ids)
-        item_map = {item.id: item for item in items}
+        # The reads of one retrieval share a single read-only session (see aiblox_kb.uow), held
+        # only while they run: chunk embedding on cache misses happens after it is released.
+        async with UnitOfWork(getattr(self.item_repo, "read_session_factory", None), read_only=True):
+            fused, item_map, owner_user_id = await self._search_items(prefs, query_vec, timings, counts, shard_timings)
+            cached_by_key = await self._read_chunk_cache(prefs, fused, item_map)
 
         candidates: List[CandidateItem] = []
         for score in fused:
-            item = item_map.get(score.item_id)
+            item = item_map.get(str(score.item_id))
             if ctx.cancelled():
                 raise asyncio.CancelledError()
+            if ctx.expired():
+                raise TimeoutError()
             if not item:
                 continue
             candidates.append(
                 CandidateItem(
-                    item_id=item.id,
+                    item_id=str(item.id),
                     kind=item.kind,
                     source=item.source,
                     source_ref=item.source_ref,
@@ -99,25 +103,80 @@ class HybridRetriever(Retriever):
             candidates=candidates,
             item_map=item_map,
             query_vec=query_vec,
+            cached_by_key=cached_by_key,
+            owner_user_id=owner_user_id,
         )
 
         stats = RetrievalStats(
             timing_ms=timings,
+            shard_timing_ms=shard_timings,
             counts={**counts, "candidates": len(candidates), "evidence": len(evidence)},
             params=params if prefs.debug else {},
         )
         return RetrievalBundle(candidates=candidates, evidence=evidence, stats=stats)
 
-    async def _late_chunk(
+    async def _search_items(
         self,
-        ctx: RequestContext,
         prefs: RetrievalPrefs,
-        candidates: list[CandidateItem],
-        item_map: dict[str, KbItem],
         query_vec: Sequence[float] | None,
-    ) -> list[EvidenceChunk]:
-        if not candidates:
-            return []
+        timings: dict[str, float],
+        counts: dict[str, int],
+        shard_timings: dict[str, dict[str, float]],
+    ) -> tuple[list, dict[str, KbItem], UUID | str | None]:
+        """Both search legs, fused, and the fused items fetched (keyed by string id)."""
+        start = time.perf_counter()
+        if isinstance(self.item_repo, ShardedItemRepo):
+            per_shard = await self.item_repo.search_fts_by_shard(prefs.query_text, prefs)
+            fts_results = self._merge_shards("fts", per_shard, prefs, shard_timings, counts)
+        else:
+            fts_results = await self.item_repo.search_fts(prefs.query_text, prefs)
+        timings["fts_ms"] = (time.perf_counter() - start) * 1000
+        counts["fts"] = len(fts_results)
+
+        vec_results: list[tuple[str, float]] = []
+        if query_vec is not None:
+            start = time.perf_counter()
+            if isinstance(self.item_repo, ShardedItemRepo):
+                per_shard = await self.item_repo.search_vec_by_shard(query_vec, prefs)
+                vec_results = self._merge_shards("vec", per_shard, prefs, shard_timings, counts)
+            else:
+                vec_results = await self.item_repo.search_vec(query_vec, prefs)
+            timings["vec_ms"] = (time.perf_counter() - start) * 1000
+            counts["vec"] = len(vec_results)
+
+        fused = self.hybrid_scorer.fuse(
+            text_results=fts_results,
+            vec_results=vec_results,
+            top_k=prefs.top_k_items,
+        )
+
+        item_ids = [score.item_id for score in fused]
+        owner = prefs.filters.get("owner_user_id")
+        owner_user_id = owner if isinstance(owner, (UUID, str)) else None
+        items = await self.item_repo.fetch_items_by_ids(
+            item_ids,
+            owner_user_id=owner_user_id,
+            max_content_chars=self.large_item_chars,
+        )
+        # Keyed by the string id CandidateItem carries; repos return UUIDs.
+        return fused, {str(item.id): item for item in items}, owner_user_id
+
+    def _merge_shards(
+        self,
+        leg: str,
+        per_shard: list[ShardResult],
+        prefs: RetrievalPrefs,
+        shard_timings: dict[str, dict[str, float]],
+        counts: dict[str, int],
+    ) -> list[tuple[str, float]]:
+        shard_timings[leg] = {result.shard: result.elapsed_ms for result in per_shard}
+        failed = [result.shard for result in per_shard if result.error]
+        if failed:
+            counts[f"{leg}_shards_failed"] = len(failed)
+        return self.hybrid_scorer.merge_shards((result.results for result in per_shard), prefs.top_k_items)
+
+    def _chunking(self, prefs: RetrievalPrefs):
+        """The chunker, options and cache chunker id a retrieval's prefs ask for."""
         chunker_id = prefs.chunking.get("chunker_id", "default")
         chunker = self.chunker_registry.get(chunker_id)
         options = ChunkingOptions(
@@ -125,62 +184,165 @@ class HybridRetriever(Retriever):
             max_chunk_tokens=prefs.chunking.get("max_chunk_tokens"),
             overlap_tokens=prefs.chunking.get("overlap_tokens"),
         )
+        return chunker, options, cache_chunker_id_for(getattr(chunker, "chunker_id", chunker_id), options)
+
+    async def _read_chunk_cache(
+        self,
+        prefs: RetrievalPrefs,
+        fused: list,
+        item_map: dict[str, KbItem],
+    ) -> dict[tuple, list[dict]]:
+        """Cached chunks of every fused item, in one read instead of one round trip per item."""
+        if not prefs.cache.get("use_chunk_cache", True):
+            return {}
+        _, _, cache_chunker_id = self._chunking(prefs)
+        cache_keys = [
+            (item.id, item.content_hash)
+            for item in (item_map.get(str(score.item_id)) for score in fused)
+            if item is not None and getattr(item, "content_hash", None)
+        ]
+        if not cache_keys:
+            return {}
+        return await self.chunk_cache_repo.get_cached_chunks_many(
+            keys=cache_keys,
+            chunker_id=cache_chunker_id,
+            embed_model_id=getattr(self.embedder, "model_id", "unknown"),
+            ttl_seconds=prefs.cache.get("ttl_seconds"),
+        )
+
+    async def _late_chunk(
+        self,
+        ctx: RequestContext,
+        prefs: RetrievalPrefs,
+        candidates: list[CandidateItem],
+        item_map: dict[str, KbItem],
+        query_vec: Sequence[float] | None,
+        cached_by_key: dict[tuple, list[dict]],
+        owner_user_id: UUID | str | None = None,
+    ) -> list[EvidenceChunk]:
+        if not candidates:
+            return []
+        chunker, options, cache_chunker_id = self._chunking(prefs)
+        embed_model_id = getattr(self.embedder, "model_id", "unknown")
+        write_cache = prefs.cache.get("write_chunk_cache", True)
 
         evidence: list[EvidenceChunk] = []
         for candidate in candidates:
             if ctx.cancelled():
                 raise asyncio.CancelledError()
+            if ctx.expired():
+                raise TimeoutError()
             item = item_map.get(candidate.item_id)
-            if not item or not getattr(item, "content_text", None):
+            if not item:
                 continue
-            text: str = item.content_text
-            cached = []
-            if prefs.cache.get("use_chunk_cache", True):
-                cached = await self.chunk_cache_repo.get_cached_chunks(
-                    item_id=candidate.item_id,
-                    content_hash=getattr(item, "content_hash", None),
-                    chunker_id=chunker_id,
-                    embed_model_id=getattr(self.embedder, "model_id", "unknown"),
-                )
+            large = self._is_large(item)
+            if not large and not getattr(item, "content_text", None):
+                continue
+            content_hash = getattr(item, "content_hash", None)
+            cached = cached_by_key.get((item.id, content_hash), []) if content_hash else []
+
+            per_item: list[EvidenceChunk] = []
             if cached:
                 for cache_row in cached:
-                    evidence.append(EvidenceChunk(**cache_row))
-                continue
+                    vec_score = _cosine_similarity(query_vec, cache_row.get("embedding")) if query_vec else 0.0
+                    chunk_text = cache_row["text"]
+                    if not chunk_text and not large and cache_row.get("start_idx") is not None:
+                        chunk_text = chunker.span_text(item.content_text[cache_row["start_idx"] : cache_row["end_idx"]])
+                    per_item.append(
+                        EvidenceChunk(
+                            item_id=candidate.item_id,
+                            chunk_id=f"{candidate.item_id}:{cache_row['chunk_index']}",
+                            text=chunk_text,
+                            start_idx=cache_row.get("start_idx"),
+                            end_idx=cache_row.get("end_idx"),
+                            token_count=cache_row.get("token_count"),
+                            score=vec_score,
+                            score_text=None,
+                            score_vec=vec_score,
+                        )
+                    )
+            else:
+                if large:
+                    # First access: read the whole text once to build the span-only cache entry.
+                    full_span = (item.id, 0, item.content_length)
+                    text = (await self.item_repo.fetch_content_slices([full_span], owner_user_id)).get(full_span)
+                    if not text:
+                        continue
+                else:
+                    text = item.content_text
+                chunks = chunker.chunk(text, options)
+                chunk_texts = [c.text for c in chunks]
+                should_write = bool(write_cache and content_hash and chunks)
+                chunk_vecs: list[Sequence[float]] = []
+                if query_vec or should_write:
+                    chunk_vecs = await self.embedder.embed_texts(chunk_texts)
+                for idx, chunk in enumerate(chunks):
+                    vec_score = _cosine_similarity(query_vec, chunk_vecs[idx]) if query_vec and chunk_vecs else 0.0
+                    ev = EvidenceChunk(
+                        item_id=candidate.item_id,
+                        chunk_id=f"{candidate.item_id}:{chunk.chunk_index}",
+                        text=chunk.text,
+                        start_idx=chunk.start_idx,
+                        end_idx=chunk.end_idx,
+                        token_count=chunk.token_count,
+                        score=vec_score,
+                        score_text=None,
+                        score_vec=vec_score,
+                        heading_path=chunk.heading_path,
+                        anchors=chunk.anchors,
+                    )
+                    per_item.append(ev)
+
+                if should_write:
+                    # Cache every chunk with its vector so later queries can rescore from the cache alone.
+                    cached_chunks = [
+                        {**chunk.model_dump(), "embedding": chunk_vecs[idx] if chunk_vecs else None}
+                        for idx, chunk in enumerate(chunks)
+                    ]
+                    entry = dict(
+                        item_id=item.id,
+                        owner_user_id=item.owner_user_id,
+                        content_hash=content_hash,
+                        chunker_id=cache_chunker_id,
+                        embed_model_id=embed_model_id,
+                        chunks=[span_only(c) for c in cached_chunks] if large else cached_chunks,
+                    )
+                    if self.cache_writer is not None:
+                        self.cache_writer.submit(**entry)
+                    else:
+                        await self.chunk_cache_repo.write_cached_chunks(**entry)
 
-            chunks = chunker.chunk(text, options)
-            chunk_texts = [c.text for c in chunks]
-            chunk_vecs: list[Sequence[float]] = []
-            if query_vec:
-                chunk_vecs = await self.embedder.embed_texts(chunk_texts)
-            per_item = []
-            for idx, chunk in enumerate(chunks):
-                vec_score = _cosine_similarity(query_vec, chunk_vecs[idx]) if query_vec and chunk_vecs else 0.0
-                ev = EvidenceChunk(
-                    item_id=candidate.item_id,
-                    chunk_id=f"{candidate.item_id}:{chunk.chunk_index}",
-                    text=chunk.text,
-                    start_idx=chunk.start_idx,
-                    end_idx=chunk.end_idx,
-                    token_count=chunk.token_count,
-                    score=vec_score,
-                    score_text=None,
-                    score_vec=vec_score,
-                    heading_path=chunk.heading_path,
-                    anchors=chunk.anchors,
-                )
-                per_item.append(ev)
             per_item.sort(key=lambda c: c.score_vec or c.score, reverse=True)
-            per_item = per_item[: prefs.per_item_chunk_cap]
-            evidence.extend(per_item)
-
-            if prefs.cache.get("write_chunk_cache", True) and per_item:
-                await self.chunk_cache_repo.write_cached_chunks(
-                    item_id=candidate.item_id,
-                    content_hash=getattr(item, "content_hash", None),
-                    chunker_id=chunker_id,
-                    embed_model_id=getattr(self.embedder, "model_id", "unknown"),
-                    chunks=[ev.model_dump() for ev in per_item],
-                )
+            evidence.extend(per_item[: prefs.per_item_chunk_cap])
 
         evidence.sort(key=lambda c: c.score_vec or c.score, reverse=True)
-        return evidence[: prefs.top_k_chunks]
+        evidence = evidence[: prefs.top_k_chunks]
+        return await self._fill_span_text(evidence, chunker, owner_user_id)
+
+    def _is_large(self, item: KbItem) -> bool:
+        return self.large_item_chars is not None and (getattr(item, "content_length", None) or 0) > self.large_item_chars
+
+    async def _fill_span_text(
+        self,
+        evidence: list[EvidenceChunk],
+        chunker,
+        owner_user_id: UUID | str | None,
+    ) -> list[EvidenceChunk]:
+        """Fetch the text of span-only chunks that made the cut, in one query; drop unreadable ones."""
+        spans = {
+            id(ev): (_as_uuid(ev.item_id), ev.start_idx, ev.end_idx)
+            for ev in evidence
+            if not ev.text and ev.start_idx is not None and ev.end_idx is not None
+        }
+        if not spans:
+            return [ev for ev in evidence if ev.text]
+        slices = await self.item_repo.fetch_content_slices(list(spans.values()), owner_user_id)
+        filled: list[EvidenceChunk] = []
+        for ev in evidence:
+            if not ev.text:
+                raw = slices.get(spans.get(id(ev)))
+                if not raw:
+                    continue
+                ev.text = chunker.span_text(raw)
+            filled.append(ev)
+        return filled
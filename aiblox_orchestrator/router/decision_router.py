@@ -1,14 +1,84 @@
 from __future__ import annotations
 
-import uuid
-from typing import List
+from typing import Dict, Mapping, Sequence
 
 from aiblox_orchestrator.protocol.context import ConversationWindow, ProductProfile, RequestContext, UserInput
 from aiblox_orchestrator.protocol.plans import ExecutionPlan, PlanStep
+from aiblox_orchestrator.router.retrieval_gate import GateDecision, RetrievalGate
+from aiblox_orchestrator.router.templates import PlanTemplate
+
+_RETRIEVE = {"step_id": "retrieve", "kind": "retrieve", "params": {"retrieval_prefs": {}}}
+_TOOL_CALL = {"step_id": "tool_call", "kind": "tool_call", "params": {"tool": None}}
+
+DEFAULT_TEMPLATES: Dict[str, list[dict]] = {
+    "chat": [
+        {"step_id": "synthesize", "kind": "synthesize", "required": True},
+    ],
+    "chat_retrieve": [
+        {**_RETRIEVE, "required": False},
+        {"step_id": "synthesize", "kind": "synthesize", "required": True, "depends_on": ["retrieve"]},
+    ],
+    "rag": [
+        {**_RETRIEVE, "required": True},
+        {"step_id": "synthesize", "kind": "synthesize", "required": True, "depends_on": ["retrieve"]},
+    ],
+    "tool": [
+        {**_TOOL_CALL, "required": True},
+        {"step_id": "synthesize", "kind": "synthesize", "required": True, "depends_on": ["tool_call"]},
+    ],
+    "hybrid": [
+        {**_RETRIEVE, "required": False},
+        {**_TOOL_CALL, "required": False, "depends_on": ["retrieve"]},
+        {"step_id": "synthesize", "kind": "synthesize", "required": True, "depends_on": ["retrieve", "tool_call"]},
+    ],
+    "hybrid_no_retrieve": [
+        {**_TOOL_CALL, "required": False},
+        {"step_id": "synthesize", "kind": "synthesize", "required": True, "depends_on": ["tool_call"]},
+    ],
+}
 
 
 class DecisionRouter:
-    """Deterministic, minimal router producing ExecutionPlans."""
+    """
+    Deterministic, minimal router producing ExecutionPlans.
+
+    Plans come from ``PlanTemplate``s compiled once per (template name, product profile name);
+    ``register_template`` overrides a template for one profile, which otherwise falls back to the
+    ``default`` profile's. Per request only the plan id, the retrieve step's ``retrieval_prefs``
+    and the tool_call step's ``tool`` differ.
+
+    With a ``retrieval_gate``, ``chat`` and ``hybrid`` turns are classified first: chat turns that
+    need retrieval get an optional retrieve step, hybrid turns that do not (small talk) lose
+    theirs, and low-confidence turns retrieve fewer items unless the request set
+    ``top_k_items``. The decision is recorded in ``plan.metadata["retrieval_gate"]``. ``rag``
+    requests always retrieve.
+    """
+
+    def __init__(
+        self,
+        retrieval_gate: RetrievalGate | None = None,
+        templates: Mapping[tuple[str, str], Sequence[PlanStep | Mapping[str, object]]] | None = None,
+    ) -> None:
+        self.retrieval_gate = retrieval_gate
+        self._templates: Dict[tuple[str, str], PlanTemplate] = {}
+        for name, steps in DEFAULT_TEMPLATES.items():
+            self.register_template(name, steps)
+        for (name, profile), steps in (templates or {}).items():
+            self.register_template(name, steps, profile)
+
+    def register_template(
+        self,
+        name: str,
+        steps: Sequence[PlanStep | Mapping[str, object]],
+        profile: str = "default",
+    ) -> PlanTemplate:
+        """Validate and store a plan template; raises ``ValueError`` for an invalid plan."""
+        template = PlanTemplate(name, steps)
+        self._templates[(name, profile)] = template
+        return template
+
+    def template_for(self, name: str, profile: str = "default") -> PlanTemplate:
+        return self._templates.get((name, profile)) or self._templates[(name, "default")]
 
     def build_plan(
         self,
@@ -18,67 +88,41 @@ class DecisionRouter:
         product_profile: ProductProfile,
     ) -> ExecutionPlan:
         mode = (user_input.mode or "chat").lower()
-        steps: List[PlanStep]
-
-        if mode == "rag":
-            steps = [
-                PlanStep(
-                    step_id="retrieve",
-                    kind="retrieve",
-                    required=True,
-                    params={"retrieval_prefs": user_input.retrieval_prefs or {}},
-                ),
-                PlanStep(
-                    step_id="synthesize",
-                    kind="synthesize",
-                    required=True,
-                    depends_on=["retrieve"],
-                ),
-            ]
-        elif mode == "tool":
-            steps = [
-                PlanStep(
-                    step_id="tool_call",
-                    kind="tool_call",
-                    required=True,
-                    params={"tool": user_input.metadata.get("tool") if user_input.metadata else None},
-                ),
-                PlanStep(
-                    step_id="synthesize",
-                    kind="synthesize",
-                    required=True,
-                    depends_on=["tool_call"],
-                ),
-            ]
+        metadata: Dict[str, object] = {}
+        gate = self._gate(user_input, conversation)
+        if gate is not None:
+            metadata["retrieval_gate"] = gate.as_debug()
+        retrieval_prefs = self._gated_prefs(user_input, gate)
+
+        if mode in ("rag", "tool"):
+            name = mode
         elif mode == "hybrid":
-            steps = [
-                PlanStep(
-                    step_id="retrieve",
-                    kind="retrieve",
-                    required=False,
-                    params={"retrieval_prefs": user_input.retrieval_prefs or {}},
-                ),
-                PlanStep(
-                    step_id="tool_call",
-                    kind="tool_call",
-                    required=False,
-                    depends_on=["retrieve"],
-                    params={"tool": user_input.metadata.get("tool") if user_input.metadata else None},
-                ),
-                PlanStep(
-                    step_id="synthesize",
-                    kind="synthesize",
-                    required=True,
-                    depends_on=["retrieve", "tool_call"],
-                ),
-            ]
+            name = "hybrid_no_retrieve" if gate is not None and not gate.retrieve else "hybrid"
         else:
-            steps = [
-                PlanStep(
-                    step_id="synthesize",
-                    kind="synthesize",
-                    required=True,
-                )
-            ]
-
-        return ExecutionPlan(plan_id=str(uuid.uuid4()), steps=steps)
+            name = "chat_retrieve" if gate is not None and gate.retrieve else "chat"
+
+        template = self.template_for(name, product_profile.name if product_profile else "default")
+        overlays = {
+            "retrieve": {"retrieval_prefs": retrieval_prefs},
+            "tool_call": {"tool": user_input.metadata.get("tool") if user_input.metadata else None},
+        }
+        return template.instantiate(overlays, metadata)
+
+    def retrieval_prefs(self, user_input: UserInput, conversation: ConversationWindow) -> Dict[str, object]:
+        """
+        The ``retrieval_prefs`` ``build_plan`` gives the retrieve step, known before the plan is
+        built (speculative retrieval starts with them).
+        """
+        return self._gated_prefs(user_input, self._gate(user_input, conversation))
+
+    def _gate(self, user_input: UserInput, conversation: ConversationWindow) -> GateDecision | None:
+        if self.retrieval_gate is None or (user_input.mode or "chat").lower() not in ("chat", "hybrid"):
+            return None
+        return self.retrieval_gate.decide(user_input, conversation)
+
+    @staticmethod
+    def _gated_prefs(user_input: UserInput, gate: GateDecision | None) -> Dict[str, object]:
+        retrieval_prefs = user_input.retrieval_prefs or {}
+        if gate is not None and gate.top_k_items is not None and "top_k_items" not in retrieval_prefs:
+            retrieval_prefs = {**retrieval_prefs, "top_k_items": gate.top_k_items}
+        return retrieval_prefs
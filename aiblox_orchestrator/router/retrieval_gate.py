@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable
+
+from aiblox_orchestrator.protocol.context import ConversationWindow, UserInput
+
+_WORD_RE = re.compile(r"[\w']+")
+_QUESTION_WORDS = frozenset(
+    "what which who whom whose when where why how is are was were do does did can could should would will".split()
+)
+_SMALL_TALK = frozenset(
+    """
+    hi hello hey yo thanks thank thx ty ok okay k cool great nice awesome perfect bye goodbye
+    yes yeah yep no nope sure lol haha good morning afternoon evening night you welcome np
+    """.split()
+)
+_RETRIEVAL_CUES = frozenset(
+    """
+    document documents doc docs file files source sources policy policies report reports spec
+    manual guide according find search look lookup show list summarize summary cite reference
+    page section contract ticket record records
+    """.split()
+)
+# Identifiers, versions, numbers, quoted phrases, paths: things worth looking up. Single quotes
+# only count when they open and close a phrase, not as apostrophes ("don't ... it's").
+_ENTITY_RE = re.compile(
+    r"\d|\"[^\"]+\"|(?<!\w)'[^']{3,}'(?!\w)|[\w.-]+/[\w.-]+|\b[A-Z][a-z]+[A-Z]\w*|\b[A-Z]{2,}\b"
+)
+
+
+@dataclass(frozen=True)
+class GateDecision:
+    """Whether a turn needs retrieval and, if so, how many items to recall (None = prefs default)."""
+
+    retrieve: bool
+    top_k_items: int | None
+    reason: str
+    score: float
+    features: Dict[str, object] = field(default_factory=dict)
+
+    def as_debug(self) -> dict:
+        return {
+            "retrieve": self.retrieve,
+            "top_k_items": self.top_k_items,
+            "reason": self.reason,
+            "score": round(self.score, 3),
+            "features": dict(self.features),
+        }
+
+
+class RetrievalGate:
+    """
+    Deterministic retrieval-necessity classifier for chat-like turns.
+
+    Small talk (greetings, thanks, acknowledgements) never retrieves. Otherwise lexical features
+    add up to a score: a question, words that ask for documents or sources, entity-like tokens
+    (numbers, identifiers, quoted phrases), a longer message, and a follow-up to a turn that
+    used retrieval. A question alone scores below the default ``threshold`` ("how are you?"),
+    so it needs a content signal as well. At ``threshold`` the turn retrieves; below
+    ``confident`` it retrieves only ``shrunk_top_k`` items.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.4,
+        confident: float = 0.8,
+        shrunk_top_k: int = 5,
+        small_talk: Iterable[str] | None = None,
+        retrieval_cues: Iterable[str] | None = None,
+    ) -> None:
+        self.threshold = threshold
+        self.confident = confident
+        self.shrunk_top_k = shrunk_top_k
+        self.small_talk = frozenset(small_talk) if small_talk is not None else _SMALL_TALK
+        self.retrieval_cues = frozenset(retrieval_cues) if retrieval_cues is not None else _RETRIEVAL_CUES
+
+    def decide(self, user_input: UserInput, conversation: ConversationWindow | None = None) -> GateDecision:
+        text = (user_input.text or "").strip()
+        words = [w.lower() for w in _WORD_RE.findall(text)]
+        if not words:
+            return GateDecision(False, None, "empty", 0.0, {"words": 0})
+        if all(w in self.small_talk for w in words):
+            return GateDecision(False, None, "small_talk", 0.0, {"words": len(words)})
+
+        features: Dict[str, object] = {
+            "words": len(words),
+            "question": text.endswith("?") or words[0] in _QUESTION_WORDS,
+            "cues": sorted({w for w in words if w in self.retrieval_cues}),
+            "entities": len(_ENTITY_RE.findall(text)),
+            "follow_up": self._follows_retrieval(conversation),
+        }
+        score = 0.0
+        score += 0.3 if features["question"] else 0.0
+        score += 0.4 if features["cues"] else 0.0
+        score += 0.2 if features["entities"] else 0.0
+        score += 0.2 if len(words) >= 8 else (-0.2 if len(words) < 3 else 0.0)
+        score += 0.4 if features["follow_up"] else 0.0
+
+        if score < self.threshold:
+            return GateDecision(False, None, "below_threshold", score, features)
+        if score < self.confident:
+            return GateDecision(True, self.shrunk_top_k, "low_confidence", score, features)
+        return GateDecision(True, None, "needs_retrieval", score, features)
+
+    @staticmethod
+    def _follows_retrieval(conversation: ConversationWindow | None) -> bool:
+        """True when the latest assistant message in the window carried sources."""
+        for message in reversed(conversation.messages if conversation else []):
+            if message.get("role") == "assistant":
+                return bool(message.get("sources"))
+        return False
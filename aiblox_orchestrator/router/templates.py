@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from typing import Dict, Mapping, Sequence
+from uuid import uuid4
+
+from aiblox_orchestrator.protocol.plans import ExecutionPlan, PlanStep, freeze
+
+
+def validate_plan_steps(steps: Sequence[PlanStep]) -> None:
+    """Reject duplicate step ids, dependencies on unknown steps and dependency cycles."""
+    ids = [step.step_id for step in steps]
+    if len(set(ids)) != len(ids):
+        raise ValueError(f"duplicate step ids: {sorted({i for i in ids if ids.count(i) > 1})}")
+    known = set(ids)
+    for step in steps:
+        unknown = set(step.depends_on) - known
+        if unknown:
+            raise ValueError(f"step {step.step_id} depends on unknown steps: {sorted(unknown)}")
+    remaining = {step.step_id: set(step.depends_on) for step in steps}
+    while remaining:
+        ready = [step_id for step_id, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"dependency cycle among steps: {sorted(remaining)}")
+        for step_id in ready:
+            del remaining[step_id]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+class PlanTemplate:
+    """
+    Plan shape validated once, at registration, and shared by every request that uses it.
+
+    Steps are deeply immutable ``PlanStep`` objects; ``instantiate`` builds an ``ExecutionPlan`` around them
+    (model instances are not re-validated), stamping a fresh ``plan_id`` and copying only the
+    steps whose params a per-request overlay changes (``overlays`` maps a step kind to the params
+    merged into it).
+    """
+
+    __slots__ = ("name", "steps")
+
+    def __init__(self, name: str, steps: Sequence[PlanStep | Mapping[str, object]]) -> None:
+        validated = tuple(step if isinstance(step, PlanStep) else PlanStep.model_validate(step) for step in steps)
+        validate_plan_steps(validated)
+        self.name = name
+        self.steps = validated
+
+    def instantiate(
+        self,
+        overlays: Mapping[str, Mapping[str, object]] | None = None,
+        metadata: Dict[str, object] | None = None,
+    ) -> ExecutionPlan:
+        steps = list(self.steps)
+        if overlays:
+            for index, step in enumerate(steps):
+                overlay = overlays.get(step.kind)
+                if overlay and any(step.params.get(key) != value for key, value in overlay.items()):
+                    steps[index] = step.model_copy(update={"params": freeze({**step.params, **overlay})})
+        return ExecutionPlan(plan_id=str(uuid4()), steps=steps, metadata=metadata or {})
@@ -1,55 +1,240 @@
 from __future__ import annotations
 
 import asyncio
-import json
-from typing import Dict
+import logging
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import AsyncIterator, Dict
 from uuid import uuid4
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from sqlalchemy.ext.asyncio import AsyncEngine
 
-from aiblox_kb import ChunkCacheRepo, ItemRepo, make_engine, make_session_factory, make_sessionmaker
+from aiblox_kb import (
+    Bm25ItemRepo,
+    ChunkCacheRepo,
+    ContentAddressedChunkCacheRepo,
+    IngestCheckpointRepo,
+    ItemEmbeddingRepo,
+    ItemRepo,
+    PackedChunkCacheRepo,
+    ReplicaRouter,
+    ShardMap,
+    ShardedChunkCacheRepo,
+    ShardedItemRepo,
+    make_engine,
+    make_session_factory,
+    make_sessionmaker,
+    pool_stats,
+    prewarm_pool,
+)
 from aiblox_orchestrator.chunker.registry import InMemoryChunkerRegistry
 from aiblox_orchestrator.config.settings import load_settings
+from aiblox_orchestrator.gateway.admission import AdmissionController, Overloaded
+from aiblox_orchestrator.gateway.coalescing import CoalescingEventSink
+from aiblox_orchestrator.gateway.outbound import OutboundScheduler
+from aiblox_orchestrator.observability.metrics import get_metrics
 from aiblox_orchestrator.orchestrator import Orchestrator, StepRunner
 from aiblox_orchestrator.orchestrator.stubs import FakeDSPyRuntime, StubAgentRunner, StubToolRunner, StubValidator
 from aiblox_orchestrator.protocol.context import ConversationWindow, ProductProfile, RequestContext, UserInput
+from aiblox_orchestrator.protocol.encoding import EnvelopeEncoder, JsonEnvelopeEncoder, decode_client_message, negotiate_encoder
 from aiblox_orchestrator.protocol.event_sink import EventSink
 from aiblox_orchestrator.protocol.events import EventEnvelope
+from aiblox_orchestrator.retriever.cache_writer import WriteBehindChunkCacheWriter
 from aiblox_orchestrator.retriever.embedder import DeterministicEmbedder
 from aiblox_orchestrator.retriever.retriever import HybridRetriever
 from aiblox_orchestrator.router.decision_router import DecisionRouter
+from aiblox_orchestrator.router.retrieval_gate import RetrievalGate
+from aiblox_orchestrator.workers.cache_sweeper import ChunkCacheSweeper
+from aiblox_orchestrator.workers.prechunk import PrechunkWorker
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    stop_event = asyncio.Event()
+    background: list[asyncio.Task] = []
+    if settings.db_pool_prewarm:
+        for pool_engine in (engine, *replica_engines, *shard_engines.values()):
+            try:
+                await prewarm_pool(pool_engine)
+            except Exception:  # noqa: BLE001
+                logger.warning("connection pool pre-warm failed", exc_info=True)
+    if isinstance(item_repo, Bm25ItemRepo):
+        if not await asyncio.to_thread(item_repo.load_snapshot):
+            logger.info("bm25: no snapshot, building the index from kb_items")
+        await item_repo.refresh()
+        background.append(asyncio.create_task(item_repo.run_forever(stop_event, settings.bm25_refresh_interval_s)))
+    if replica_router is not None:
+        background.append(
+            asyncio.create_task(replica_router.run_health_checks(stop_event, settings.db_replica_health_interval_s))
+        )
+    if cache_writer is not None:
+        cache_writer.start()
+    if settings.prechunk_enabled:
+        background.append(asyncio.create_task(prechunk_worker.run_forever(stop_event)))
+    if settings.cache_sweeper_enabled:
+        background.append(asyncio.create_task(cache_sweeper.run_forever(stop_event)))
+    try:
+        yield
+    finally:
+        stop_event.set()
+        for task in background:
+            try:
+                await asyncio.wait_for(task, timeout=10)
+            except asyncio.TimeoutError:
+                task.cancel()
+        if cache_writer is not None:
+            await cache_writer.stop(timeout=10)
+        try:
+            await chunk_cache_repo.flush_touches()
+        except Exception:  # noqa: BLE001
+            logger.warning("chunk cache: flushing access stamps failed", exc_info=True)
+        if isinstance(item_repo, Bm25ItemRepo):
+            await item_repo.snapshot()
+        for pool_engine in (engine, *replica_engines, *shard_engines.values()):
+            await pool_engine.dispose()
 
-app = FastAPI(title="AI Blox Orchestrator")
+
+app = FastAPI(title="AI Blox Orchestrator", lifespan=lifespan)
 
 
 class WebSocketEventSink(EventSink):
-    """Event sink that writes envelopes to a websocket."""
+    """Event sink that writes envelopes to a websocket with the connection's negotiated encoder."""
 
-    def __init__(self, websocket: WebSocket, lock: asyncio.Lock) -> None:
+    def __init__(self, websocket: WebSocket, lock: asyncio.Lock, encoder: EnvelopeEncoder | None = None) -> None:
         self.websocket = websocket
         self.lock = lock
+        self.encoder = encoder or JsonEnvelopeEncoder()
 
     async def emit(self, event: EventEnvelope) -> None:
-        payload = event.model_dump(mode="json")
+        data = self.encoder.encode(event)
         async with self.lock:
-            await self.websocket.send_text(json.dumps(payload))
+            if self.encoder.binary:
+                await self.websocket.send_bytes(data)
+            else:
+                await self.websocket.send_text(data)
 
 
 settings = load_settings()
-engine = make_engine(settings.db_dsn)
+
+
+def _make_engine(dsn: str) -> AsyncEngine:
+    engine = make_engine(
+        dsn,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_s,
+        pool_recycle=settings.db_pool_recycle_s,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        statement_cache_size=settings.db_statement_cache_size,
+        prepared_statement_cache_size=settings.db_prepared_statement_cache_size,
+    )
+    engine.pool.on_checkout_wait = lambda waited: get_metrics().observe("db_pool_checkout_wait_seconds", waited)
+    return engine
+
+
+engine = _make_engine(settings.db_dsn)
+replica_engines = [_make_engine(dsn) for dsn in settings.db_replica_dsns]
 sessionmaker = make_sessionmaker(engine)
 session_factory = make_session_factory(sessionmaker)
+replica_router = (
+    ReplicaRouter(
+        primary=engine,
+        replicas=replica_engines,
+        strategy=settings.db_replica_strategy,
+        eject_seconds=settings.db_replica_eject_s,
+    )
+    if replica_engines
+    else None
+)
+read_session_factory = replica_router or session_factory
 
-decision_router = DecisionRouter()
-item_repo = ItemRepo(session_factory=session_factory)
-chunk_cache_repo = ChunkCacheRepo(session_factory=session_factory)
+decision_router = DecisionRouter(retrieval_gate=RetrievalGate() if settings.retrieval_gate_enabled else None)
+CHUNK_CACHE_REPOS = {
+    "rows": ChunkCacheRepo,
+    "content_addressed": ContentAddressedChunkCacheRepo,
+    "packed": PackedChunkCacheRepo,
+}
+# Sharded deployments keep items and their derived cache on the shards; the primary DSN then
+# only holds non-item state such as ingest checkpoints.
+shard_engines = {f"s{idx}": _make_engine(dsn) for idx, dsn in enumerate(settings.db_shard_dsns)}
+if shard_engines:
+    shard_map = ShardMap(list(shard_engines), strategy=settings.db_shard_strategy)
+    shard_factories = {name: make_session_factory(make_sessionmaker(e)) for name, e in shard_engines.items()}
+    item_repo = ShardedItemRepo(
+        {
+            name: ItemRepo(session_factory=factory, require_owner=settings.db_require_owner)
+            for name, factory in shard_factories.items()
+        },
+        shard_map,
+    )
+    chunk_cache_repo = ShardedChunkCacheRepo(
+        {
+            name: CHUNK_CACHE_REPOS[settings.chunk_cache_layout](session_factory=factory)
+            for name, factory in shard_factories.items()
+        },
+        shard_map,
+    )
+    item_embedding_repo = None
+else:
+    item_repo = ItemRepo(
+        session_factory=session_factory,
+        read_session_factory=read_session_factory,
+        require_owner=settings.db_require_owner,
+    )
+    chunk_cache_repo = CHUNK_CACHE_REPOS[settings.chunk_cache_layout](
+        session_factory=session_factory,
+        read_session_factory=read_session_factory,
+    )
+    item_embedding_repo = ItemEmbeddingRepo(session_factory=session_factory)
+if settings.text_backend == "bm25":
+    item_repo = Bm25ItemRepo(
+        item_repo,
+        snapshot_path=settings.bm25_snapshot_path,
+        min_score=settings.bm25_min_score,
+        thread_min_docs=settings.bm25_thread_min_docs,
+    )
+elif settings.text_backend != "postgres":
+    raise ValueError(f"unsupported AIBLOX_TEXT_BACKEND: {settings.text_backend}")
 chunker_registry = InMemoryChunkerRegistry()
 embedder = DeterministicEmbedder()
+cache_writer = (
+    WriteBehindChunkCacheWriter(
+        chunk_cache_repo=chunk_cache_repo,
+        max_batch_rows=settings.cache_write_batch_rows,
+        flush_interval_s=settings.cache_write_flush_interval_s,
+        max_pending_rows=settings.cache_write_max_pending_rows,
+    )
+    if settings.cache_write_behind
+    else None
+)
 retriever = HybridRetriever(
     item_repo=item_repo,
     chunker_registry=chunker_registry,
     embedder=embedder,
     chunk_cache_repo=chunk_cache_repo,
+    cache_writer=cache_writer,
+    large_item_chars=settings.large_item_chars,
+)
+prechunk_worker = PrechunkWorker(
+    item_repo=item_repo,
+    chunk_cache_repo=chunk_cache_repo,
+    checkpoint_repo=IngestCheckpointRepo(session_factory=session_factory),
+    chunker_registry=chunker_registry,
+    embedder=embedder,
+    item_embedding_repo=item_embedding_repo,
+    batch_size=settings.prechunk_batch_size,
+    poll_interval_s=settings.prechunk_poll_interval_s,
+    settle_lag=timedelta(seconds=settings.prechunk_settle_lag_s),
+    large_item_chars=settings.large_item_chars,
+)
+cache_sweeper = ChunkCacheSweeper(
+    chunk_cache_repo=chunk_cache_repo,
+    ttl_seconds=settings.chunk_cache_ttl_seconds,
+    owner_quota_bytes=settings.chunk_cache_owner_quota_bytes,
+    interval_s=settings.cache_sweep_interval_s,
 )
 step_runner = StepRunner(
     retriever=retriever,
@@ -62,29 +247,124 @@ step_runner = StepRunner(
 orchestrator = Orchestrator(
     decision_router=decision_router,
     step_runner=step_runner,
+    max_parallel_steps=settings.orchestrator_max_parallel_steps,
+    speculative_modes=settings.speculative_retrieval_modes,
 )
 
 
+@app.get("/metrics")
+async def metrics_endpoint() -> dict:
+    metrics = get_metrics()
+    pools = [
+        ("primary", engine),
+        *(("replica", e) for e in replica_engines),
+        *(("shard", e) for e in shard_engines.values()),
+    ]
+    for role, pool_engine in pools:
+        stats = pool_stats(pool_engine)
+        if stats is None:
+            continue
+        labels = {"role": role, "host": f"{pool_engine.url.host}:{pool_engine.url.port}"}
+        metrics.set_gauge("db_pool_size", stats.size, **labels)
+        metrics.set_gauge("db_pool_checked_out", stats.checked_out, **labels)
+        metrics.set_gauge("db_pool_overflow", stats.overflow, **labels)
+        metrics.set_gauge("db_pool_utilization", stats.utilization, **labels)
+        metrics.set_gauge("db_pool_checkout_timeouts", stats.timeouts, **labels)
+    if replica_router is not None:
+        metrics.set_gauge("db_replicas_healthy", len(replica_router.healthy_replicas()))
+    return metrics.snapshot()
+
+
+admission = AdmissionController(
+    max_concurrent=settings.admission_max_concurrent,
+    max_per_connection=settings.admission_max_per_connection,
+    max_per_owner=settings.admission_max_per_owner,
+    max_queue=settings.admission_queue_size,
+    queue_timeout_s=settings.admission_queue_timeout_s,
+    retry_after_s=settings.admission_retry_after_s,
+)
+
+
+def _admission_owner(websocket: WebSocket) -> str | None:
+    """
+    Per-owner admission key of a connection: the user set by authentication middleware, else the
+    peer address. Never read from request payloads, which the client controls.
+    """
+    user = websocket.scope.get("user")
+    if getattr(user, "is_authenticated", False):
+        return f"user:{user.display_name}"
+    return f"peer:{websocket.client.host}" if websocket.client else None
+
+
+async def _run_admitted(
+    connection_id: str,
+    owner: str | None,
+    ctx: RequestContext,
+    user_input: UserInput,
+    conversation: ConversationWindow,
+    product_profile: ProductProfile,
+    event_sink: EventSink,
+) -> None:
+    started = False
+    try:
+        async with admission.admit(connection_id, owner, cancelled=ctx.cancellation_event):
+            started = True
+            await orchestrator.run(
+                ctx=ctx,
+                user_input=user_input,
+                conversation=conversation,
+                product_profile=product_profile,
+                event_sink=event_sink,
+            )
+    except Overloaded as exc:
+        # Rejected before the orchestrator started: still close the request for the client.
+        error = {"code": "overloaded", "reason": exc.reason, "retry_after_s": exc.retry_after_s, "message": str(exc)}
+        await event_sink.emit(EventEnvelope(type="rag.error", request_id=ctx.request_id, seq=1, payload=error))
+        await event_sink.emit(EventEnvelope(type="rag.done", request_id=ctx.request_id, seq=2, payload={"status": "error"}))
+    except asyncio.CancelledError:
+        if started or not ctx.cancelled():
+            raise
+        # rag.cancel while queued for admission; the orchestrator never started.
+        await event_sink.emit(EventEnvelope(type="rag.done", request_id=ctx.request_id, seq=1, payload={"status": "cancelled"}))
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket) -> None:
-    await websocket.accept()
+    offered = websocket.scope.get("subprotocols") or []
+    encoder = negotiate_encoder(offered, allow_binary=settings.ws_binary_enabled)
+    await websocket.accept(subprotocol=encoder.subprotocol if encoder.subprotocol in offered else None)
     send_lock = asyncio.Lock()
-    event_sink = WebSocketEventSink(websocket, send_lock)
+    # Requests enqueue; a single writer task sends, interleaving requests fairly.
+    outbound = OutboundScheduler(
+        WebSocketEventSink(websocket, send_lock, encoder),
+        max_queued_per_request=settings.ws_outbound_queue_size,
+    )
+    event_sink: EventSink = outbound
+    if settings.ws_coalesce_tokens:
+        event_sink = CoalescingEventSink(
+            event_sink,
+            flush_interval_s=settings.ws_coalesce_interval_ms / 1000,
+            max_batch_bytes=settings.ws_coalesce_max_bytes,
+        )
+    connection_id = str(uuid4())
+    owner = _admission_owner(websocket)
     active_tasks: Dict[str, asyncio.Task] = {}
     active_contexts: Dict[str, RequestContext] = {}
 
     try:
         while True:
-            raw = await websocket.receive_text()
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(frame.get("code", 1000))
             try:
-                message = json.loads(raw)
-            except json.JSONDecodeError:
+                message = decode_client_message(frame.get("text"), frame.get("bytes"))
+            except ValueError as exc:
                 await event_sink.emit(
                     EventEnvelope(
                         type="rag.error",
                         request_id="unknown",
                         seq=0,
-                        payload={"message": "invalid JSON payload"},
+                        payload={"message": str(exc)},
                     )
                 )
                 continue
@@ -96,10 +376,12 @@ async def websocket_endpoint(websocket: WebSocket) -> None:
                 user_input = UserInput(**payload)
                 conversation = ConversationWindow(messages=payload.get("conversation", []))
                 product_profile = ProductProfile(**payload.get("product_profile", {})) if payload.get("product_profile") else ProductProfile()
-                ctx = RequestContext(request_id=request_id)
+                ctx = RequestContext(request_id=request_id).with_timeout(settings.request_timeout_s)
                 active_contexts[request_id] = ctx
                 task = asyncio.create_task(
-                    orchestrator.run(
+                    _run_admitted(
+                        connection_id,
+                        owner,
                         ctx=ctx,
                         user_input=user_input,
                         conversation=conversation,
@@ -131,3 +413,6 @@ async def websocket_endpoint(websocket: WebSocket) -> None:
         for task in active_tasks.values():
             if not task.done():
                 task.cancel()
+        if isinstance(event_sink, CoalescingEventSink):
+            await event_sink.aclose(flush=False)
+        await outbound.aclose()
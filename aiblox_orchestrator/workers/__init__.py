@@ -0,0 +1 @@
+"""Background workers that maintain derived KB data off the request path."""
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+
+from aiblox_kb import ChunkCacheRepo
+from aiblox_orchestrator.observability.metrics import MetricsRegistry, get_metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SweepResult:
+    expired: int = 0
+    superseded: int = 0
+    orphans: int = 0
+    evicted_entries: int = 0
+    evicted_bytes: int = 0
+    total_bytes: int = 0
+    owners_over_quota: int = 0
+
+
+class ChunkCacheSweeper:
+    """
+    Periodic chunk-cache eviction.
+
+    Each sweep removes entries not read for ``ttl_seconds``, entries for superseded
+    ``content_hash`` versions, unreferenced shared content, and then least-recently-used
+    entries of every owner above ``owner_quota_bytes``. All deletes go through the repo's
+    batched maintenance methods, which delete whole entries in short transactions.
+    """
+
+    def __init__(
+        self,
+        chunk_cache_repo: ChunkCacheRepo,
+        ttl_seconds: int | None = None,
+        owner_quota_bytes: int | None = None,
+        batch_size: int = 500,
+        interval_s: float = 300.0,
+        metrics: MetricsRegistry | None = None,
+    ) -> None:
+        self.chunk_cache_repo = chunk_cache_repo
+        self.ttl_seconds = ttl_seconds
+        self.owner_quota_bytes = owner_quota_bytes
+        self.batch_size = batch_size
+        self.interval_s = interval_s
+        self.metrics = metrics or get_metrics()
+
+    async def run_forever(self, stop_event: asyncio.Event) -> None:
+        while not stop_event.is_set():
+            try:
+                await self.sweep_once()
+            except Exception:  # noqa: BLE001
+                logger.exception("chunk cache sweep failed")
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=self.interval_s)
+            except asyncio.TimeoutError:
+                pass
+
+    async def sweep_once(self) -> SweepResult:
+        result = SweepResult()
+        repo = self.chunk_cache_repo
+        # Write buffered access stamps first so TTL and LRU eviction see recent hits.
+        await repo.flush_touches()
+        if self.ttl_seconds:
+            result.expired = await repo.delete_expired(self.ttl_seconds, batch_size=self.batch_size)
+        result.superseded = await repo.delete_superseded(batch_size=self.batch_size)
+        usage = await repo.cache_usage_by_owner()
+        if self.owner_quota_bytes is not None:
+            for owner_user_id, used in usage.items():
+                if used <= self.owner_quota_bytes:
+                    continue
+                result.owners_over_quota += 1
+                entries, freed = await repo.evict_lru(
+                    owner_user_id,
+                    bytes_to_free=used - self.owner_quota_bytes,
+                    batch_size=self.batch_size,
+                )
+                result.evicted_entries += entries
+                result.evicted_bytes += freed
+                usage[owner_user_id] = used - freed
+        result.orphans = await repo.delete_orphans(batch_size=self.batch_size)
+        result.total_bytes = sum(usage.values())
+        self._record(result, owners=len(usage))
+        return result
+
+    def _record(self, result: SweepResult, owners: int) -> None:
+        m = self.metrics
+        m.inc("chunk_cache_evicted_entries_total", result.expired, reason="ttl")
+        m.inc("chunk_cache_evicted_entries_total", result.superseded, reason="superseded")
+        m.inc("chunk_cache_evicted_entries_total", result.evicted_entries, reason="quota")
+        m.inc("chunk_cache_evicted_entries_total", result.orphans, reason="orphan")
+        m.inc("chunk_cache_evicted_bytes_total", result.evicted_bytes, reason="quota")
+        m.set_gauge("chunk_cache_bytes", result.total_bytes)
+        m.set_gauge("chunk_cache_owners", owners)
+        m.set_gauge("chunk_cache_owners_over_quota", result.owners_over_quota)
+        m.inc("chunk_cache_sweeps_total")
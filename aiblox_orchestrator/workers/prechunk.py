@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, List, Sequence
+from uuid import UUID
+
+from aiblox_kb import ChunkCacheRepo, IngestCheckpointRepo, ItemEmbeddingRepo, ItemRepo, KbItem
+from aiblox_kb.repos.chunk_cache_repo import cache_row, span_only
+from aiblox_orchestrator.chunker.models import ChunkingOptions, cache_chunker_id as cache_chunker_id_for
+from aiblox_orchestrator.chunker.protocols import ChunkerRegistry
+from aiblox_orchestrator.retriever.protocols import Embedder
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PrechunkResult:
+    scanned: int = 0
+    chunked: int = 0
+    skipped: int = 0
+    chunks_written: int = 0
+    batches: int = 0
+
+
+@dataclass
+class _Checkpoint:
+    last_updated_at: datetime | None = None
+    last_item_id: UUID | None = None
+    processed_count: int = 0
+
+
+def mean_vector(vectors: Sequence[Sequence[float]]) -> list[float]:
+    if not vectors:
+        return []
+    dim = len(vectors[0])
+    total = [0.0] * dim
+    for vec in vectors:
+        for i in range(dim):
+            total[i] += float(vec[i])
+    return [x / len(vectors) for x in total]
+
+
+def batch_entries(entries: Iterable[List[dict]], max_rows: int) -> Iterator[List[dict]]:
+    """
+    Concatenate per-entry row lists into write batches of at most ``max_rows`` rows, never
+    splitting an entry; an entry larger than ``max_rows`` is written on its own.
+    """
+    batch: List[dict] = []
+    for rows in entries:
+        if batch and len(batch) + len(rows) > max_rows:
+            yield batch
+            batch = []
+        batch.extend(rows)
+    if batch:
+        yield batch
+
+
+class PrechunkWorker:
+    """
+    Ingest-time late-chunking worker.
+
+    Walks ``kb_items`` in ``(updated_at, id)`` order from a durable checkpoint, chunks and embeds
+    every item whose ``content_hash`` has no cache entry yet, and writes chunk rows (with vectors)
+    plus a mean-pooled item vector. Content the cache already holds is linked rather than
+    re-chunked. The checkpoint is saved after each committed batch, so a crash
+    only replays the last batch, and replays are idempotent (cache writes use ON CONFLICT DO NOTHING).
+
+    ``updated_at`` is stamped when the writing transaction starts, so a row can commit with a
+    timestamp the checkpoint has already passed. The scan therefore stops ``settle_lag`` behind
+    the database clock; writes whose transactions run longer than that can still be missed.
+    Entries are cached under ``cache_chunker_id(chunker_id, options)``, so they only serve
+    requests that chunk with the same ``options``.
+    """
+
+    def __init__(
+        self,
+        item_repo: ItemRepo,
+        chunk_cache_repo: ChunkCacheRepo,
+        checkpoint_repo: IngestCheckpointRepo,
+        chunker_registry: ChunkerRegistry,
+        embedder: Embedder,
+        item_embedding_repo: ItemEmbeddingRepo | None = None,
+        chunker_ids: Iterable[str] = ("default",),
+        options: ChunkingOptions | None = None,
+        batch_size: int = 200,
+        embed_batch_size: int = 256,
+        worker_name: str = "prechunk",
+        poll_interval_s: float = 5.0,
+        large_item_chars: int | None = None,
+        settle_lag: timedelta = timedelta(seconds=30),
+    ) -> None:
+        self.item_repo = item_repo
+        self.chunk_cache_repo = chunk_cache_repo
+        self.checkpoint_repo = checkpoint_repo
+        self.chunker_registry = chunker_registry
+        self.embedder = embedder
+        self.item_embedding_repo = item_embedding_repo
+        self.chunker_ids = list(chunker_ids)
+        self.options = options or ChunkingOptions()
+        self.batch_size = batch_size
+        self.embed_batch_size = embed_batch_size
+        self.worker_name = worker_name
+        self.poll_interval_s = poll_interval_s
+        # Items longer than this get span-only cache rows (see ``span_only``).
+        self.large_item_chars = large_item_chars
+        self.settle_lag = settle_lag
+
+    async def run_forever(self, stop_event: asyncio.Event) -> None:
+        while not stop_event.is_set():
+            try:
+                result = await self.run_once(stop_event)
+                if result.scanned:
+                    logger.info(
+                        "prechunk: scanned=%d chunked=%d skipped=%d chunks=%d",
+                        result.scanned,
+                        result.chunked,
+                        result.skipped,
+                        result.chunks_written,
+                    )
+            except Exception:  # noqa: BLE001
+                logger.exception("prechunk: batch failed; retrying from last checkpoint")
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=self.poll_interval_s)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run_once(self, stop_event: asyncio.Event | None = None) -> PrechunkResult:
+        """Process batches from the checkpoint until the scan catches up with ``kb_items``."""
+        result = PrechunkResult()
+        checkpoint = await self._load_checkpoint()
+        while stop_event is None or not stop_event.is_set():
+            items = await self.item_repo.list_items_updated_after(
+                updated_after=checkpoint.last_updated_at,
+                after_id=checkpoint.last_item_id,
+                limit=self.batch_size,
+                min_age=self.settle_lag,
+            )
+            if not items:
+                break
+            await self.process_batch(items, result)
+            last = items[-1]
+            checkpoint.last_updated_at = last.updated_at
+            checkpoint.last_item_id = last.id
+            checkpoint.processed_count += len(items)
+            await self.checkpoint_repo.save_checkpoint(
+                worker_name=self.worker_name,
+                last_updated_at=checkpoint.last_updated_at,
+                last_item_id=checkpoint.last_item_id,
+                processed_count=checkpoint.processed_count,
+            )
+            result.scanned += len(items)
+            result.batches += 1
+            if len(items) < self.batch_size:
+                break
+        return result
+
+    async def process_batch(self, items: List[KbItem], result: PrechunkResult | None = None) -> PrechunkResult:
+        result = result or PrechunkResult()
+        embed_model_id = getattr(self.embedder, "model_id", "unknown")
+        hashed = [item for item in items if item.content_hash and item.content_text]
+        result.skipped += len(items) - len(hashed)
+
+        item_vectors: dict = {}
+        for chunker_id in self.chunker_ids:
+            chunker = self.chunker_registry.get(chunker_id)
+            cache_chunker_id = cache_chunker_id_for(getattr(chunker, "chunker_id", chunker_id), self.options)
+            cached = await self.chunk_cache_repo.link_cached_content(
+                entries=[
+                    {"item_id": item.id, "owner_user_id": item.owner_user_id, "content_hash": item.content_hash}
+                    for item in hashed
+                ],
+                chunker_id=cache_chunker_id,
+                embed_model_id=embed_model_id,
+            )
+            pending = [item for item in hashed if (item.id, item.content_hash) not in cached]
+            result.skipped += len(hashed) - len(pending)
+            if not pending:
+                continue
+
+            # Identical content within a batch is chunked and embedded once.
+            by_hash: dict[str, list[KbItem]] = {}
+            for item in pending:
+                by_hash.setdefault(item.content_hash, []).append(item)
+            chunked = [(group, chunker.chunk(group[0].content_text, self.options)) for group in by_hash.values()]
+            texts = [chunk.text for _, chunks in chunked for chunk in chunks]
+            vectors = await self._embed(texts)
+
+            # One list of rows per cache entry (item version); writes never split an entry, since
+            # the packed layout turns each entry into one row and drops a second partial insert.
+            entries: list[list[dict]] = []
+            offset = 0
+            for group, chunks in chunked:
+                group_vecs = vectors[offset : offset + len(chunks)]
+                offset += len(chunks)
+                item_vec = mean_vector(group_vecs) if group_vecs else None
+                large = self.large_item_chars is not None and len(group[0].content_text) > self.large_item_chars
+                chunk_dicts = [{**chunk.model_dump(), "embedding": vec} for chunk, vec in zip(chunks, group_vecs)]
+                if large:
+                    chunk_dicts = [span_only(chunk_dict) for chunk_dict in chunk_dicts]
+                for item in group:
+                    entries.append(
+                        [
+                            cache_row(
+                                item_id=item.id,
+                                owner_user_id=item.owner_user_id,
+                                content_hash=item.content_hash,
+                                chunker_id=cache_chunker_id,
+                                embed_model_id=embed_model_id,
+                                chunk=chunk_dict,
+                            )
+                            for chunk_dict in chunk_dicts
+                        ]
+                    )
+                    if item_vec and item.id not in item_vectors:
+                        item_vectors[item.id] = (item, item_vec)
+            for rows in batch_entries(entries, self.batch_size * 8):
+                await self.chunk_cache_repo.write_cache_rows(rows)
+                result.chunks_written += len(rows)
+            result.chunked += len(pending)
+
+        if self.item_embedding_repo and item_vectors:
+            await self.item_embedding_repo.upsert_item_embeddings(
+                {
+                    "item_id": item.id,
+                    "owner_user_id": item.owner_user_id,
+                    "content_hash": item.content_hash,
+                    "embed_model_id": embed_model_id,
+                    "embedding": vec,
+                }
+                for item, vec in item_vectors.values()
+            )
+        return result
+
+    async def _embed(self, texts: list[str]) -> list[Sequence[float]]:
+        vectors: list[Sequence[float]] = []
+        for start in range(0, len(texts), self.embed_batch_size):
+            vectors.extend(await self.embedder.embed_texts(texts[start : start + self.embed_batch_size]))
+        return vectors
+
+    async def _load_checkpoint(self) -> _Checkpoint:
+        stored = await self.checkpoint_repo.get_checkpoint(self.worker_name)
+        if not stored:
+            return _Checkpoint()
+        return _Checkpoint(
+            last_updated_at=stored["last_updated_at"],
+            last_item_id=stored["last_item_id"],
+            processed_count=stored["processed_count"],
+        )
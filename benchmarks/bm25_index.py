@@ -0,0 +1,87 @@
+"""
+In-process BM25 index: build time, snapshot size/load time and query latency.
+
+Uses a synthetic Zipf-distributed corpus, so it needs no database. Compares MaxScore-pruned
+top-k against scoring every posting (``--top-k 0`` disables the comparison):
+
+    uv run python benchmarks/bm25_index.py --docs 200000 --vocab 50000 --queries 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import os
+import random
+import statistics
+import tempfile
+import time
+from uuid import uuid4
+
+from aiblox_kb.bm25 import Bm25Index
+
+
+def corpus(n_docs: int, vocab_size: int, rng: random.Random):
+    vocab = [f"w{i}" for i in range(vocab_size)]
+    cum_weights = list(itertools.accumulate(1 / (i + 1) for i in range(vocab_size)))
+    owners = [uuid4() for _ in range(max(1, n_docs // 1000))]
+    for _ in range(n_docs):
+        yield {
+            "id": uuid4(),
+            "owner_user_id": rng.choice(owners),
+            "kind": "doc",
+            "source": "bench",
+            "title": " ".join(rng.choices(vocab, cum_weights=cum_weights, k=6)),
+            "content_text": " ".join(rng.choices(vocab, cum_weights=cum_weights, k=rng.randint(50, 400))),
+            "metadata": {},
+        }
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=50000)
+    parser.add_argument("--vocab", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=20)
+    args = parser.parse_args()
+    rng = random.Random(11)
+
+    items = list(corpus(args.docs, args.vocab, rng))
+    index = Bm25Index()
+    start = time.perf_counter()
+    for item in items:
+        index.upsert(item)
+    print(f"build: {args.docs} docs in {time.perf_counter() - start:.1f}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bm25.snapshot")
+        start = time.perf_counter()
+        index.save(path)
+        saved = time.perf_counter() - start
+        start = time.perf_counter()
+        Bm25Index.load(path)
+        print(
+            f"snapshot: {os.path.getsize(path) / 1e6:.1f} MB, save {saved:.2f}s, "
+            f"load {time.perf_counter() - start:.2f}s"
+        )
+
+    queries = [
+        " ".join(f"w{int(rng.paretovariate(1.1)) % args.vocab}" for _ in range(rng.randint(1, 5)))
+        for _ in range(args.queries)
+    ]
+    for label, top_k in (("maxscore", args.top_k), ("exhaustive", args.docs)):
+        timings = []
+        for query in queries:
+            start = time.perf_counter()
+            index.search(query, top_k)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"{label:>10}: p50 {statistics.median(timings):7.2f}ms  p95 {percentile(timings, 0.95):7.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
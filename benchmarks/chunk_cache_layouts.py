@@ -0,0 +1,133 @@
+"""
+Compare chunk-cache layouts (rows vs packed vs content-addressed).
+
+Reports write/read latency percentiles and table growth for the same synthetic workload.
+Requires a migrated database reachable via AIBLOX_DB_DSN:
+
+    uv run python benchmarks/chunk_cache_layouts.py --items 500 --chunks 24 --dim 384
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from uuid import uuid4
+
+from sqlalchemy import delete, func, insert, select
+
+from aiblox_kb import (
+    SCHEMA,
+    ChunkCacheRepo,
+    ContentAddressedChunkCacheRepo,
+    KbChunkStore,
+    KbItem,
+    PackedChunkCacheRepo,
+    make_engine,
+    make_sessionmaker,
+)
+from aiblox_kb.settings import load_settings
+
+LAYOUTS = [
+    ("rows", ChunkCacheRepo, ["kb_chunk_cache"]),
+    ("packed", PackedChunkCacheRepo, ["kb_chunk_cache_packed"]),
+    ("content_addressed", ContentAddressedChunkCacheRepo, ["kb_chunk_store", "kb_item_chunk_refs"]),
+]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def table_bytes(sessionmaker, tables: list[str]) -> int:
+    async with sessionmaker() as session:
+        total = 0
+        for table in tables:
+            total += (await session.execute(select(func.pg_total_relation_size(f"{SCHEMA}.{table}")))).scalar_one()
+        return total
+
+
+def make_chunks(n: int, dim: int, rng: random.Random) -> list[dict]:
+    return [
+        {
+            "chunk_index": i,
+            "text": " ".join(f"tok{rng.randint(0, 5000)}" for _ in range(120)),
+            "start_idx": i * 800,
+            "end_idx": (i + 1) * 800,
+            "token_count": 120,
+            "embedding": [rng.random() for _ in range(dim)],
+        }
+        for i in range(n)
+    ]
+
+
+async def run(args: argparse.Namespace) -> None:
+    settings = load_settings()
+    engine = make_engine(settings.db_dsn)
+    sessionmaker = make_sessionmaker(engine)
+    rng = random.Random(7)
+    owner = uuid4()
+    items = [(uuid4(), f"bench-{i}") for i in range(args.items)]
+    payloads = {item_id: make_chunks(args.chunks, args.dim, rng) for item_id, _ in items}
+
+    async with sessionmaker() as session:
+        async with session.begin():
+            await session.execute(
+                insert(KbItem),
+                [
+                    {
+                        "id": item_id,
+                        "owner_user_id": owner,
+                        "kind": "bench",
+                        "source": "bench",
+                        "content_text": "bench",
+                        "content_hash": content_hash,
+                    }
+                    for item_id, content_hash in items
+                ],
+            )
+
+    print(f"{'layout':<18} {'write p50':>10} {'write p95':>10} {'read p50':>10} {'read p95':>10} {'bytes':>12}")
+    try:
+        for name, repo_cls, tables in LAYOUTS:
+            repo = repo_cls(session_factory=sessionmaker)
+            size_before = await table_bytes(sessionmaker, tables)
+            writes: list[float] = []
+            for item_id, content_hash in items:
+                start = time.perf_counter()
+                await repo.write_cached_chunks(item_id, owner, content_hash, "bench@v1", "bench-model", payloads[item_id])
+                writes.append((time.perf_counter() - start) * 1000)
+            reads: list[float] = []
+            for _ in range(args.reads):
+                item_id, content_hash = rng.choice(items)
+                start = time.perf_counter()
+                rows = await repo.get_cached_chunks(item_id, content_hash, "bench@v1", "bench-model")
+                reads.append((time.perf_counter() - start) * 1000)
+                assert len(rows) == args.chunks
+            grown = await table_bytes(sessionmaker, tables) - size_before
+            print(
+                f"{name:<18} {statistics.median(writes):>9.2f}ms {percentile(writes, 0.95):>9.2f}ms "
+                f"{statistics.median(reads):>9.2f}ms {percentile(reads, 0.95):>9.2f}ms {grown:>12,}"
+            )
+    finally:
+        async with sessionmaker() as session:
+            async with session.begin():
+                await session.execute(delete(KbItem).where(KbItem.owner_user_id == owner))
+                await session.execute(delete(KbChunkStore).where(KbChunkStore.chunker_id == "bench@v1"))
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--chunks", type=int, default=24)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--reads", type=int, default=1000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Event envelope serialization throughput, in events/sec on one core.
+
+Compares the pydantic path (``model_dump(mode="json")`` + ``json.dumps``) with
+``JsonEnvelopeEncoder`` and ``MsgpackEnvelopeEncoder`` for a token stream and for
+``rag.sources`` events:
+
+    uv run python benchmarks/event_encoding.py --events 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from uuid import uuid4
+
+from aiblox_orchestrator.protocol.encoding import JsonEnvelopeEncoder, MsgpackEnvelopeEncoder
+from aiblox_orchestrator.protocol.events import EventEnvelope
+
+
+def token_events(n: int) -> list[EventEnvelope]:
+    request_id = str(uuid4())
+    return [EventEnvelope(type="rag.token", request_id=request_id, seq=i, payload={"token": f"tok{i % 50} "}) for i in range(n)]
+
+
+def sources_events(n: int) -> list[EventEnvelope]:
+    request_id = str(uuid4())
+    sources = [
+        {
+            "source_id": str(uuid4()),
+            "kind": "doc",
+            "title": f"Document {rank}",
+            "url": f"https://example.com/{rank}",
+            "snippet": "lorem ipsum dolor sit amet " * 12,
+            "snippet_from": "chunk",
+            "score": 1.0 / rank,
+            "rank": rank,
+        }
+        for rank in range(1, 13)
+    ]
+    return [EventEnvelope(type="rag.sources", request_id=request_id, seq=i, payload={"sources": sources}) for i in range(n)]
+
+
+def bench(label: str, encode, events: list[EventEnvelope]) -> None:
+    start = time.perf_counter()
+    size = 0
+    for event in events:
+        size += len(encode(event))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {len(events) / elapsed:12,.0f} events/s  {size / len(events):8.0f} B/event")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=100000)
+    args = parser.parse_args()
+
+    for name, events in (("tokens", token_events(args.events)), ("sources", sources_events(max(1, args.events // 20)))):
+        bench(f"{name}: pydantic + json.dumps", lambda e: json.dumps(e.model_dump(mode="json")), events)
+        bench(f"{name}: JsonEnvelopeEncoder", JsonEnvelopeEncoder().encode, events)
+        bench(f"{name}: MsgpackEnvelopeEncoder", MsgpackEnvelopeEncoder().encode, events)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Measure ItemRepo.upsert_items_bulk throughput in items/sec.
+
+Inserts fresh items, re-upserts them unchanged (conflict, no rewrite) and then with changed
+content (conflict + update + tsv regeneration), for each batch size. Requires a migrated
+database reachable via AIBLOX_DB_DSN:
+
+    uv run python benchmarks/item_ingest.py --items 20000 --batch-sizes 100 500 1000 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+from uuid import uuid4
+
+from sqlalchemy import delete
+
+from aiblox_kb import ItemRepo, KbItem, make_engine, make_sessionmaker
+from aiblox_kb.settings import load_settings
+
+
+def make_items(owner, n: int, words: int, rng: random.Random, version: int) -> list[dict]:
+    return [
+        {
+            "owner_user_id": owner,
+            "kind": "doc",
+            "source": "bench",
+            "source_ref": f"doc-{i}",
+            "title": f"Document {i}",
+            "summary": f"Summary of document {i}",
+            "content_text": f"v{version} " + " ".join(f"word{rng.randint(0, 20000)}" for _ in range(words)),
+            "metadata": {"bucket": i % 10},
+        }
+        for i in range(n)
+    ]
+
+
+async def timed(repo: ItemRepo, items: list[dict], batch_size: int) -> float:
+    start = time.perf_counter()
+    await repo.upsert_items_bulk(items, batch_size=batch_size)
+    return len(items) / (time.perf_counter() - start)
+
+
+async def run(args: argparse.Namespace) -> None:
+    settings = load_settings()
+    engine = make_engine(settings.db_dsn)
+    sessionmaker = make_sessionmaker(engine)
+    repo = ItemRepo(session_factory=sessionmaker)
+    rng = random.Random(11)
+
+    print(f"{'batch':>6} {'insert/s':>10} {'unchanged/s':>12} {'update/s':>10}")
+    try:
+        for batch_size in args.batch_sizes:
+            owner = uuid4()
+            fresh = make_items(owner, args.items, args.words, rng, version=1)
+            changed = make_items(owner, args.items, args.words, rng, version=2)
+            try:
+                inserted = await timed(repo, fresh, batch_size)
+                unchanged = await timed(repo, fresh, batch_size)
+                updated = await timed(repo, changed, batch_size)
+                print(f"{batch_size:>6} {inserted:>10,.0f} {unchanged:>12,.0f} {updated:>10,.0f}")
+            finally:
+                async with sessionmaker() as session:
+                    async with session.begin():
+                        await session.execute(delete(KbItem).where(KbItem.owner_user_id == owner))
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--words", type=int, default=300)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
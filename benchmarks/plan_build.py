@@ -0,0 +1,78 @@
+"""
+DecisionRouter plan construction cost: validated pydantic models built per request (the
+pre-template router) versus instantiating a precompiled ``PlanTemplate``.
+
+    uv run python benchmarks/plan_build.py --iterations 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import uuid
+from uuid import uuid4
+
+from aiblox_orchestrator.protocol.context import ConversationWindow, ProductProfile, RequestContext, UserInput
+from aiblox_orchestrator.protocol.plans import ExecutionPlan, PlanStep
+from aiblox_orchestrator.router.decision_router import DecisionRouter
+from aiblox_orchestrator.router.retrieval_gate import RetrievalGate
+
+
+def validated_hybrid_plan(user_input: UserInput) -> ExecutionPlan:
+    """What the router did per request before templates."""
+    return ExecutionPlan(
+        plan_id=str(uuid.uuid4()),
+        steps=[
+            PlanStep(
+                step_id="retrieve",
+                kind="retrieve",
+                required=False,
+                params={"retrieval_prefs": user_input.retrieval_prefs or {}},
+            ),
+            PlanStep(
+                step_id="tool_call",
+                kind="tool_call",
+                required=False,
+                depends_on=["retrieve"],
+                params={"tool": user_input.metadata.get("tool") if user_input.metadata else None},
+            ),
+            PlanStep(
+                step_id="synthesize",
+                kind="synthesize",
+                required=True,
+                depends_on=["retrieve", "tool_call"],
+            ),
+        ],
+    )
+
+
+def bench(label: str, fn, iterations: int) -> None:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed / iterations * 1e6:8.2f} us/plan  {iterations / elapsed:12,.0f} plans/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50000)
+    args = parser.parse_args()
+
+    ctx = RequestContext(request_id=str(uuid4()))
+    user_input = UserInput(text="what does the travel policy say?", mode="hybrid", retrieval_prefs={"top_k_items": 10})
+    conversation = ConversationWindow()
+    profile = ProductProfile()
+    router = DecisionRouter()
+    gated = DecisionRouter(retrieval_gate=RetrievalGate())
+    template = router.template_for("hybrid")
+    overlays = {"retrieve": {"retrieval_prefs": user_input.retrieval_prefs}, "tool_call": {"tool": None}}
+
+    bench("validated models", lambda: validated_hybrid_plan(user_input), args.iterations)
+    bench("template.instantiate", lambda: template.instantiate(overlays), args.iterations)
+    bench("router.build_plan", lambda: router.build_plan(ctx, user_input, conversation, profile), args.iterations)
+    bench("router.build_plan + gate", lambda: gated.build_plan(ctx, user_input, conversation, profile), args.iterations)
+
+
+if __name__ == "__main__":
+    main()
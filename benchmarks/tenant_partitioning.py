@@ -0,0 +1,102 @@
+"""
+Owner-scoped FTS latency for skewed tenant sizes.
+
+Seeds one large tenant and many small ones, then times owner-filtered ``search_fts`` for each
+group. Run it once against an unpartitioned schema and once after migrating with
+``AIBLOX_KB_ITEM_PARTITIONS`` (e.g. 16) to compare; ``EXPLAIN`` output for a small tenant is
+printed so partition pruning can be checked. Requires a migrated database via AIBLOX_DB_DSN:
+
+    uv run python benchmarks/tenant_partitioning.py --big 200000 --small-tenants 200 --small 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from uuid import uuid4
+
+from sqlalchemy import delete, text
+
+from aiblox_kb import ItemRepo, KbItem, make_engine, make_sessionmaker
+from aiblox_kb.settings import load_settings
+from aiblox_orchestrator.retriever.models import RetrievalPrefs
+
+VOCAB = [f"term{i}" for i in range(5000)]
+
+
+def make_items(owner, n: int, rng: random.Random) -> list[dict]:
+    return [
+        {
+            "owner_user_id": owner,
+            "kind": "doc",
+            "source": "bench",
+            "source_ref": f"doc-{i}",
+            "title": " ".join(rng.choices(VOCAB, k=6)),
+            "content_text": " ".join(rng.choices(VOCAB, k=200)),
+        }
+        for i in range(n)
+    ]
+
+
+async def time_queries(repo: ItemRepo, owners: list, queries: int, rng: random.Random) -> list[float]:
+    timings: list[float] = []
+    for _ in range(queries):
+        prefs = RetrievalPrefs(query_text=" ".join(rng.choices(VOCAB, k=2)), filters={"owner_user_id": rng.choice(owners)})
+        start = time.perf_counter()
+        await repo.search_fts(prefs.query_text, prefs)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summary(timings: list[float]) -> str:
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return f"p50 {statistics.median(ordered):7.2f}ms  p95 {p95:7.2f}ms"
+
+
+async def run(args: argparse.Namespace) -> None:
+    settings = load_settings()
+    engine = make_engine(settings.db_dsn)
+    sessionmaker = make_sessionmaker(engine)
+    repo = ItemRepo(session_factory=sessionmaker, require_owner=True)
+    rng = random.Random(5)
+    big = uuid4()
+    small = [uuid4() for _ in range(args.small_tenants)]
+    try:
+        await repo.upsert_items_bulk(make_items(big, args.big, rng), batch_size=2000)
+        for owner in small:
+            await repo.upsert_items_bulk(make_items(owner, args.small, rng), batch_size=2000)
+        async with sessionmaker() as session:
+            await session.execute(text(f"ANALYZE {KbItem.__table__.fullname}"))
+            plan = await session.execute(
+                text(
+                    f"EXPLAIN SELECT id FROM {KbItem.__table__.fullname} "
+                    "WHERE owner_user_id = :owner AND tsv @@ websearch_to_tsquery('term1')"
+                ),
+                {"owner": small[0]},
+            )
+            print("\n".join(row[0] for row in plan))
+
+        print(f"big tenant   ({args.big:>7} items): {summary(await time_queries(repo, [big], args.queries, rng))}")
+        print(f"small tenants ({args.small:>6} items): {summary(await time_queries(repo, small, args.queries, rng))}")
+    finally:
+        async with sessionmaker() as session:
+            async with session.begin():
+                await session.execute(delete(KbItem).where(KbItem.owner_user_id.in_([big, *small])))
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--big", type=int, default=100000)
+    parser.add_argument("--small-tenants", type=int, default=100)
+    parser.add_argument("--small", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=300)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from aiblox_orchestrator.gateway.admission import AdmissionController, Overloaded
+from aiblox_orchestrator.observability.metrics import MetricsRegistry
+
+
+def make_controller(**kwargs) -> tuple[AdmissionController, MetricsRegistry]:
+    metrics = MetricsRegistry()
+    defaults = {"max_concurrent": 2, "max_per_connection": 0, "max_per_owner": 0, "max_queue": 2, "queue_timeout_s": 1.0}
+    return AdmissionController(metrics=metrics, **{**defaults, **kwargs}), metrics
+
+
+@pytest.mark.anyio
+async def test_global_limit_queues_fifo_and_hands_over_slots():
+    controller, metrics = make_controller()
+    await controller.acquire("c1")
+    await controller.acquire("c2")
+    order = []
+
+    async def waiter(name: str) -> None:
+        await controller.acquire(name)
+        order.append(name)
+
+    tasks = [asyncio.create_task(waiter("w1")), asyncio.create_task(waiter("w2"))]
+    await asyncio.sleep(0)
+    assert controller.queue_depth == 2
+    assert metrics.gauge_value("admission_queue_depth") == 2
+
+    controller.release("c1")
+    controller.release("c2")
+    await asyncio.gather(*tasks)
+    assert order == ["w1", "w2"]
+    assert controller.active == 2 and controller.queue_depth == 0
+    assert metrics.counter_value("admission_admitted") == 4
+
+
+@pytest.mark.anyio
+async def test_queue_full_and_queue_timeout_reject():
+    controller, metrics = make_controller(max_concurrent=1, max_queue=1, queue_timeout_s=0.02, retry_after_s=3)
+    await controller.acquire("c1")
+    queued = asyncio.create_task(controller.acquire("c2"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(Overloaded) as full:
+        await controller.acquire("c3")
+    assert full.value.reason == "queue_full" and full.value.retry_after_s == 3
+
+    with pytest.raises(Overloaded) as timed_out:
+        await queued
+    assert timed_out.value.reason == "queue_timeout"
+    assert controller.queue_depth == 0 and controller.active == 1
+    assert metrics.counter_value("admission_rejected", reason="queue_full") == 1
+    assert metrics.counter_value("admission_rejected", reason="queue_timeout") == 1
+
+
+@pytest.mark.anyio
+async def test_per_connection_and_owner_limits_reject_without_queueing():
+    controller, metrics = make_controller(max_concurrent=10, max_per_connection=1, max_per_owner=2)
+    await controller.acquire("c1", owner="o1")
+    with pytest.raises(Overloaded, match="connection_limit"):
+        await controller.acquire("c1", owner="o2")
+    await controller.acquire("c2", owner="o1")
+    with pytest.raises(Overloaded, match="owner_limit"):
+        await controller.acquire("c3", owner="o1")
+
+    controller.release("c1", owner="o1")
+    await controller.acquire("c1", owner="o1")
+    assert controller.active == 2
+    assert metrics.counter_value("admission_rejected", reason="owner_limit") == 1
+
+
+@pytest.mark.anyio
+async def test_cancelled_waiter_leaves_queue_and_slot_passes_on():
+    controller, _ = make_controller(max_concurrent=1)
+    async with controller.admit("c1"):
+        cancelled = asyncio.create_task(controller.acquire("c2"))
+        admitted = asyncio.create_task(controller.acquire("c3"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        assert controller.queue_depth == 1
+    await asyncio.wait_for(admitted, timeout=1)
+    assert controller.active == 1
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+
+
+@pytest.mark.anyio
+async def test_cancel_event_ends_the_queue_wait():
+    controller, metrics = make_controller(max_concurrent=1, queue_timeout_s=5.0)
+    await controller.acquire("c1", owner="o1")
+    cancelled = asyncio.Event()
+    queued = asyncio.create_task(controller.acquire("c2", owner="o1", cancelled=cancelled))
+    await asyncio.sleep(0)
+    assert controller.queue_depth == 1
+
+    cancelled.set()
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(queued, timeout=1)
+    assert controller.queue_depth == 0 and controller.active == 1
+    assert controller._per_owner == {"o1": 1}
+    assert metrics.counter_value("admission_rejected", reason="queue_timeout") == 0
+
+    # An unset event does not disturb a normal hand-over.
+    admitted = asyncio.create_task(controller.acquire("c3", cancelled=asyncio.Event()))
+    await asyncio.sleep(0)
+    controller.release("c1", owner="o1")
+    await asyncio.wait_for(admitted, timeout=1)
+    assert controller.active == 1
@@ -0,0 +1,206 @@
+import asyncio
+import math
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from aiblox_kb.bm25 import Bm25Index, tokenize
+from aiblox_kb.filters import matches_filters
+from aiblox_kb.repos.bm25_item_repo import Bm25ItemRepo
+from aiblox_orchestrator.retriever.models import RetrievalPrefs
+
+VOCAB = [f"t{i}" for i in range(200)]
+WEIGHTS = [1 / (i + 1) for i in range(len(VOCAB))]
+
+
+def make_item(rng, **overrides):
+    item = {
+        "id": uuid4(),
+        "owner_user_id": uuid4(),
+        "kind": "doc",
+        "source": "web",
+        "title": " ".join(rng.choices(VOCAB, WEIGHTS, k=3)),
+        "content_text": " ".join(rng.choices(VOCAB, WEIGHTS, k=rng.randint(5, 60))),
+        "content_hash": uuid4().hex,
+        "metadata": {"n": rng.randint(0, 4)},
+    }
+    item.update(overrides)
+    return item
+
+
+def exhaustive(index, query, top_k, filters=None):
+    """Reference BM25 over every posting, with the index's own statistics."""
+    n_docs = len(index._doc_items)
+    avgdl = index._live_len / len(index)
+    scores = {}
+    for term in dict.fromkeys(tokenize(query)):
+        postings = index._postings.get(term)
+        if postings is None:
+            continue
+        df = len(postings.docs)
+        idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+        for doc, tf in zip(postings.docs, postings.tfs):
+            row = index._rows[doc]
+            if row is None or (filters and not matches_filters(filters, row)):
+                continue
+            norm = index.k1 * (1 - index.b + index.b * index._doc_len[doc] / avgdl)
+            scores[doc] = scores.get(doc, 0.0) + idf * tf * (index.k1 + 1) / (tf + norm)
+    ranked = sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))[:top_k]
+    return [index._doc_items[doc] for doc, _ in ranked]
+
+
+def test_pruned_search_matches_exhaustive_bm25():
+    rng = random.Random(7)
+    index = Bm25Index()
+    items = [make_item(rng) for _ in range(1500)]
+    for item in items:
+        index.upsert(item)
+    for item in items[:200]:
+        index.remove(item["id"])
+    for query in ["t0 t1", "t3 t40 t150", "t199", "t2 t5 t8 t13 t21 t34"]:
+        for filters in (None, {"n": 2}, {"kind": ["doc", "note"], "metadata.n": {"gte": 3}}):
+            found = [item_id for item_id, _ in index.search(query, 10, filters)]
+            assert found == exhaustive(index, query, 10, filters)
+
+
+def test_upsert_reindexes_only_on_text_change():
+    rng = random.Random(1)
+    index = Bm25Index()
+    item = make_item(rng, content_text="alpha beta", metadata={"lang": "en"})
+    assert index.upsert(item) is True
+    # Metadata changes are applied without re-indexing.
+    assert index.upsert({**item, "metadata": {"lang": "de"}}) is False
+    assert index.search("alpha", 5, {"lang": "en"}) == []
+    assert index.upsert({**item, "content_text": "gamma", "content_hash": "new"}) is True
+    assert index.search("alpha", 5) == []
+    assert [i for i, _ in index.search("gamma", 5)] == [item["id"]]
+    assert index.dead_ratio == 0.5
+    index.compact()
+    assert index.dead_ratio == 0 and [i for i, _ in index.search("gamma", 5)] == [item["id"]]
+
+
+def test_snapshot_round_trip(tmp_path):
+    rng = random.Random(3)
+    index = Bm25Index()
+    for _ in range(300):
+        index.upsert(make_item(rng))
+    path = str(tmp_path / "bm25.snapshot")
+    index.save(path, {"updated_at": "2026-01-01T00:00:00+00:00", "item_id": str(uuid4())})
+    loaded, checkpoint = Bm25Index.load(path)
+    assert checkpoint["updated_at"].startswith("2026-01-01")
+    assert len(loaded) == len(index)
+    for query in ["t0 t9", "t77"]:
+        assert loaded.search(query, 8, {"n": 1}) == index.search(query, 8, {"n": 1})
+
+
+class FakeItemRepo:
+    def __init__(self, items):
+        self.items = items
+        self.read_session_factory = None
+
+    async def list_items_updated_after(self, updated_after, after_id, limit):
+        ordered = sorted(self.items, key=lambda i: (i.updated_at, i.id))
+        if updated_after is not None:
+            ordered = [
+                i
+                for i in ordered
+                if ((i.updated_at, i.id) > (updated_after, after_id) if after_id else i.updated_at > updated_after)
+            ]
+        return ordered[:limit]
+
+    async def iter_items(self, columns=None, owner_user_id=None, updated_since=None, page_size=1000, all_owners=False):
+        for item in self.items:
+            yield SimpleNamespace(id=item.id, updated_at=item.updated_at)
+
+
+def kb_item(text, updated_at, owner):
+    return SimpleNamespace(
+        id=uuid4(),
+        owner_user_id=owner,
+        kind="doc",
+        source="web",
+        source_ref=None,
+        title=None,
+        summary=None,
+        content_text=text,
+        content_hash=text,
+        metadata_={},
+        updated_at=updated_at,
+    )
+
+
+@pytest.mark.anyio
+async def test_repo_refreshes_incrementally_and_serves_search_fts(tmp_path):
+    t0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    owner = uuid4()
+    items = [kb_item(f"shared word{i}", t0 + timedelta(seconds=i), owner) for i in range(25)]
+    source = FakeItemRepo(items)
+    repo = Bm25ItemRepo(source, snapshot_path=str(tmp_path / "idx"), page_size=10)
+
+    assert await repo.refresh() == 25
+    # The overlap window re-reads recent rows but does not re-index unchanged text.
+    assert await repo.refresh() == 0
+    items.append(kb_item("fresh text", t0 + timedelta(seconds=100), owner))
+    assert await repo.refresh() == 1
+
+    prefs = RetrievalPrefs(query_text="fresh", filters={"owner_user_id": str(owner)}, top_k_items=5)
+    assert [i for i, _ in await repo.search_fts("fresh", prefs)] == [items[-1].id]
+
+    del items[0]
+    assert await repo.reconcile_deletions() == 1
+    assert repo.save_snapshot()
+    restored = Bm25ItemRepo(source, snapshot_path=str(tmp_path / "idx"), page_size=10)
+    assert restored.load_snapshot() and len(restored.index) == 25
+    assert await restored.refresh() == 0
+
+
+@pytest.mark.anyio
+async def test_repo_search_uses_bm25_floor_and_threads_large_indexes():
+    t0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    owner = uuid4()
+    items = [kb_item(f"shared word{i}", t0 + timedelta(seconds=i), owner) for i in range(10)]
+    prefs = RetrievalPrefs(
+        query_text="shared word3", filters={"owner_user_id": str(owner)}, top_k_items=5, fts={"min_rank": 100.0}
+    )
+
+    inline = Bm25ItemRepo(FakeItemRepo(items))
+    await inline.refresh()
+    threaded = Bm25ItemRepo(FakeItemRepo(items), thread_min_docs=1)
+    await threaded.refresh()
+    # ts_rank's min_rank is not a BM25 floor; results come back as without it.
+    hits = await inline.search_fts("shared word3", prefs)
+    assert hits[0][0] == items[3].id and len(hits) == 5
+    assert await threaded.search_fts("shared word3", prefs) == hits
+
+    floored = Bm25ItemRepo(FakeItemRepo(items), min_score=hits[1][1] + 1e-9)
+    await floored.refresh()
+    assert await floored.search_fts("shared word3", prefs) == hits[:1]
+
+
+@pytest.mark.anyio
+async def test_snapshot_waits_for_a_save_still_in_flight(tmp_path):
+    repo = Bm25ItemRepo(FakeItemRepo([]), snapshot_path=str(tmp_path / "idx"))
+    release = threading.Event()
+    active, overlapped = [], []
+
+    def slow_save():
+        overlapped.append(bool(active))
+        active.append(1)
+        release.wait(5)
+        active.pop()
+        return True
+
+    repo.save_snapshot = slow_save
+    first = asyncio.create_task(repo.snapshot())
+    await asyncio.sleep(0.05)
+    first.cancel()
+    second = asyncio.create_task(repo.snapshot())
+    await asyncio.sleep(0.05)
+    assert overlapped == [False]
+    release.set()
+    assert await second
+    assert overlapped == [False, False]
@@ -0,0 +1,78 @@
+from uuid import uuid4
+
+import pytest
+
+from aiblox_orchestrator.observability.metrics import MetricsRegistry
+from aiblox_orchestrator.workers.cache_sweeper import ChunkCacheSweeper
+
+
+class FakeCacheRepo:
+    def __init__(self, usage):
+        self.usage = dict(usage)
+        self.calls: list[tuple] = []
+        self.flushes = 0
+
+    async def delete_expired(self, ttl_seconds, batch_size=500):
+        self.calls.append(("expired", ttl_seconds))
+        return 2
+
+    async def delete_superseded(self, batch_size=500):
+        self.calls.append(("superseded",))
+        return 1
+
+    async def delete_orphans(self, batch_size=500):
+        return 0
+
+    async def flush_touches(self):
+        self.calls.append(("flush",))
+        self.flushes += 1
+        return 0
+
+    async def cache_usage_by_owner(self):
+        return dict(self.usage)
+
+    async def evict_lru(self, owner_user_id, bytes_to_free, batch_size=500):
+        self.calls.append(("evict", owner_user_id, bytes_to_free))
+        return 3, bytes_to_free
+
+
+@pytest.mark.anyio
+async def test_sweep_applies_ttl_superseded_and_quota():
+    big, small = uuid4(), uuid4()
+    repo = FakeCacheRepo({big: 1500, small: 100})
+    metrics = MetricsRegistry()
+    sweeper = ChunkCacheSweeper(repo, ttl_seconds=60, owner_quota_bytes=1000, metrics=metrics)
+
+    result = await sweeper.sweep_once()
+
+    assert result.expired == 2
+    assert result.superseded == 1
+    # Recent hits are stamped before anything is expired.
+    assert repo.calls[:2] == [("flush",), ("expired", 60)]
+    assert repo.flushes == 1
+    assert ("evict", big, 500) in repo.calls
+    assert all(call[1] != small for call in repo.calls if call[0] == "evict")
+    assert result.total_bytes == 1100
+    assert metrics.gauge_value("chunk_cache_bytes") == 1100
+    assert metrics.counter_value("chunk_cache_evicted_entries_total", reason="quota") == 3
+
+
+@pytest.mark.anyio
+async def test_sweep_without_ttl_or_quota_only_drops_superseded():
+    repo = FakeCacheRepo({uuid4(): 10_000})
+    sweeper = ChunkCacheSweeper(repo, metrics=MetricsRegistry())
+
+    result = await sweeper.sweep_once()
+
+    assert [c[0] for c in repo.calls] == ["flush", "superseded"]
+    assert result.evicted_entries == 0
+
+
+def test_metrics_snapshot_labels():
+    metrics = MetricsRegistry()
+    metrics.inc("requests_total", kind="a")
+    metrics.inc("requests_total", 2, kind="a")
+    metrics.observe("latency_ms", 5.0)
+    snap = metrics.snapshot()
+    assert snap["counters"]["requests_total{kind=a}"] == 3
+    assert snap["summaries"]["latency_ms"] == {"count": 1, "sum": 5.0, "max": 5.0}
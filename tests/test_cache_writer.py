@@ -0,0 +1,92 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+
+from aiblox_orchestrator.observability.metrics import MetricsRegistry
+from aiblox_orchestrator.retriever.cache_writer import WriteBehindChunkCacheWriter
+
+
+class RecordingRepo:
+    def __init__(self, fail: bool = False):
+        self.batches: list[list[dict]] = []
+        self.fail = fail
+
+    async def write_cache_rows(self, rows):
+        if self.fail:
+            raise RuntimeError("db down")
+        self.batches.append(list(rows))
+
+
+def chunks(n: int) -> list[dict]:
+    return [{"chunk_index": i, "text": f"chunk {i}", "embedding": [0.1, 0.2]} for i in range(n)]
+
+
+def submit(writer: WriteBehindChunkCacheWriter, n: int, content_hash: str = "h") -> bool:
+    return writer.submit(uuid4(), uuid4(), content_hash, "chunker@v1", "embed@v1", chunks(n))
+
+
+@pytest.mark.anyio
+async def test_writer_coalesces_entries_without_splitting_them():
+    repo = RecordingRepo()
+    writer = WriteBehindChunkCacheWriter(repo, max_batch_rows=5, metrics=MetricsRegistry())
+    for _ in range(4):
+        assert submit(writer, 2)
+
+    await writer.flush()
+
+    assert [len(b) for b in repo.batches] == [4, 4]
+    assert writer.pending_rows == 0
+
+
+@pytest.mark.anyio
+async def test_writer_flushes_in_background_and_drains_on_stop():
+    repo = RecordingRepo()
+    writer = WriteBehindChunkCacheWriter(repo, max_batch_rows=100, flush_interval_s=0.01, metrics=MetricsRegistry())
+    writer.start()
+    submit(writer, 3)
+    await asyncio.sleep(0.05)
+    assert sum(len(b) for b in repo.batches) == 3
+
+    submit(writer, 2)
+    await writer.stop()
+    assert sum(len(b) for b in repo.batches) == 5
+    assert not submit(writer, 1)
+
+
+@pytest.mark.anyio
+async def test_writer_drops_when_queue_is_full_or_entry_is_queued():
+    metrics = MetricsRegistry()
+    writer = WriteBehindChunkCacheWriter(RecordingRepo(), max_pending_rows=4, metrics=metrics)
+    item_id, owner = uuid4(), uuid4()
+    assert writer.submit(item_id, owner, "h", "c", "e", chunks(3))
+    assert not writer.submit(item_id, owner, "h", "c", "e", chunks(3))
+    assert not submit(writer, 2)
+    assert writer.pending_rows == 3
+    assert metrics.counter_value("chunk_cache_write_dropped_total", reason="backpressure") == 1
+
+
+@pytest.mark.anyio
+async def test_writer_survives_failed_batches():
+    metrics = MetricsRegistry()
+    writer = WriteBehindChunkCacheWriter(RecordingRepo(fail=True), metrics=metrics)
+    submit(writer, 2)
+    submit(writer, 3)
+    await writer.flush()
+    assert writer.pending_rows == 0
+    # Dropped counts entries, the same unit as backpressure drops.
+    assert metrics.counter_value("chunk_cache_write_dropped_total", reason="error") == 2
+
+
+@pytest.mark.anyio
+async def test_stop_without_start_drains_the_queue():
+    repo = RecordingRepo()
+    writer = WriteBehindChunkCacheWriter(repo, max_batch_rows=100, metrics=MetricsRegistry())
+    submit(writer, 3)
+    submit(writer, 2)
+
+    await writer.stop()
+
+    assert sum(len(b) for b in repo.batches) == 5
+    assert writer.pending_rows == 0
+    assert not submit(writer, 1)
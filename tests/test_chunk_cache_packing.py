@@ -0,0 +1,46 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from aiblox_kb.packing import pack_vectors, unpack_vectors
+from aiblox_kb.repos.chunk_cache_repo import cache_row
+from aiblox_kb.repos.packed_chunk_cache_repo import pack_rows, unpack_row
+
+
+def test_pack_vectors_roundtrip():
+    vectors = [[0.5, -1.0, 2.25], [0.0, 0.125, 3.5]]
+    dim, blob = pack_vectors(vectors)
+    assert dim == 3
+    assert len(blob) == 2 * 3 * 4
+    assert unpack_vectors(blob, dim, 2) == vectors
+
+
+def test_pack_vectors_requires_all_or_nothing():
+    assert pack_vectors([[1.0], None]) == (0, None)
+    assert unpack_vectors(None, 0, 2) == [None, None]
+    with pytest.raises(ValueError):
+        pack_vectors([[1.0], [1.0, 2.0]])
+
+
+def test_pack_rows_groups_per_item_and_unpacks():
+    item_id, owner = uuid4(), uuid4()
+    chunks = [
+        {"chunk_index": 1, "text": "b", "start_idx": 2, "end_idx": 3, "embedding": [1.0, 0.0]},
+        {"chunk_index": 0, "text": "a", "start_idx": 0, "end_idx": 1, "embedding": [0.0, 1.0]},
+    ]
+    rows = [cache_row(item_id, owner, "h1", "c@v1", None, chunk) for chunk in chunks]
+
+    packed = pack_rows(rows)
+
+    assert len(packed) == 1
+    entry = packed[0]
+    assert entry["embed_model_id"] == ""
+    assert entry["chunk_indexes"] == [0, 1]
+    assert entry["chunk_texts"] == ["a", "b"]
+
+    unpacked = unpack_row(SimpleNamespace(**entry))
+    assert [c["text"] for c in unpacked] == ["a", "b"]
+    assert unpacked[0]["embedding"] == [0.0, 1.0]
+    assert unpacked[1]["start_idx"] == 2
+    assert unpacked[0]["embed_model_id"] is None
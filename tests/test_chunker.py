@@ -29,3 +29,11 @@ def test_char_chunker_overlap_and_indices():
     assert [c.text for c in chunks] == ["abcd", "cdef", "efgh"]
     assert [c.chunk_index for c in chunks] == [0, 1, 2]
     assert all(c.text.strip() for c in chunks)
+
+
+def test_token_chunker_offsets_rebuild_chunk_text():
+    chunker = SimpleTokenLikeChunker()
+    text = "  one two\n\nthree   four five "
+    chunks = chunker.chunk(text, ChunkingOptions(max_chunk_tokens=2, overlap_tokens=1))
+    assert [c.text for c in chunks] == ["one two", "two three", "three four", "four five"]
+    assert all(chunker.span_text(text[c.start_idx : c.end_idx]) == c.text for c in chunks)
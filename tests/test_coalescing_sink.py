@@ -0,0 +1,77 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from aiblox_orchestrator.gateway.coalescing import CoalescingEventSink
+from aiblox_orchestrator.observability.metrics import MetricsRegistry
+from aiblox_orchestrator.protocol.event_sink import EventSink
+from aiblox_orchestrator.protocol.events import EventEnvelope
+
+
+class RecordingSink(EventSink):
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.events: List[EventEnvelope] = []
+
+    async def emit(self, event: EventEnvelope) -> None:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.events.append(event)
+
+
+def token(request_id: str, seq: int, text: str) -> EventEnvelope:
+    return EventEnvelope(type="rag.token", request_id=request_id, seq=seq, payload={"token": text})
+
+
+def covered_seqs(events: List[EventEnvelope]) -> List[int]:
+    seqs: List[int] = []
+    for event in events:
+        if event.type == "rag.tokens":
+            seqs.extend(range(event.payload["first_seq"], event.seq + 1))
+        else:
+            seqs.append(event.seq)
+    return seqs
+
+
+@pytest.mark.anyio
+async def test_tokens_are_batched_and_flushed_before_other_events():
+    inner = RecordingSink()
+    sink = CoalescingEventSink(inner, flush_interval_s=10, metrics=MetricsRegistry())
+    await sink.emit(EventEnvelope(type="rag.started", request_id="r", seq=1))
+    for seq, text in enumerate(["a ", "b ", "c "], start=2):
+        await sink.emit(token("r", seq, text))
+    assert [e.type for e in inner.events] == ["rag.started"]
+
+    await sink.emit(EventEnvelope(type="rag.message", request_id="r", seq=5, payload={"message": "a b c"}))
+    assert [e.type for e in inner.events] == ["rag.started", "rag.tokens", "rag.message"]
+    assert inner.events[1].payload == {"tokens": ["a ", "b ", "c "], "first_seq": 2}
+    assert covered_seqs(inner.events) == [1, 2, 3, 4, 5]
+    await sink.aclose()
+
+
+@pytest.mark.anyio
+async def test_interval_and_size_flushes_keep_requests_apart():
+    inner = RecordingSink()
+    sink = CoalescingEventSink(inner, flush_interval_s=0.01, max_batch_bytes=4, metrics=MetricsRegistry())
+    await sink.emit(token("r1", 1, "x"))
+    await sink.emit(token("r2", 1, "abcd"))
+    assert [(e.request_id, e.type) for e in inner.events] == [("r2", "rag.token")]
+
+    await asyncio.sleep(0.03)
+    assert [(e.request_id, e.type, e.seq) for e in inner.events] == [("r2", "rag.token", 1), ("r1", "rag.token", 1)]
+    await sink.aclose()
+
+
+@pytest.mark.anyio
+async def test_slow_socket_applies_backpressure():
+    inner = RecordingSink(delay=0.01)
+    sink = CoalescingEventSink(inner, flush_interval_s=10, max_batch_bytes=8, metrics=MetricsRegistry())
+    peak = 0
+    for seq in range(1, 41):
+        await sink.emit(token("r", seq, "tok "))
+        peak = max(peak, sum(batch.size for batch in sink._batches.values()))
+    await sink.aclose()
+    assert peak < 8
+    assert len(inner.events) == 20
+    assert covered_seqs(inner.events) == list(range(1, 41))
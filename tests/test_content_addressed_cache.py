@@ -0,0 +1,204 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from aiblox_kb.repos.chunk_cache_repo import ChunkCacheRepo, cache_row
+from aiblox_kb.repos.content_addressed_chunk_repo import ContentAddressedChunkCacheRepo
+from aiblox_kb.uow import UnitOfWork
+
+
+class FakeResult:
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class ScriptedSession:
+    def __init__(self, db):
+        self.db = db
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return None
+
+    def begin(self):
+        return self
+
+    async def execute(self, stmt, params=None):
+        self.db.statements.append(stmt)
+        return self.db.responses.pop(0) if self.db.responses else FakeResult()
+
+    async def commit(self):
+        return None
+
+    async def rollback(self):
+        return None
+
+    async def close(self):
+        return None
+
+
+class FakeDb:
+    """Session factory answering statements with queued results, recording every statement."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.statements = []
+        self.sessions = 0
+
+    def __call__(self):
+        self.sessions += 1
+        return ScriptedSession(self)
+
+
+def sql(stmt):
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def bound(stmt, name):
+    params = stmt.compile(dialect=postgresql.dialect()).params
+    return [value for key, value in params.items() if key == name or key.startswith(f"{name}_m")]
+
+
+def stored_chunk(content_hash, index):
+    return SimpleNamespace(
+        id=uuid4(),
+        content_hash=content_hash,
+        chunker_id="c",
+        embed_model_id="e",
+        chunk_index=index,
+        chunk_text=f"chunk {index}",
+        start_idx=index * 10,
+        end_idx=index * 10 + 9,
+        token_count=2,
+        embedding=[0.5, 0.5],
+    )
+
+
+@pytest.mark.anyio
+async def test_hits_on_shared_content_attach_the_reading_items():
+    linked_item, new_item, owner = uuid4(), uuid4(), uuid4()
+    db = FakeDb(
+        FakeResult([stored_chunk("h", 0), stored_chunk("h", 1)]),
+        FakeResult([SimpleNamespace(id=new_item, owner_user_id=owner, content_hash="h")]),
+    )
+    repo = ContentAddressedChunkCacheRepo(db)
+
+    found = await repo.get_cached_chunks_many([(linked_item, "h"), (new_item, "h"), (uuid4(), "miss")], "c", "e")
+
+    assert set(found) == {(linked_item, "h"), (new_item, "h")}
+    assert [c["chunk_index"] for c in found[(new_item, "h")]] == [0, 1]
+    assert found[(new_item, "h")][0]["item_id"] == str(new_item)
+    select_store, select_unlinked, insert_refs = db.statements
+    assert "kb.kb_chunk_store" in sql(select_store)
+    assert "NOT (EXISTS" in sql(select_unlinked) and "kb.kb_item_chunk_refs" in sql(select_unlinked)
+    assert sql(insert_refs).startswith("INSERT INTO kb.kb_item_chunk_refs")
+    assert "ON CONFLICT" in sql(insert_refs)
+    assert bound(insert_refs, "item_id") == [new_item] and bound(insert_refs, "owner_user_id") == [owner]
+
+
+@pytest.mark.anyio
+async def test_refs_added_by_reads_inside_a_unit_of_work_are_deferred():
+    item_id, owner = uuid4(), uuid4()
+    db = FakeDb(
+        FakeResult(),  # SET TRANSACTION READ ONLY
+        FakeResult([stored_chunk("h", 0)]),
+        FakeResult([SimpleNamespace(id=item_id, owner_user_id=owner, content_hash="h")]),
+    )
+    repo = ContentAddressedChunkCacheRepo(db)
+
+    async with UnitOfWork(db):
+        assert await repo.get_cached_chunks_many([(item_id, "h")], "c", "e")
+        assert db.sessions == 1
+    assert db.sessions == 2
+    assert sql(db.statements[-1]).startswith("INSERT INTO kb.kb_item_chunk_refs")
+
+
+@pytest.mark.anyio
+async def test_misses_and_linked_hits_write_nothing():
+    db = FakeDb(FakeResult([stored_chunk("h", 0)]), FakeResult())
+    repo = ContentAddressedChunkCacheRepo(db)
+    assert await repo.get_cached_chunks_many([(uuid4(), "h")], "c", "e")
+    assert len(db.statements) == 2
+
+    empty = FakeDb(FakeResult())
+    assert await ContentAddressedChunkCacheRepo(empty).get_cached_chunks_many([(uuid4(), "h")], "c", "e") == {}
+    assert len(empty.statements) == 1
+
+
+@pytest.mark.anyio
+async def test_writes_store_shared_content_once_and_ref_every_item():
+    db = FakeDb()
+    repo = ContentAddressedChunkCacheRepo(db)
+    owner = uuid4()
+    chunks = [{"chunk_index": i, "text": f"t{i}", "embedding": [0.1]} for i in range(2)]
+    items = [uuid4(), uuid4()]
+    rows = [cache_row(item_id, owner, "h", "c", None, chunk) for item_id in items for chunk in chunks]
+
+    await repo.write_cache_rows(rows)
+
+    assert db.sessions == 1
+    store, refs = db.statements
+    assert "INSERT INTO kb.kb_chunk_store" in sql(store) and "DO NOTHING" in sql(store)
+    assert bound(store, "chunk_index") == [0, 1]
+    assert bound(store, "embed_model_id") == [""] * 2
+    assert sorted(bound(refs, "item_id")) == sorted(items)
+
+
+@pytest.mark.anyio
+async def test_link_cached_content_refs_only_stored_content():
+    db = FakeDb(FakeResult(["stored"]))
+    repo = ContentAddressedChunkCacheRepo(db)
+    owner = uuid4()
+    hit, miss = uuid4(), uuid4()
+    entries = [
+        {"item_id": hit, "owner_user_id": owner, "content_hash": "stored"},
+        {"item_id": miss, "owner_user_id": owner, "content_hash": "new"},
+    ]
+
+    assert await repo.link_cached_content(entries, "c", "e") == {(hit, "stored")}
+    assert bound(db.statements[1], "item_id") == [hit]
+
+
+@pytest.mark.anyio
+async def test_delete_orphans_deletes_in_batches_until_a_short_page():
+    db = FakeDb(
+        FakeResult([("h1", "c", "e"), ("h2", "c", "e")]),
+        FakeResult(),
+        FakeResult([("h3", "c", "e")]),
+        FakeResult(),
+    )
+    repo = ContentAddressedChunkCacheRepo(db)
+
+    assert await repo.delete_orphans(batch_size=2) == 3
+    deletes = [stmt for stmt in db.statements if sql(stmt).startswith("DELETE")]
+    assert len(deletes) == 2
+    # The delete re-checks that no ref appeared since the select.
+    assert all("NOT (EXISTS" in sql(stmt) for stmt in deletes)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    ("repo_cls", "table"),
+    [(ChunkCacheRepo, "kb_chunk_cache"), (ContentAddressedChunkCacheRepo, "kb_item_chunk_refs")],
+)
+async def test_ttl_counts_from_the_last_read(repo_cls, table):
+    db = FakeDb()
+    repo = repo_cls(db)
+
+    assert await repo.delete_expired(ttl_seconds=60) == 0
+    assert await repo.get_cached_chunks_many([(uuid4(), "h")], "c", "e", ttl_seconds=60) == {}
+
+    expired, read = map(sql, db.statements)
+    assert f"kb.{table}.last_accessed_at <" in expired
+    assert f"kb.{table}.last_accessed_at >=" in read
+    assert "created_at" not in expired.split("WHERE", 1)[1] + read.split("WHERE", 1)[1]
@@ -0,0 +1,47 @@
+import pytest
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.util import greenlet_spawn
+
+from aiblox_kb.db import InstrumentedAsyncPool, make_engine, pool_stats
+
+
+class FakeDBAPIConnection:
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_make_engine_applies_pool_and_statement_cache_settings():
+    engine = make_engine(
+        "postgresql+asyncpg://u:p@localhost:5432/db",
+        pool_size=7,
+        max_overflow=3,
+        prepared_statement_cache_size=250,
+    )
+    assert isinstance(engine.pool, InstrumentedAsyncPool)
+    assert engine.url.query["prepared_statement_cache_size"] == "250"
+    stats = pool_stats(engine)
+    assert (stats.size, stats.max_overflow, stats.checked_out) == (7, 3, 0)
+
+
+@pytest.mark.anyio
+async def test_pool_records_checkout_waits_and_timeouts():
+    pool = InstrumentedAsyncPool(creator=FakeDBAPIConnection, pool_size=1, max_overflow=0, timeout=0.05)
+    waits: list[float] = []
+    pool.on_checkout_wait = waits.append
+
+    def exhaust():
+        held = pool.connect()
+        with pytest.raises(sa_exc.TimeoutError):
+            pool.connect()
+        held.close()
+
+    await greenlet_spawn(exhaust)
+
+    assert pool.checkouts == 2
+    assert pool.timeouts == 1
+    assert pool.wait_seconds_max >= 0.05
+    assert len(waits) == 2
+    assert pool.checkedout() == 0
@@ -0,0 +1,164 @@
+from uuid import uuid4
+
+import pytest
+from pydantic import ValidationError
+
+from aiblox_orchestrator.protocol.context import ConversationWindow, ProductProfile, RequestContext, UserInput
+from aiblox_orchestrator.router.decision_router import DecisionRouter
+from aiblox_orchestrator.router.retrieval_gate import RetrievalGate
+
+
+def build(router: DecisionRouter, user_input: UserInput, conversation: ConversationWindow | None = None):
+    return router.build_plan(
+        ctx=RequestContext(request_id=str(uuid4())),
+        user_input=user_input,
+        conversation=conversation or ConversationWindow(),
+        product_profile=ProductProfile(),
+    )
+
+
+def kinds(plan) -> list[str]:
+    return [step.kind for step in plan.steps]
+
+
+def test_gate_skips_small_talk():
+    gate = RetrievalGate()
+    for text in ["hi", "Thanks!", "ok cool", "good morning", "", "how are you?", "what is up?", "can you help me?"]:
+        decision = gate.decide(UserInput(text=text))
+        assert not decision.retrieve, text
+
+
+def test_gate_scores_lexical_features():
+    gate = RetrievalGate()
+    strong = gate.decide(UserInput(text="What does the travel policy say about per diem for trips over 5 days?"))
+    assert strong.retrieve and strong.top_k_items is None
+    assert strong.features["question"] and strong.features["cues"] == ["policy"]
+
+    weak = gate.decide(UserInput(text="what changed in v2?"))
+    assert weak.retrieve and weak.top_k_items == 5
+    assert weak.reason == "low_confidence"
+
+    assert not gate.decide(UserInput(text="that sounds fun")).retrieve
+    assert gate.decide(UserInput(text="I don't think it's right")).features["entities"] == 0
+    assert gate.decide(UserInput(text="what does 'late fee' mean")).features["entities"] == 1
+
+
+def test_gate_uses_conversation_state():
+    gate = RetrievalGate()
+    previous = ConversationWindow(
+        messages=[
+            {"role": "user", "content": "find the onboarding guide"},
+            {"role": "assistant", "content": "...", "sources": [{"source_id": "doc1"}]},
+        ]
+    )
+    text = UserInput(text="and the part about laptops")
+    assert not gate.decide(text).retrieve
+    assert gate.decide(text, previous).retrieve
+
+
+def test_router_without_gate_keeps_mode_plans():
+    router = DecisionRouter()
+    assert kinds(build(router, UserInput(text="what does the policy say?", mode="chat"))) == ["synthesize"]
+    plan = build(router, UserInput(text="hi", mode="hybrid"))
+    assert kinds(plan) == ["retrieve", "tool_call", "synthesize"]
+    assert plan.metadata == {}
+
+
+def test_router_gate_adds_and_drops_retrieval():
+    router = DecisionRouter(retrieval_gate=RetrievalGate())
+
+    chat = build(router, UserInput(text="What does the travel policy say about per diem for trips over 5 days?"))
+    assert kinds(chat) == ["retrieve", "synthesize"]
+    assert chat.steps[0].required is False
+    assert chat.metadata["retrieval_gate"]["retrieve"] is True
+
+    small_talk = build(router, UserInput(text="thanks!", mode="hybrid"))
+    assert kinds(small_talk) == ["tool_call", "synthesize"]
+    assert small_talk.steps[1].depends_on == ("tool_call",)
+    assert small_talk.metadata["retrieval_gate"]["reason"] == "small_talk"
+
+    rag = build(router, UserInput(text="hi", mode="rag"))
+    assert kinds(rag) == ["retrieve", "synthesize"]
+    assert "retrieval_gate" not in rag.metadata
+
+
+def test_router_gate_shrinks_top_k_unless_requested():
+    router = DecisionRouter(retrieval_gate=RetrievalGate())
+    shrunk = build(router, UserInput(text="what changed in v2?", mode="hybrid"))
+    assert shrunk.steps[0].params["retrieval_prefs"] == {"top_k_items": 5}
+
+    prefs = {"top_k_items": 30}
+    explicit = build(router, UserInput(text="what changed in v2?", mode="hybrid", retrieval_prefs=prefs))
+    assert explicit.steps[0].params["retrieval_prefs"] == {"top_k_items": 30}
+    assert prefs == {"top_k_items": 30}
+
+
+def test_template_registration_validates_plan():
+    router = DecisionRouter()
+    with pytest.raises(ValueError, match="duplicate"):
+        router.register_template("x", [{"step_id": "a", "kind": "finalize"}, {"step_id": "a", "kind": "finalize"}])
+    with pytest.raises(ValueError, match="unknown"):
+        router.register_template("x", [{"step_id": "a", "kind": "finalize", "depends_on": ["b"]}])
+    with pytest.raises(ValueError, match="cycle"):
+        router.register_template(
+            "x",
+            [
+                {"step_id": "a", "kind": "finalize", "depends_on": ["b"]},
+                {"step_id": "b", "kind": "finalize", "depends_on": ["a"]},
+            ],
+        )
+    with pytest.raises(ValidationError):
+        router.register_template("x", [{"step_id": "a", "kind": "unknown"}])
+
+
+def test_templates_share_frozen_steps_and_overlay_per_request():
+    router = DecisionRouter()
+    first = build(router, UserInput(text="q", mode="hybrid", retrieval_prefs={"top_k_items": 3}))
+    second = build(router, UserInput(text="q", mode="hybrid"))
+    template = router.template_for("hybrid")
+
+    assert first.plan_id != second.plan_id
+    assert first.steps[0].params["retrieval_prefs"] == {"top_k_items": 3}
+    assert second.steps[0] is template.steps[0]
+    assert first.steps[2] is second.steps[2] is template.steps[2]
+    assert template.steps[0].params["retrieval_prefs"] == {}
+    with pytest.raises(ValidationError):
+        first.steps[2].required = False
+
+
+def test_mutating_a_plan_does_not_leak_into_the_next():
+    router = DecisionRouter()
+    first = build(router, UserInput(text="q", mode="hybrid", retrieval_prefs={"filters": {"kind": "doc"}}))
+    with pytest.raises(AttributeError):
+        first.steps[2].depends_on.append("zzz")
+    with pytest.raises(TypeError):
+        first.steps[2].params["x"] = 1
+    with pytest.raises(TypeError):
+        first.steps[0].params["retrieval_prefs"]["filters"]["kind"] = "note"
+    assert first.model_dump()["steps"][0]["params"] == {"retrieval_prefs": {"filters": {"kind": "doc"}}}
+
+    second = build(router, UserInput(text="q", mode="hybrid"))
+    assert second.steps[2].depends_on == ("retrieve", "tool_call")
+    assert second.steps[0].params == {"retrieval_prefs": {}}
+
+
+def test_profile_template_overrides_default():
+    router = DecisionRouter(
+        templates={
+            ("rag", "docs"): [
+                {"step_id": "retrieve", "kind": "retrieve", "timeout_s": 2.0},
+                {"step_id": "synthesize", "kind": "synthesize", "depends_on": ["retrieve"]},
+                {"step_id": "results", "kind": "emit_results", "depends_on": ["retrieve"], "required": False},
+            ]
+        }
+    )
+    docs = router.build_plan(
+        ctx=RequestContext(request_id=str(uuid4())),
+        user_input=UserInput(text="q", mode="rag", retrieval_prefs={"top_k_items": 7}),
+        conversation=ConversationWindow(),
+        product_profile=ProductProfile(name="docs"),
+    )
+    assert kinds(docs) == ["retrieve", "synthesize", "emit_results"]
+    assert docs.steps[0].timeout_s == 2.0
+    assert docs.steps[0].params["retrieval_prefs"] == {"top_k_items": 7}
+    assert kinds(build(router, UserInput(text="q", mode="rag"))) == ["retrieve", "synthesize"]
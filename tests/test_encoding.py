@@ -0,0 +1,110 @@
+import json
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+
+from aiblox_orchestrator.protocol.encoding import (
+    MSGPACK_SUBPROTOCOL,
+    JsonEnvelopeEncoder,
+    MsgpackEnvelopeEncoder,
+    decode_client_message,
+    negotiate_encoder,
+    packb,
+    unpackb,
+)
+from aiblox_orchestrator.protocol.events import EventEnvelope
+
+EVENTS = [
+    EventEnvelope(type="rag.token", request_id="r1", seq=3, payload={"token": "héllo \"q\"\n"}),
+    EventEnvelope(type="rag.done", request_id="r1", seq=9, payload={"status": "ok"}),
+    EventEnvelope(type="rag.started", request_id="r2", seq=1, ts=datetime(2026, 1, 1, tzinfo=timezone.utc)),
+    EventEnvelope(
+        type="rag.sources",
+        request_id="rü",
+        seq=2,
+        ts=datetime(2026, 1, 1, 12, 30, 1, 5, tzinfo=timezone(timedelta(hours=2))),
+        payload={
+            "sources": [
+                {"source_id": uuid4(), "score": 0.25, "rank": 1, "snippet": None, "tags": ("a", "b")},
+                {"source_id": "doc", "score": -3, "rank": 300, "updated": datetime.now(timezone.utc)},
+            ],
+            "debug": {"big": 2**40, "neg": -2**40, "flag": True, "text": "x" * 70000},
+        },
+    ),
+]
+
+
+@pytest.mark.parametrize("event", EVENTS, ids=lambda e: e.type)
+def test_json_encoder_matches_pydantic_output(event):
+    encoder = JsonEnvelopeEncoder()
+    expected = json.dumps(event.model_dump(mode="json"))
+    assert encoder.encode(event) == expected
+    # Second encode goes through the cached head.
+    assert encoder.encode(event) == expected
+
+
+@pytest.mark.parametrize("event", EVENTS, ids=lambda e: e.type)
+def test_msgpack_encoder_round_trips(event):
+    data = MsgpackEnvelopeEncoder().encode(event)
+    assert unpackb(data) == json.loads(json.dumps(event.model_dump(mode="json")))
+
+
+def test_msgpack_scalars_and_lengths():
+    values = [0, 127, 128, -1, -32, -33, 2**32, 2**63, -(2**63), 1.5, "", "x" * 31, "x" * 255, "x" * 256]
+    values += [list(range(16)), {str(i): i for i in range(16)}, None, False]
+    for value in values:
+        assert unpackb(packb(value)) == value
+
+
+# Bytes as written by standard encoders (msgpack-python with default settings, spec examples).
+REFERENCE_BYTES = [
+    (bytes.fromhex("81a5746f705f6bccc8"), {"top_k": 200}),
+    (bytes.fromhex("82a7636f6d70616374c3a6736368656d6100"), {"compact": True, "schema": 0}),
+    (bytes.fromhex("cd0100"), 256),
+    (bytes.fromhex("d0df"), -33),
+    (bytes.fromhex("d1ff00"), -256),
+    (bytes.fromhex("d2ffff0000"), -65536),
+    (bytes.fromhex("ca3fc00000"), 1.5),
+    (bytes.fromhex("c403616263"), b"abc"),
+    (bytes.fromhex("c50001ff"), b"\xff"),
+    (bytes.fromhex("d902c3a9"), "é"),
+    (bytes.fromhex("dc000301c0c2"), [1, None, False]),
+    (bytes.fromhex("de0001a161cd03e8"), {"a": 1000}),
+    (bytes.fromhex("d6ff00000000"), datetime(1970, 1, 1, tzinfo=timezone.utc)),
+]
+
+
+@pytest.mark.parametrize("data, expected", REFERENCE_BYTES, ids=lambda v: v.hex() if isinstance(v, bytes) else None)
+def test_unpackb_reads_standard_encodings(data, expected):
+    assert unpackb(data) == expected
+
+
+def test_unpackb_rejects_deep_nesting_and_bad_input():
+    assert unpackb(b"\x91" * 64 + b"\x00") is not None
+    with pytest.raises(ValueError, match="nested"):
+        unpackb(b"\x91" * 100_000 + b"\x00")
+    with pytest.raises(ValueError, match="nested"):
+        decode_client_message(None, b"\xdc\x00\x01" * 1000 + b"\x00")
+    with pytest.raises(ValueError):
+        decode_client_message("[" * 100_000 + "]" * 100_000, None)
+    for bad in (b"\xc1", b"\xcd\x01", b"\xc4\x05ab", b"\xd4\x05\x00", b"\x81\x91\x00\x00", b"\xa2\xff\xfe"):
+        with pytest.raises(ValueError):
+            unpackb(bad)
+
+
+def test_negotiation_and_client_messages():
+    assert isinstance(negotiate_encoder([MSGPACK_SUBPROTOCOL], allow_binary=True), MsgpackEnvelopeEncoder)
+    assert isinstance(negotiate_encoder([MSGPACK_SUBPROTOCOL], allow_binary=False), JsonEnvelopeEncoder)
+    assert isinstance(negotiate_encoder([], allow_binary=True), JsonEnvelopeEncoder)
+
+    message = {"type": "rag.cancel", "request_id": "r1"}
+    assert decode_client_message(json.dumps(message), None) == message
+    assert decode_client_message(None, packb(message)) == message
+    with pytest.raises(ValueError):
+        decode_client_message("{not json", None)
+    with pytest.raises(ValueError):
+        decode_client_message(None, b"\x81\xa1")
+    with pytest.raises(ValueError, match="object"):
+        decode_client_message(None, packb([1, 2]))
+    assert decode_client_message(None, bytes.fromhex("81a5746f705f6bccc8")) == {"top_k": 200}
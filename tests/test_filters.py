@@ -0,0 +1,44 @@
+import pytest
+from sqlalchemy import and_
+from sqlalchemy.dialects import postgresql
+
+from aiblox_kb.filters import compile_filters, matches_filters
+
+
+def sql(filters) -> str:
+    return str(and_(*compile_filters(filters)).compile(dialect=postgresql.dialect()))
+
+
+def test_column_filters_support_equality_in_and_ranges():
+    compiled = sql({"kind": "doc", "source": ["web", "drive"], "updated_at": {"gte": "x", "lt": "y"}})
+    assert "kb_items.kind = " in compiled
+    assert "kb_items.source IN" in compiled
+    assert "kb_items.updated_at >= " in compiled and "kb_items.updated_at < " in compiled
+
+
+def test_metadata_equality_and_in_compile_to_containment():
+    compiled = sql({"metadata": {"team": "a"}, "lang": "en", "metadata.tag": ["x", "y"]})
+    assert compiled.count("kb_items.metadata @> ") == 4
+    assert " OR " in compiled
+
+
+def test_metadata_numeric_range_is_guarded_by_json_type():
+    compiled = sql({"year": {"gte": 2020}})
+    assert "jsonb_typeof(kb.kb_items.metadata -> " in compiled
+    assert "AS NUMERIC" in compiled
+
+
+def test_unknown_operator_is_rejected():
+    with pytest.raises(ValueError, match="between"):
+        compile_filters({"year": {"between": [1, 2]}})
+
+
+def test_matches_filters_mirrors_sql_semantics():
+    row = {"owner_user_id": "u1", "kind": "doc", "metadata": {"lang": "en", "n": 5, "tags": ["a", "b"], "v": "x"}}
+    assert matches_filters({"kind": ["doc", "note"], "lang": "en", "metadata": {"tags": ["a"]}}, row)
+    assert matches_filters({"metadata.n": {"gte": 5, "lt": 6}}, row)
+    # Numeric ranges skip non-numeric values; a scalar is not contained in a nested array.
+    assert not matches_filters({"v": {"gt": 1}}, row)
+    assert not matches_filters({"tags": "a"}, row)
+    with pytest.raises(ValueError, match="not supported"):
+        matches_filters({"updated_at": {"gte": "x"}}, row)
@@ -0,0 +1,152 @@
+import re
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from aiblox_kb.repos.item_repo import ItemRepo
+from aiblox_kb.repos.sharded_item_repo import ShardedItemRepo
+from aiblox_kb.sharding import ShardMap
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+SNAPSHOT = T0 + timedelta(hours=1)
+
+
+class PagedSession:
+    """Serves canned pages in order and records each statement."""
+
+    def __init__(self, pages, statements):
+        self.pages = pages
+        self.statements = statements
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return None
+
+    async def execute(self, stmt, params=None):
+        self.statements.append(stmt)
+        if "now()" in sql(stmt) and "kb_items" not in sql(stmt):
+            return SimpleNamespace(scalar_one=lambda: SNAPSHOT)
+        page = self.pages.pop(0)
+        return SimpleNamespace(all=lambda: page, scalars=lambda: SimpleNamespace(all=lambda: page))
+
+
+def row(offset):
+    return SimpleNamespace(id=uuid4(), updated_at=T0 + timedelta(seconds=offset))
+
+
+def sql(stmt):
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.anyio
+async def test_iter_items_pages_by_keyset_with_projection():
+    pages = [[row(1), row(2)], [row(3), row(4)], [row(5)]]
+    expected = [r.id for page in pages for r in page]
+    statements = []
+    repo = ItemRepo(session_factory=lambda: PagedSession(pages, statements))
+    owner = uuid4()
+
+    seen = [r.id async for r in repo.iter_items(columns=["content_hash"], owner_user_id=owner, updated_since=T0, page_size=2)]
+
+    assert seen == expected
+    assert len(statements) == 4
+    first, second = sql(statements[1]), sql(statements[2])
+    assert "kb.kb_items.content_text" not in first and "kb.kb_items.content_hash" in first
+    assert "kb.kb_items.owner_user_id = " in first and "kb.kb_items.updated_at >= " in first
+    assert "(kb.kb_items.updated_at, kb.kb_items.id) > " not in first
+    assert "(kb.kb_items.updated_at, kb.kb_items.id) > " in second
+    assert "ORDER BY kb.kb_items.updated_at, kb.kb_items.id" in second and "LIMIT" in second
+    # Every page is bounded by the database time taken when the walk started.
+    assert all("kb.kb_items.updated_at <= " in sql(stmt) for stmt in statements[1:])
+    assert SNAPSHOT in statements[2].compile(dialect=postgresql.dialect()).params.values()
+
+
+class TableSession:
+    """Evaluates iter_items' bounds, keyset and limit over in-memory rows at ``clock[0]``."""
+
+    def __init__(self, rows, clock):
+        self.rows = rows
+        self.clock = clock
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return None
+
+    async def execute(self, stmt, params=None):
+        compiled = stmt.compile(dialect=postgresql.dialect())
+        text, values = str(compiled), compiled.params
+        if "kb_items" not in text:
+            return SimpleNamespace(scalar_one=lambda: self.clock[0])
+        page = sorted(self.rows, key=lambda r: (r.updated_at, r.id))
+        for op, name in re.findall(r"kb\.kb_items\.updated_at (>=|<=) %\((\w+)\)s", text):
+            page = [r for r in page if (r.updated_at >= values[name] if op == ">=" else r.updated_at <= values[name])]
+        if "param_2" in values:
+            page = [r for r in page if (r.updated_at, r.id) > (values["param_1"], values["param_2"])]
+        page = page[: values["param_3" if "param_2" in values else "param_1"]]
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: page))
+
+
+@pytest.mark.anyio
+async def test_items_updated_ahead_of_the_walk_are_left_to_an_updated_since_run():
+    rows = [row(1), row(2), row(3)]
+    clock = [SNAPSHOT]
+    repo = ItemRepo(session_factory=lambda: TableSession(rows, clock))
+
+    seen = []
+    async for item in repo.iter_items(page_size=1):
+        seen.append(item.id)
+        if len(seen) == 1:
+            # Another writer touches the last item before the walk reaches it.
+            rows[2].updated_at = SNAPSHOT + timedelta(minutes=1)
+    assert seen == [rows[0].id, rows[1].id]
+
+    clock[0] = SNAPSHOT + timedelta(minutes=2)
+    assert [r.id async for r in repo.iter_items(updated_since=SNAPSHOT)] == [rows[2].id]
+
+
+@pytest.mark.anyio
+async def test_iter_items_uses_read_sessions_and_requires_owner():
+    reads, writes = [], []
+    repo = ItemRepo(
+        session_factory=lambda: PagedSession([], writes),
+        read_session_factory=lambda: PagedSession([[row(1)]], reads),
+        require_owner=True,
+    )
+    with pytest.raises(ValueError, match="owner_user_id"):
+        [r async for r in repo.iter_items()]
+
+    assert len([r async for r in repo.iter_items(all_owners=True)]) == 1
+    assert len(reads) == 2 and not writes
+
+
+@pytest.mark.anyio
+async def test_iter_items_rejects_unknown_columns():
+    repo = ItemRepo(session_factory=lambda: PagedSession([], []))
+    with pytest.raises(ValueError, match="unknown kb_items columns"):
+        [r async for r in repo.iter_items(columns=["nope"], all_owners=True)]
+
+
+class StreamRepo:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def iter_items(self, columns=None, owner_user_id=None, updated_since=None, page_size=1000, all_owners=False):
+        for r in self.rows:
+            yield r
+
+
+@pytest.mark.anyio
+async def test_sharded_iter_items_merges_in_keyset_order():
+    rows = [row(i) for i in range(6)]
+    repo = ShardedItemRepo(
+        {"s0": StreamRepo(rows[0::2]), "s1": StreamRepo(rows[1::2]), "s2": StreamRepo([])},
+        ShardMap(["s0", "s1", "s2"]),
+    )
+    assert [r.id async for r in repo.iter_items()] == [r.id for r in rows]
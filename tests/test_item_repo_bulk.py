@@ -0,0 +1,106 @@
+import hashlib
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from aiblox_kb.repos.item_repo import ItemRepo, item_row
+
+
+class RecordingSession:
+    def __init__(self, calls):
+        self.calls = calls
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return None
+
+    def begin(self):
+        return self
+
+    async def execute(self, stmt, params=None):
+        self.calls.append((stmt, params))
+
+
+class FakeResult:
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class ResultSession(RecordingSession):
+    async def execute(self, stmt, params=None):
+        await super().execute(stmt, params)
+        return FakeResult()
+
+
+def test_item_row_computes_content_hash_and_validates():
+    owner = uuid4()
+    row = item_row({"owner_user_id": owner, "kind": "doc", "source": "web", "content_text": "hello"})
+    assert row["content_hash"] == hashlib.sha256(b"hello").hexdigest()
+    assert row["metadata"] == {} and row["id"] is not None
+    with pytest.raises(ValueError, match="content_text"):
+        item_row({"owner_user_id": owner, "kind": "doc", "source": "web"})
+
+
+@pytest.mark.anyio
+async def test_upsert_items_bulk_batches_and_dedupes_conflict_keys():
+    calls = []
+    repo = ItemRepo(session_factory=lambda: RecordingSession(calls))
+    owner = uuid4()
+    items = [
+        {"owner_user_id": owner, "kind": "doc", "source": "web", "source_ref": f"r{i % 4}", "content_text": f"v{i}"}
+        for i in range(6)
+    ]
+
+    assert await repo.upsert_items_bulk(items, batch_size=10) == 4
+    assert [p["content_text"] for p in calls[0][1]] == ["v4", "v5", "v2", "v3"]
+    assert "ON CONFLICT" in str(calls[0][0].compile(dialect=postgresql.dialect()))
+
+    calls.clear()
+    assert await repo.upsert_items_bulk(items[:4], batch_size=3) == 4
+    assert [len(params) for _, params in calls] == [3, 1]
+
+
+@pytest.mark.anyio
+async def test_upsert_items_without_source_ref_key_on_id():
+    calls = []
+    repo = ItemRepo(session_factory=lambda: RecordingSession(calls))
+    owner, item_id = uuid4(), uuid4()
+    items = [
+        {"owner_user_id": owner, "kind": "doc", "source": "web", "source_ref": "r1", "content_text": "a"},
+        {"id": item_id, "owner_user_id": owner, "kind": "doc", "source": "upload", "content_text": "b"},
+    ]
+
+    assert await repo.upsert_items_bulk(items) == 2
+    by_ref, by_id = (str(stmt.compile(dialect=postgresql.dialect())) for stmt, _ in calls)
+    assert "ON CONFLICT (owner_user_id, source, source_ref)" in by_ref
+    assert "ON CONFLICT ON CONSTRAINT kb_items_pkey" in by_id
+    assert "kb_items.owner_user_id = excluded.owner_user_id" in by_id
+    assert [p["id"] for p in calls[1][1]] == [item_id]
+
+    with pytest.raises(ValueError, match="source_ref"):
+        await repo.upsert_items_bulk([{"owner_user_id": owner, "kind": "doc", "source": "upload", "content_text": "c"}])
+
+
+@pytest.mark.anyio
+async def test_require_owner_rejects_unscoped_reads_and_scopes_fetches():
+    calls = []
+    repo = ItemRepo(session_factory=lambda: ResultSession(calls), require_owner=True)
+    with pytest.raises(ValueError, match="owner_user_id"):
+        await repo.fetch_items_by_ids([uuid4()])
+
+    owner = uuid4()
+    await repo.fetch_items_by_ids([uuid4()], owner_user_id=owner)
+    assert "kb_items.owner_user_id = " in str(calls[0][0].compile(dialect=postgresql.dialect()))
+
+    # Opt-in: the default repo serves unscoped reads.
+    unscoped = ItemRepo(session_factory=lambda: ResultSession(calls))
+    assert await unscoped.fetch_items_by_ids([uuid4()]) == []
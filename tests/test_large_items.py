@@ -0,0 +1,127 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from aiblox_kb.uow import current_unit_of_work
+from aiblox_orchestrator.chunker.registry import InMemoryChunkerRegistry
+from aiblox_orchestrator.protocol.context import RequestContext
+from aiblox_orchestrator.retriever.embedder import DeterministicEmbedder
+from aiblox_orchestrator.retriever.models import RetrievalPrefs
+from aiblox_orchestrator.retriever.retriever import HybridRetriever
+
+TEXT = " ".join(f"word{i}" for i in range(60))
+
+
+class SlicingItemRepo:
+    """Large item whose content is only reachable through ``fetch_content_slices``."""
+
+    def __init__(self):
+        self.item = SimpleNamespace(
+            id=uuid4(),
+            owner_user_id=uuid4(),
+            kind="doc",
+            source="web",
+            source_ref=None,
+            title="big",
+            summary=None,
+            metadata_={},
+            content_hash="h1",
+            content_length=len(TEXT),
+        )
+        self.fetch_calls = []
+        self.slice_calls = []
+
+    async def search_fts(self, query_text, prefs):
+        return [(self.item.id, 1.0)]
+
+    async def search_vec(self, query_vec, prefs):
+        return []
+
+    async def fetch_items_by_ids(self, item_ids, owner_user_id=None, max_content_chars=None):
+        self.fetch_calls.append(max_content_chars)
+        return [self.item]
+
+    async def fetch_content_slices(self, spans, owner_user_id=None):
+        spans = list(spans)
+        self.slice_calls.append(spans)
+        return {(item_id, start, end): TEXT[start:end] for item_id, start, end in spans}
+
+
+class MemoryCacheRepo:
+    def __init__(self):
+        self.entries = {}
+
+    async def get_cached_chunks_many(self, keys, chunker_id, embed_model_id, ttl_seconds=None):
+        return {key: self.entries[key] for key in keys if key in self.entries}
+
+    async def write_cached_chunks(self, item_id, owner_user_id, content_hash, chunker_id, embed_model_id, chunks):
+        self.entries[(item_id, content_hash)] = list(chunks)
+
+
+@pytest.mark.anyio
+async def test_large_items_are_cached_span_only_and_read_in_slices():
+    item_repo = SlicingItemRepo()
+    cache = MemoryCacheRepo()
+    retriever = HybridRetriever(
+        item_repo=item_repo,
+        chunker_registry=InMemoryChunkerRegistry(),
+        chunk_cache_repo=cache,
+        large_item_chars=100,
+    )
+    prefs = RetrievalPrefs(query_text="word3", per_item_chunk_cap=2, chunking={"max_chunk_tokens": 5})
+
+    first = await retriever.search(RequestContext(request_id="r1"), prefs)
+    assert item_repo.fetch_calls == [100]
+    # First access reads the whole text once and caches offsets without text.
+    assert item_repo.slice_calls == [[(item_repo.item.id, 0, len(TEXT))]]
+    cached = cache.entries[(item_repo.item.id, "h1")]
+    assert len(cached) == 12 and all(c["text"] == "" and c["end_idx"] > c["start_idx"] for c in cached)
+
+    item_repo.slice_calls.clear()
+    second = await retriever.search(RequestContext(request_id="r2"), prefs)
+    # Later queries fetch only the chunks that made the cut.
+    assert len(item_repo.slice_calls) == 1 and len(item_repo.slice_calls[0]) == 2
+    assert [e.text for e in second.evidence] == [e.text for e in first.evidence]
+    assert all(e.text.startswith("word") for e in second.evidence)
+
+
+class UowProbingEmbedder(DeterministicEmbedder):
+    def __init__(self):
+        super().__init__(dim=4)
+        self.in_uow: list[bool] = []
+
+    async def embed_query(self, text):
+        self.in_uow.append(current_unit_of_work() is not None)
+        return await super().embed_query(text)
+
+    async def embed_texts(self, texts):
+        self.in_uow.append(current_unit_of_work() is not None)
+        return await super().embed_texts(texts)
+
+
+@pytest.mark.anyio
+async def test_unit_of_work_is_not_held_across_embedding():
+    item_repo = SlicingItemRepo()
+    item_repo.read_session_factory = lambda: None
+    db_calls_in_uow = []
+    search_fts = item_repo.search_fts
+
+    async def probed_search_fts(query_text, prefs):
+        db_calls_in_uow.append(current_unit_of_work() is not None)
+        return await search_fts(query_text, prefs)
+
+    item_repo.search_fts = probed_search_fts
+    embedder = UowProbingEmbedder()
+    retriever = HybridRetriever(
+        item_repo=item_repo,
+        chunker_registry=InMemoryChunkerRegistry(),
+        embedder=embedder,
+        chunk_cache_repo=MemoryCacheRepo(),
+        large_item_chars=100,
+    )
+
+    await retriever.search(RequestContext(request_id="r1"), RetrievalPrefs(query_text="word3"))
+
+    assert db_calls_in_uow == [True]
+    assert embedder.in_uow == [False, False]
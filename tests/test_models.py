@@ -0,0 +1,28 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from aiblox_kb.models import FTS_CONFIG, KbItem, tsv_expression
+
+MIGRATION = Path(__file__).resolve().parents[1] / "aiblox_kb/alembic/versions/20261018_000500_generated_weighted_tsv.py"
+
+
+@pytest.mark.parametrize("config", ["simple", "pg_catalog.english", "public.my_cfg"])
+def test_tsv_expression_accepts_plain_config_names(config):
+    assert f"to_tsvector('{config}'::regconfig, coalesce(title, ''))" in tsv_expression(config)
+
+
+@pytest.mark.parametrize("config", ["", "english'); DROP TABLE kb.kb_items; --", "a.b.c", "simple "])
+def test_tsv_expression_rejects_anything_else(config):
+    with pytest.raises(ValueError, match="invalid text search config"):
+        tsv_expression(config)
+
+
+def test_create_all_and_migration_build_the_same_column():
+    spec = importlib.util.spec_from_file_location("generated_weighted_tsv", MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+
+    assert migration.tsv_expression is tsv_expression
+    assert str(KbItem.__table__.c.tsv.computed.sqltext) == tsv_expression(FTS_CONFIG)
@@ -1,9 +1,14 @@
 import asyncio
+import time
+from types import SimpleNamespace
 from typing import List
 from uuid import uuid4
 
 import pytest
 
+from aiblox_kb.repos.item_repo import ItemRepo
+from aiblox_orchestrator.chunker.registry import InMemoryChunkerRegistry
+from aiblox_orchestrator.observability.metrics import MetricsRegistry
 from aiblox_orchestrator.orchestrator import Orchestrator, StepRunner
 from aiblox_orchestrator.orchestrator.interfaces import AgentResult, DSPyRuntime, ToolResult, ValidationResult
 from aiblox_orchestrator.orchestrator.stubs import FakeDSPyRuntime, StubAgentRunner, StubToolRunner, StubValidator
@@ -13,7 +18,9 @@ from aiblox_orchestrator.protocol.events import EventEnvelope
 from aiblox_orchestrator.protocol.plans import ExecutionPlan, PlanStep
 from aiblox_orchestrator.retriever.models import CandidateItem, RetrievalBundle, RetrievalPrefs
 from aiblox_orchestrator.retriever.protocols import Retriever
+from aiblox_orchestrator.retriever.retriever import HybridRetriever
 from aiblox_orchestrator.router.decision_router import DecisionRouter
+from aiblox_orchestrator.router.retrieval_gate import RetrievalGate
 
 
 class CollectingEventSink(EventSink):
@@ -56,9 +63,98 @@ class SlowDSPyRuntime(DSPyRuntime):
             yield token
 
 
-def make_orchestrator(step_runner: StepRunner, router: DecisionRouter | None = None) -> Orchestrator:
+class ConcurrencyProbe:
+    def __init__(self) -> None:
+        self.active = 0
+        self.peak = 0
+        self.order: List[str] = []
+        self.cancelled: List[str] = []
+
+    async def hold(self, name: str, delay: float) -> None:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(name)
+            raise
+        finally:
+            self.active -= 1
+        self.order.append(name)
+
+
+class SlowToolRunner(StubToolRunner):
+    def __init__(self, probe: ConcurrencyProbe) -> None:
+        super().__init__()
+        self.probe = probe
+
+    async def call(self, ctx: RequestContext, step_params: dict) -> ToolResult:
+        await self.probe.hold(step_params.get("name", "tool"), step_params.get("delay", 0.05))
+        return ToolResult(tool_name="slow", success=step_params.get("success", True))
+
+
+class PooledToolRunner(StubToolRunner):
+    """A tool call that holds a pooled connection across an await that never checks ctx."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.pool = asyncio.Semaphore(1)
+        self.acquired = asyncio.Event()
+        self.released_at: float | None = None
+
+    async def call(self, ctx: RequestContext, step_params: dict) -> ToolResult:
+        async with self.pool:
+            self.acquired.set()
+            try:
+                await asyncio.sleep(30)
+            finally:
+                self.released_at = time.perf_counter()
+        return ToolResult(tool_name="pooled", success=True)
+
+
+def make_orchestrator(
+    step_runner: StepRunner,
+    router: DecisionRouter | None = None,
+    max_parallel_steps: int = 4,
+    metrics: MetricsRegistry | None = None,
+) -> Orchestrator:
     router = router or DecisionRouter()
-    return Orchestrator(decision_router=router, step_runner=step_runner)
+    return Orchestrator(
+        decision_router=router,
+        step_runner=step_runner,
+        max_parallel_steps=max_parallel_steps,
+        metrics=metrics or MetricsRegistry(),
+    )
+
+
+def make_plan_router(*steps: PlanStep):
+    class Router:
+        def build_plan(self, *args, **kwargs):
+            return ExecutionPlan(plan_id="p", steps=list(steps))
+
+    return Router()
+
+
+def make_probe_runner(probe: ConcurrencyProbe) -> StepRunner:
+    return StepRunner(
+        retriever=StubRetriever(),
+        dspy_runtime=FakeDSPyRuntime(),
+        tool_runner=SlowToolRunner(probe),
+        agent_runner=StubAgentRunner(),
+        validator=StubValidator(),
+    )
+
+
+async def run_plan(orch: Orchestrator, ctx: RequestContext | None = None) -> CollectingEventSink:
+    sink = CollectingEventSink()
+    await orch.run(
+        ctx=ctx or make_ctx(),
+        user_input=UserInput(text="hi", mode="chat"),
+        conversation=ConversationWindow(),
+        product_profile=ProductProfile(),
+        event_sink=sink,
+    )
+    return sink
 
 
 def make_ctx() -> RequestContext:
@@ -213,4 +309,337 @@ async def test_required_step_failure():
     )
     types = [e.type for e in sink.events]
     assert types[-2] == "rag.error"
+    assert sink.events[-2].payload["code"] == "required_step_failed"
+    assert sink.events[-1].payload["status"] == "error"
+
+
+@pytest.mark.anyio
+async def test_independent_steps_run_concurrently():
+    probe = ConcurrencyProbe()
+    router = make_plan_router(
+        PlanStep(step_id="a", kind="tool_call", params={"name": "a"}),
+        PlanStep(step_id="b", kind="tool_call", params={"name": "b"}),
+        PlanStep(step_id="c", kind="tool_call", params={"name": "c"}),
+        PlanStep(step_id="syn", kind="synthesize", depends_on=["a", "b", "c"]),
+    )
+    sink = await run_plan(make_orchestrator(make_probe_runner(probe), router=router))
+    assert probe.peak == 3
+    assert sink.events[-1].payload["status"] == "ok"
+    assert [e.seq for e in sink.events] == list(range(1, len(sink.events) + 1))
+
+
+@pytest.mark.anyio
+async def test_parallelism_cap_and_dependency_order():
+    probe = ConcurrencyProbe()
+    router = make_plan_router(
+        # Declared before its dependency: the DAG, not list order, decides when it runs.
+        PlanStep(step_id="last", kind="tool_call", depends_on=["a", "b"], params={"name": "last"}),
+        PlanStep(step_id="a", kind="tool_call", params={"name": "a"}),
+        PlanStep(step_id="b", kind="tool_call", params={"name": "b"}),
+    )
+    sink = await run_plan(make_orchestrator(make_probe_runner(probe), router=router, max_parallel_steps=1))
+    assert probe.peak == 1
+    assert probe.order == ["a", "b", "last"]
+    assert sink.events[-1].payload["status"] == "ok"
+
+
+@pytest.mark.anyio
+async def test_required_failure_cancels_siblings():
+    probe = ConcurrencyProbe()
+    router = make_plan_router(
+        PlanStep(step_id="slow", kind="tool_call", required=False, params={"name": "slow", "delay": 5}),
+        PlanStep(step_id="bad", kind="tool_call", params={"name": "bad", "delay": 0.01, "success": False}),
+        PlanStep(step_id="syn", kind="synthesize", depends_on=["slow", "bad"]),
+    )
+    sink = await asyncio.wait_for(run_plan(make_orchestrator(make_probe_runner(probe), router=router)), timeout=1)
+    assert probe.cancelled == ["slow"]
+    assert probe.active == 0
+    assert sink.events[-2].type == "rag.error"
+    assert sink.events[-2].payload["step_id"] == "bad"
     assert sink.events[-1].payload["status"] == "error"
+    assert not any(e.type == "rag.token" for e in sink.events)
+
+
+@pytest.mark.anyio
+async def test_cancel_interrupts_in_flight_step_and_releases_resources():
+    tool_runner = PooledToolRunner()
+    runner = StepRunner(
+        retriever=StubRetriever(),
+        dspy_runtime=FakeDSPyRuntime(),
+        tool_runner=tool_runner,
+        agent_runner=StubAgentRunner(),
+        validator=StubValidator(),
+    )
+    router = make_plan_router(
+        PlanStep(step_id="tool", kind="tool_call"),
+        PlanStep(step_id="syn", kind="synthesize", depends_on=["tool"]),
+    )
+    ctx = make_ctx()
+    task = asyncio.create_task(run_plan(make_orchestrator(runner, router=router), ctx))
+    await asyncio.wait_for(tool_runner.acquired.wait(), timeout=1)
+
+    cancelled_at = time.perf_counter()
+    ctx.cancel()
+    sink = await asyncio.wait_for(task, timeout=1)
+
+    assert tool_runner.released_at is not None
+    assert tool_runner.released_at - cancelled_at < 0.05
+    assert not tool_runner.pool.locked()
+    assert not ctx.bound_tasks
+    assert [e.type for e in sink.events] == ["rag.started", "rag.done"]
+    assert sink.events[-1].payload["status"] == "cancelled"
+
+
+@pytest.mark.anyio
+async def test_bound_tasks_are_shared_and_unbound_when_done():
+    ctx = make_ctx()
+    step_ctx = ctx.with_timeout(10)
+    finished = asyncio.create_task(asyncio.sleep(0))
+    blocked = asyncio.create_task(asyncio.sleep(30))
+    step_ctx.bind_task(finished)
+    step_ctx.bind_task(blocked)
+    await finished
+    assert ctx.bound_tasks == {blocked}
+
+    ctx.cancel()
+    await asyncio.gather(blocked, return_exceptions=True)
+    assert blocked.cancelled()
+    late = asyncio.create_task(asyncio.sleep(30))
+    step_ctx.bind_task(late)
+    await asyncio.gather(late, return_exceptions=True)
+    assert late.cancelled()
+
+
+@pytest.mark.anyio
+async def test_unknown_dependency_and_cycle_are_skipped():
+    probe = ConcurrencyProbe()
+    router = make_plan_router(
+        PlanStep(step_id="orphan", kind="tool_call", depends_on=["missing"], params={"name": "orphan"}),
+        PlanStep(step_id="x", kind="tool_call", depends_on=["y"], params={"name": "x"}),
+        PlanStep(step_id="y", kind="tool_call", depends_on=["x"], params={"name": "y"}),
+        PlanStep(step_id="ok", kind="tool_call", params={"name": "ok"}),
+    )
+    sink = await run_plan(make_orchestrator(make_probe_runner(probe), router=router))
+    assert probe.order == ["ok"]
+    assert sink.events[-1].payload["status"] == "ok"
+
+
+@pytest.mark.anyio
+async def test_optional_step_timeout_is_skipped():
+    probe = ConcurrencyProbe()
+    metrics = MetricsRegistry()
+    router = make_plan_router(
+        PlanStep(step_id="slow", kind="tool_call", required=False, timeout_s=0.02, params={"name": "slow", "delay": 5}),
+        PlanStep(step_id="after", kind="tool_call", depends_on=["slow"], params={"name": "after"}),
+    )
+    sink = await asyncio.wait_for(
+        run_plan(make_orchestrator(make_probe_runner(probe), router=router, metrics=metrics)), timeout=1
+    )
+    assert probe.cancelled == ["slow"]
+    assert probe.order == ["after"]
+    assert sink.events[-1].payload["status"] == "ok"
+    assert metrics.counter_value("orchestrator_step_timeouts", kind="tool_call") == 1
+
+
+@pytest.mark.anyio
+async def test_request_deadline_fails_required_step():
+    metrics = MetricsRegistry()
+    runner = StepRunner(
+        retriever=StubRetriever(),
+        dspy_runtime=SlowDSPyRuntime(),
+        tool_runner=StubToolRunner(),
+        agent_runner=StubAgentRunner(),
+        validator=StubValidator(),
+    )
+    router = make_plan_router(PlanStep(step_id="syn", kind="synthesize", timeout_s=10))
+    ctx = make_ctx().with_timeout(0.015)
+    sink = await run_plan(make_orchestrator(runner, router=router, metrics=metrics), ctx=ctx)
+    error = sink.events[-2]
+    assert error.type == "rag.error"
+    assert error.payload["code"] == "step_timeout"
+    assert error.payload["step_id"] == "syn"
+    assert sink.events[-1].payload["status"] == "error"
+    assert metrics.counter_value("orchestrator_step_timeouts", kind="synthesize") == 1
+
+
+def test_with_timeout_keeps_sooner_deadline():
+    ctx = make_ctx()
+    assert ctx.with_timeout(None) is ctx
+    assert ctx.remaining_s() is None
+    short = ctx.with_timeout(1)
+    assert 0 < short.remaining_s() <= 1
+    assert short.with_timeout(60) is short
+    assert short.cancellation_event is ctx.cancellation_event
+    assert ctx.with_timeout(-1).expired()
+
+
+class CountingRetriever(StubRetriever):
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.calls: List[RetrievalPrefs] = []
+        self.completed = 0
+
+    async def search(self, ctx: RequestContext, prefs: RetrievalPrefs) -> RetrievalBundle:
+        self.calls.append(prefs)
+        await asyncio.sleep(self.delay)
+        self.completed += 1
+        return await super().search(ctx, prefs)
+
+
+def make_speculative_orchestrator(
+    retriever: Retriever,
+    metrics: MetricsRegistry,
+    router: DecisionRouter | None = None,
+) -> Orchestrator:
+    runner = StepRunner(
+        retriever=retriever,
+        dspy_runtime=FakeDSPyRuntime(),
+        tool_runner=StubToolRunner(),
+        agent_runner=StubAgentRunner(),
+        validator=StubValidator(),
+    )
+    return Orchestrator(
+        decision_router=router or DecisionRouter(),
+        step_runner=runner,
+        metrics=metrics,
+        speculative_modes=["hybrid", "chat"],
+    )
+
+
+@pytest.mark.anyio
+async def test_speculative_retrieval_is_adopted():
+    retriever = CountingRetriever(delay=0.01)
+    metrics = MetricsRegistry()
+    orch = make_speculative_orchestrator(retriever, metrics)
+    sink = CollectingEventSink()
+    user_input = UserInput(text="query text", mode="hybrid", retrieval_prefs={"top_k_items": 5})
+    await orch.run(make_ctx(), user_input, ConversationWindow(), ProductProfile(), sink)
+    assert len(retriever.calls) == 1 and retriever.completed == 1
+    assert retriever.calls[0].top_k_items == 5
+    assert user_input.retrieval_prefs == {"top_k_items": 5}
+    assert any(e.type == "rag.sources" for e in sink.events)
+    assert metrics.counter_value("speculative_retrieval_hits", mode="hybrid") == 1
+    assert metrics.gauge_value("speculative_retrieval_hit_ratio", mode="hybrid") == 1.0
+
+
+@pytest.mark.anyio
+async def test_speculative_retrieval_unused_is_cancelled():
+    retriever = CountingRetriever(delay=5)
+    metrics = MetricsRegistry()
+    orch = make_speculative_orchestrator(retriever, metrics)
+    sink = CollectingEventSink()
+    await asyncio.wait_for(
+        orch.run(make_ctx(), UserInput(text="hello", mode="chat"), ConversationWindow(), ProductProfile(), sink),
+        timeout=1,
+    )
+    assert retriever.completed == 0
+    assert sink.events[-1].payload["status"] == "ok"
+    assert not any(e.type == "rag.sources" for e in sink.events)
+    assert metrics.counter_value("speculative_retrieval_wasted", mode="chat") == 1
+    assert metrics.gauge_value("speculative_retrieval_waste_ratio", mode="chat") == 1.0
+
+
+@pytest.mark.anyio
+async def test_speculation_uses_gate_adjusted_prefs():
+    retriever = CountingRetriever(delay=0.01)
+    metrics = MetricsRegistry()
+    orch = make_speculative_orchestrator(retriever, metrics, DecisionRouter(retrieval_gate=RetrievalGate()))
+    sink = CollectingEventSink()
+    # Low confidence: the gate shrinks top_k_items for the plan, and speculation must match.
+    user_input = UserInput(text="What does the Atlas report say?", mode="hybrid")
+    await orch.run(make_ctx(), user_input, ConversationWindow(), ProductProfile(), sink)
+    assert [p.top_k_items for p in retriever.calls] == [5]
+    assert metrics.counter_value("speculative_retrieval_hits", mode="hybrid") == 1
+
+
+class StaleSpeculationRouter(DecisionRouter):
+    """Speculates with prefs the plan will not use."""
+
+    def retrieval_prefs(self, user_input, conversation):
+        return {"top_k_items": 20}
+
+
+@pytest.mark.anyio
+async def test_mismatched_speculation_is_cancelled_before_the_step_searches():
+    retriever = CountingRetriever(delay=5)
+    metrics = MetricsRegistry()
+    orch = make_speculative_orchestrator(retriever, metrics, StaleSpeculationRouter())
+    sink = CollectingEventSink()
+    user_input = UserInput(text="query text", mode="hybrid", retrieval_prefs={"top_k_items": 5})
+
+    task = asyncio.create_task(orch.run(make_ctx(), user_input, ConversationWindow(), ProductProfile(), sink))
+    while len(retriever.calls) < 2:
+        await asyncio.sleep(0.01)
+    # The step's own search is running and the speculative one is already gone.
+    assert [p.top_k_items for p in retriever.calls] == [20, 5]
+    assert metrics.counter_value("speculative_retrieval_wasted", mode="hybrid") == 1
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    assert retriever.completed == 0
+
+
+@pytest.mark.anyio
+async def test_debug_emits_plan_summary_with_gate_decision():
+    runner = StepRunner(
+        retriever=StubRetriever(),
+        dspy_runtime=FakeDSPyRuntime(),
+        tool_runner=StubToolRunner(),
+        agent_runner=StubAgentRunner(),
+        validator=StubValidator(),
+    )
+    orch = make_orchestrator(runner, router=DecisionRouter(retrieval_gate=RetrievalGate()))
+    sink = CollectingEventSink()
+    user_input = UserInput(text="Which documents mention the Q3 budget?", mode="chat", debug=True)
+    await orch.run(make_ctx(), user_input, ConversationWindow(), ProductProfile(), sink)
+    debug = next(e for e in sink.events if e.type == "rag.debug")
+    assert [s["kind"] for s in debug.payload["steps"]] == ["retrieve", "synthesize"]
+    assert debug.payload["metadata"]["retrieval_gate"]["retrieve"] is True
+    assert any(e.type == "rag.sources" for e in sink.events)
+
+
+class EmptyDbSession:
+    """Answers every statement with no rows and records it."""
+
+    def __init__(self, statements: list) -> None:
+        self.statements = statements
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return None
+
+    async def execute(self, stmt, params=None):
+        self.statements.append(stmt)
+        return SimpleNamespace(all=lambda: [], scalars=lambda: SimpleNamespace(all=lambda: []))
+
+    async def commit(self):
+        return None
+
+    async def rollback(self):
+        return None
+
+    async def close(self):
+        return None
+
+
+@pytest.mark.anyio
+async def test_default_item_repo_serves_retrieve_steps_without_owner_filter():
+    statements: list = []
+    item_repo = ItemRepo(session_factory=lambda: EmptyDbSession(statements))
+    retriever = HybridRetriever(item_repo=item_repo, chunker_registry=InMemoryChunkerRegistry())
+    runner = StepRunner(
+        retriever=retriever,
+        dspy_runtime=FakeDSPyRuntime(),
+        tool_runner=StubToolRunner(),
+        agent_runner=StubAgentRunner(),
+        validator=StubValidator(),
+    )
+    sink = CollectingEventSink()
+    await make_orchestrator(runner).run(
+        make_ctx(), UserInput(text="query text", mode="rag"), ConversationWindow(), ProductProfile(), sink
+    )
+    assert not any(e.type == "rag.error" for e in sink.events)
+    assert any(e.type == "rag.sources" for e in sink.events)
+    assert sink.events[-1].payload["status"] == "ok"
+    assert any("kb_items" in str(stmt) for stmt in statements)
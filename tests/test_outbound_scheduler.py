@@ -0,0 +1,81 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from aiblox_orchestrator.gateway.outbound import OutboundScheduler
+from aiblox_orchestrator.protocol.event_sink import EventSink
+from aiblox_orchestrator.protocol.events import EventEnvelope
+
+
+class GatedSink(EventSink):
+    def __init__(self, delay: float = 0.0, fail_after: int | None = None) -> None:
+        self.delay = delay
+        self.fail_after = fail_after
+        self.gate = asyncio.Event()
+        self.gate.set()
+        self.sent: List[EventEnvelope] = []
+
+    async def emit(self, event: EventEnvelope) -> None:
+        await self.gate.wait()
+        if self.fail_after is not None and len(self.sent) >= self.fail_after:
+            raise ConnectionError("socket closed")
+        await asyncio.sleep(self.delay)
+        self.sent.append(event)
+
+
+def event(request_id: str, seq: int, event_type: str = "rag.token") -> EventEnvelope:
+    return EventEnvelope(type=event_type, request_id=request_id, seq=seq, payload={})
+
+
+@pytest.mark.anyio
+async def test_tokens_are_not_starved_by_bulk_events():
+    inner = GatedSink(delay=0.001)
+    scheduler = OutboundScheduler(inner, quantum=4, bulk_cost=4)
+    for seq in range(1, 6):
+        await scheduler.emit(event("bulk", seq, "rag.sources"))
+    for seq in range(1, 9):
+        await scheduler.emit(event("chat", seq))
+    await scheduler.drain()
+
+    order = [(e.request_id, e.seq) for e in inner.sent]
+    assert order[:6] == [("bulk", 1), ("chat", 1), ("chat", 2), ("chat", 3), ("chat", 4), ("bulk", 2)]
+    assert order.index(("chat", 8)) < order.index(("bulk", 5))
+    for request_id in ("bulk", "chat"):
+        assert [seq for rid, seq in order if rid == request_id] == sorted(seq for rid, seq in order if rid == request_id)
+    await scheduler.aclose()
+
+
+@pytest.mark.anyio
+async def test_producers_only_wait_for_queue_space():
+    inner = GatedSink()
+    inner.gate.clear()
+    scheduler = OutboundScheduler(inner, max_queued_per_request=3)
+    for seq in range(1, 4):
+        await asyncio.wait_for(scheduler.emit(event("r", seq)), timeout=0.1)
+    await asyncio.sleep(0)
+    # The writer holds event 1 (blocked on the socket); events 2-4 fill the queue.
+    await asyncio.wait_for(scheduler.emit(event("r", 4)), timeout=0.1)
+    blocked = asyncio.create_task(scheduler.emit(event("r", 5)))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+    assert scheduler.queued == 3
+
+    inner.gate.set()
+    await asyncio.wait_for(blocked, timeout=1)
+    await scheduler.drain()
+    assert [e.seq for e in inner.sent] == [1, 2, 3, 4, 5]
+    await scheduler.aclose()
+
+
+@pytest.mark.anyio
+async def test_send_failure_releases_producers_and_raises():
+    inner = GatedSink(fail_after=1)
+    scheduler = OutboundScheduler(inner, max_queued_per_request=1)
+    await scheduler.emit(event("r", 1))
+    await scheduler.emit(event("r", 2))
+    await scheduler.drain()
+    with pytest.raises(ConnectionError):
+        await scheduler.emit(event("r", 3))
+    assert [e.seq for e in inner.sent] == [1]
+    await scheduler.aclose()
@@ -0,0 +1,215 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from aiblox_orchestrator.chunker.models import ChunkingOptions, cache_chunker_id
+from aiblox_orchestrator.chunker.registry import InMemoryChunkerRegistry
+from aiblox_orchestrator.retriever.embedder import DeterministicEmbedder
+from aiblox_orchestrator.workers.prechunk import PrechunkWorker
+
+
+def make_item(idx: int, text: str, content_hash: str | None = "h"):
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return SimpleNamespace(
+        id=uuid4(),
+        owner_user_id=uuid4(),
+        content_text=text,
+        content_hash=f"{content_hash}{idx}" if content_hash else None,
+        updated_at=base + timedelta(seconds=idx),
+    )
+
+
+class FakeItemRepo:
+    def __init__(self, items, now=None):
+        self.items = sorted(items, key=lambda i: (i.updated_at, i.id))
+        self.now = now or datetime(2030, 1, 1, tzinfo=timezone.utc)
+        self.min_ages = []
+
+    async def list_items_updated_after(self, updated_after, after_id, limit, min_age=None):
+        self.min_ages.append(min_age)
+        out = [
+            i
+            for i in self.items
+            if (updated_after is None or (i.updated_at, i.id) > (updated_after, after_id))
+            and (min_age is None or i.updated_at <= self.now - min_age)
+        ]
+        return out[:limit]
+
+
+class FakeChunkCacheRepo:
+    def __init__(self, fail_after_writes: int | None = None):
+        self.rows: list[dict] = []
+        self.fail_after_writes = fail_after_writes
+        self.writes = 0
+        self.batches: list[list[dict]] = []
+
+    async def link_cached_content(self, entries, chunker_id, embed_model_id):
+        present = {(r["item_id"], r["content_hash"]) for r in self.rows if r["chunker_id"] == chunker_id}
+        return {(e["item_id"], e["content_hash"]) for e in entries} & present
+
+    async def write_cache_rows(self, rows):
+        if self.fail_after_writes is not None and self.writes >= self.fail_after_writes:
+            raise RuntimeError("db down")
+        self.writes += 1
+        self.batches.append(list(rows))
+        self.rows.extend(rows)
+
+
+class CountingEmbedder(DeterministicEmbedder):
+    def __init__(self):
+        super().__init__(dim=4)
+        self.embedded: list[str] = []
+
+    async def embed_texts(self, texts):
+        texts = list(texts)
+        self.embedded.extend(texts)
+        return await super().embed_texts(texts)
+
+
+class FakeCheckpointRepo:
+    def __init__(self):
+        self.saved = None
+
+    async def get_checkpoint(self, worker_name):
+        return self.saved
+
+    async def save_checkpoint(self, worker_name, last_updated_at, last_item_id, processed_count):
+        self.saved = {
+            "worker_name": worker_name,
+            "last_updated_at": last_updated_at,
+            "last_item_id": last_item_id,
+            "processed_count": processed_count,
+        }
+
+
+class FakeItemEmbeddingRepo:
+    def __init__(self):
+        self.rows: list[dict] = []
+
+    async def upsert_item_embeddings(self, rows):
+        self.rows.extend(rows)
+
+
+def make_worker(items, cache=None, checkpoints=None, item_vectors=None, batch_size=2):
+    return PrechunkWorker(
+        item_repo=FakeItemRepo(items),
+        chunk_cache_repo=cache or FakeChunkCacheRepo(),
+        checkpoint_repo=checkpoints or FakeCheckpointRepo(),
+        chunker_registry=InMemoryChunkerRegistry(),
+        embedder=DeterministicEmbedder(dim=4),
+        item_embedding_repo=item_vectors,
+        options=ChunkingOptions(max_chunk_tokens=2),
+        batch_size=batch_size,
+    )
+
+
+@pytest.mark.anyio
+async def test_prechunk_writes_chunks_vectors_and_checkpoint():
+    items = [make_item(i, "one two three four five") for i in range(3)]
+    cache = FakeChunkCacheRepo()
+    checkpoints = FakeCheckpointRepo()
+    vectors = FakeItemEmbeddingRepo()
+    worker = make_worker(items, cache=cache, checkpoints=checkpoints, item_vectors=vectors)
+
+    result = await worker.run_once()
+
+    assert result.scanned == 3
+    assert result.chunked == 3
+    assert result.chunks_written == 9
+    assert all(r["embedding"] and r["chunker_id"] == cache_chunker_id("simple_token_like@v1", worker.options) for r in cache.rows)
+    assert len(vectors.rows) == 3
+    assert checkpoints.saved["last_item_id"] == items[-1].id
+    assert checkpoints.saved["processed_count"] == 3
+
+
+@pytest.mark.anyio
+async def test_prechunk_skips_cached_and_unhashed_items():
+    items = [make_item(0, "a b"), make_item(1, "c d", content_hash=None)]
+    cache = FakeChunkCacheRepo()
+    worker = make_worker(items, cache=cache)
+    await worker.run_once()
+
+    rerun = make_worker(items, cache=cache)
+    result = await rerun.run_once()
+    assert result.chunked == 0
+    assert result.skipped == 2
+
+
+@pytest.mark.anyio
+async def test_prechunk_resumes_from_checkpoint_after_failure():
+    items = [make_item(i, f"text {i}") for i in range(4)]
+    cache = FakeChunkCacheRepo(fail_after_writes=1)
+    checkpoints = FakeCheckpointRepo()
+    worker = make_worker(items, cache=cache, checkpoints=checkpoints)
+
+    with pytest.raises(RuntimeError):
+        await worker.run_once()
+    assert checkpoints.saved["processed_count"] == 2
+
+    cache.fail_after_writes = None
+    result = await worker.run_once()
+    assert result.scanned == 2
+    assert {r["item_id"] for r in cache.rows} == {i.id for i in items}
+
+
+@pytest.mark.anyio
+async def test_prechunk_embeds_duplicate_content_once():
+    items = [make_item(0, "same text here"), make_item(1, "same text here")]
+    for item in items:
+        item.content_hash = "dup"
+    cache = FakeChunkCacheRepo()
+    embedder = CountingEmbedder()
+    worker = make_worker(items, cache=cache)
+    worker.embedder = embedder
+
+    result = await worker.run_once()
+
+    assert result.chunked == 2
+    assert embedder.embedded == ["same text", "here"]
+    assert {r["item_id"] for r in cache.rows} == {i.id for i in items}
+
+
+@pytest.mark.anyio
+async def test_prechunk_never_splits_an_entry_across_writes():
+    # batch_size=2 caps writes at 16 rows; 8 + 10 chunks would straddle that limit.
+    items = [make_item(0, " ".join(f"a{i}" for i in range(16))), make_item(1, " ".join(f"b{i}" for i in range(20)))]
+    cache = FakeChunkCacheRepo()
+    worker = make_worker(items, cache=cache, batch_size=2)
+
+    result = await worker.run_once()
+
+    assert result.chunks_written == 18
+    assert [len(batch) for batch in cache.batches] == [8, 10]
+    assert [{r["item_id"] for r in batch} for batch in cache.batches] == [{items[0].id}, {items[1].id}]
+
+
+@pytest.mark.anyio
+async def test_prechunk_lags_behind_recent_writes():
+    items = [make_item(i, f"text {i}") for i in range(3)]
+    cache = FakeChunkCacheRepo()
+    worker = make_worker(items, cache=cache)
+    # Items are stamped a second apart; item 2 is younger than the lag, so it may still be
+    # part of an open transaction.
+    worker.settle_lag = timedelta(seconds=10)
+    worker.item_repo.now = items[1].updated_at + timedelta(seconds=10)
+
+    result = await worker.run_once()
+    assert result.scanned == 2
+    assert worker.item_repo.min_ages[0] == timedelta(seconds=10)
+
+    worker.item_repo.now += timedelta(seconds=1)
+    assert (await worker.run_once()).scanned == 1
+
+
+@pytest.mark.anyio
+async def test_prechunk_caches_non_default_options_under_their_own_key():
+    cache = FakeChunkCacheRepo()
+    await make_worker([make_item(0, "one two three")], cache=cache).run_once()
+
+    chunker_ids = {r["chunker_id"] for r in cache.rows}
+    assert len(chunker_ids) == 1
+    assert chunker_ids.pop().startswith("simple_token_like@v1#")
+    assert cache_chunker_id("simple_token_like@v1", ChunkingOptions()) == "simple_token_like@v1"
+    assert cache_chunker_id("x", ChunkingOptions(max_chunk_tokens=2)) != cache_chunker_id("x", ChunkingOptions(max_chunk_tokens=3))
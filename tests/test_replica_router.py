@@ -0,0 +1,59 @@
+import os
+
+import pytest
+from sqlalchemy import text
+
+from aiblox_kb.db import make_engine
+from aiblox_kb.replicas import ReplicaRouter
+
+UNREACHABLE = "postgresql+asyncpg://u:p@127.0.0.1:{port}/db"
+
+
+def make_router(strategy="round_robin", replicas=2):
+    primary = make_engine(UNREACHABLE.format(port=1))
+    engines = [make_engine(UNREACHABLE.format(port=2 + i)) for i in range(replicas)]
+    return ReplicaRouter(primary, engines, strategy=strategy, eject_seconds=60), primary, engines
+
+
+def test_round_robin_spreads_sessions_over_replicas():
+    router, _, replicas = make_router()
+    assert [router().bind for _ in range(4)] == [replicas[0], replicas[1], replicas[0], replicas[1]]
+
+
+def test_least_busy_picks_replica_with_fewest_checkouts(monkeypatch):
+    router, _, replicas = make_router(strategy="least_busy")
+    monkeypatch.setattr(replicas[0].pool, "checkedout", lambda: 4)
+    monkeypatch.setattr(replicas[1].pool, "checkedout", lambda: 1)
+    assert router.pick() is replicas[1]
+
+
+def test_ejected_replicas_are_skipped_and_primary_is_the_fallback():
+    router, primary, replicas = make_router()
+    router.mark_failed(replicas[0])
+    assert {router.pick() for _ in range(3)} == {replicas[1]}
+    router.mark_failed(replicas[1])
+    assert router.pick() is primary
+    router.mark_healthy(replicas[0])
+    assert router.pick() is replicas[0]
+
+
+@pytest.mark.anyio
+async def test_health_check_keeps_unreachable_replica_ejected():
+    router, _, replicas = make_router(replicas=1)
+    router.mark_failed(replicas[0])
+    results = await router.check_health(timeout=2)
+    assert results == {replicas[0]: False}
+    assert router.healthy_replicas() == []
+
+
+@pytest.mark.anyio
+@pytest.mark.skipif(not os.getenv("AIBLOX_TEST_REPLICA_DSNS"), reason="needs AIBLOX_TEST_REPLICA_DSNS")
+async def test_reads_reach_every_local_replica():
+    dsns = os.environ["AIBLOX_TEST_REPLICA_DSNS"].split(",")
+    replicas = [make_engine(dsn) for dsn in dsns]
+    router = ReplicaRouter(make_engine(dsns[0]), replicas)
+    ports = set()
+    for _ in range(len(replicas)):
+        async with router() as session:
+            ports.add((await session.execute(text("SELECT inet_server_port()"))).scalar())
+    assert len(ports) == len(replicas)
@@ -0,0 +1,95 @@
+from uuid import uuid4
+
+import pytest
+
+from aiblox_kb.repos.sharded_chunk_cache_repo import ShardedChunkCacheRepo
+from aiblox_kb.repos.sharded_item_repo import ShardedItemRepo
+from aiblox_kb.sharding import ShardMap
+from aiblox_orchestrator.retriever.hybrid_scorer import HybridScorer
+from aiblox_orchestrator.retriever.models import RetrievalPrefs
+
+
+class FakeShardRepo:
+    def __init__(self, fts=None, fail=False):
+        self.fts = fts or []
+        self.fail = fail
+        self.calls = 0
+        self.require_owner = False
+
+    async def search_fts(self, query_text, prefs):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("shard down")
+        return self.fts
+
+
+class FakeCacheShard:
+    def __init__(self):
+        self.rows = []
+
+    async def write_cache_rows(self, rows):
+        self.rows.extend(rows)
+
+
+def test_owner_strategy_routes_owner_filtered_searches_to_one_shard():
+    owner = uuid4()
+    shard_map = ShardMap(["s0", "s1", "s2"], strategy="owner", owner_assignments={owner: "s2"})
+    assert shard_map.shards_for_filters({"owner_user_id": str(owner)}) == ["s2"]
+    assert shard_map.shards_for_filters({}) == ["s0", "s1", "s2"]
+    assert shard_map.shard_for_item(uuid4()) is None
+
+
+def test_item_hash_strategy_is_stable():
+    shard_map = ShardMap(["s0", "s1"])
+    item_id = uuid4()
+    assert shard_map.shard_for_item(item_id) == shard_map.shard_for_item(str(item_id))
+
+
+def test_merge_shards_restores_global_ranks_for_rrf():
+    scorer = HybridScorer()
+    merged = scorer.merge_shards([[("a", 0.9), ("b", 0.2)], [("c", 0.5), ("d", 0.1)]], top_k=3)
+    assert merged == [("a", 0.9), ("c", 0.5), ("b", 0.2)]
+    fused = scorer.fuse(text_results=merged, vec_results=[], top_k=3)
+    assert [s.rank_text for s in fused] == [1, 2, 3]
+
+
+@pytest.mark.anyio
+async def test_sharded_search_reports_per_shard_latency_and_failures():
+    shards = {"s0": FakeShardRepo([("a", 0.3)]), "s1": FakeShardRepo([("b", 0.8)]), "s2": FakeShardRepo(fail=True)}
+    repo = ShardedItemRepo(shards, ShardMap(list(shards)))
+    prefs = RetrievalPrefs(query_text="q", top_k_items=5)
+
+    per_shard = await repo.search_fts_by_shard("q", prefs)
+
+    assert [r.shard for r in per_shard] == ["s0", "s1", "s2"]
+    assert per_shard[2].error and per_shard[2].results == []
+    assert all(r.elapsed_ms >= 0 for r in per_shard)
+    assert await repo.search_fts("q", prefs) == [("b", 0.8), ("a", 0.3)]
+
+
+@pytest.mark.anyio
+async def test_sharded_cache_writes_follow_item_placement():
+    shard_map = ShardMap(["s0", "s1"])
+    shards = {"s0": FakeCacheShard(), "s1": FakeCacheShard()}
+    repo = ShardedChunkCacheRepo(shards, shard_map)
+    items = [uuid4() for _ in range(8)]
+
+    await repo.write_cache_rows([{"item_id": i, "owner_user_id": uuid4()} for i in items])
+
+    for name, shard in shards.items():
+        assert all(shard_map.shard_for_item(r["item_id"]) == name for r in shard.rows)
+    assert sum(len(s.rows) for s in shards.values()) == len(items)
+
+
+@pytest.mark.anyio
+async def test_sharded_search_requires_owner_before_fanning_out():
+    shards = {"s0": FakeShardRepo([("a", 0.3)]), "s1": FakeShardRepo([("b", 0.8)])}
+    shards["s1"].require_owner = True
+    repo = ShardedItemRepo(shards, ShardMap(list(shards)))
+
+    with pytest.raises(ValueError, match="owner_user_id"):
+        await repo.search_fts("q", RetrievalPrefs(query_text="q", top_k_items=5))
+    assert all(shard.calls == 0 for shard in shards.values())
+
+    prefs = RetrievalPrefs(query_text="q", filters={"owner_user_id": str(uuid4())}, top_k_items=5)
+    assert await repo.search_fts("q", prefs) == [("b", 0.8), ("a", 0.3)]
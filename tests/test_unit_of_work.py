@@ -0,0 +1,148 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql
+
+from aiblox_kb.repos.chunk_cache_repo import TOUCH_INTERVAL, ChunkCacheRepo
+from aiblox_kb.repos.content_addressed_chunk_repo import ContentAddressedChunkCacheRepo
+from aiblox_kb.uow import UnitOfWork, current_unit_of_work, repo_session
+
+
+class FakeSession:
+    def __init__(self, log: list):
+        self.log = log
+        self.statements: list = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def begin(self):
+        return self
+
+    async def execute(self, stmt):
+        self.statements.append(str(stmt))
+        await asyncio.sleep(0)
+
+    async def commit(self):
+        self.log.append("commit")
+
+    async def rollback(self):
+        self.log.append("rollback")
+
+    async def close(self):
+        self.log.append("close")
+
+
+class FakeSessionFactory:
+    def __init__(self):
+        self.sessions: list[FakeSession] = []
+        self.log: list[str] = []
+
+    def __call__(self):
+        session = FakeSession(self.log)
+        self.sessions.append(session)
+        return session
+
+
+async def read(factory, label):
+    async with repo_session(factory) as session:
+        await session.execute(label)
+
+
+@pytest.mark.anyio
+async def test_repo_calls_share_one_read_only_session():
+    factory = FakeSessionFactory()
+    async with UnitOfWork(factory, read_only=True) as uow:
+        await asyncio.gather(read(factory, "a"), read(factory, "b"), read(factory, "c"))
+        assert current_unit_of_work() is uow
+    assert current_unit_of_work() is None
+    assert len(factory.sessions) == 1
+    assert factory.sessions[0].statements == ["SET TRANSACTION READ ONLY", "a", "b", "c"]
+    assert factory.log == ["commit", "close"]
+
+
+@pytest.mark.anyio
+async def test_deferred_writes_run_in_one_write_transaction():
+    factory = FakeSessionFactory()
+    async with UnitOfWork(factory, read_only=True) as uow:
+        await read(factory, "select")
+        uow.defer("update 1")
+        uow.defer("update 2")
+    assert len(factory.sessions) == 2
+    assert factory.sessions[1].statements == ["update 1", "update 2"]
+
+
+@pytest.mark.anyio
+async def test_other_factories_and_failures_are_isolated():
+    factory, other = FakeSessionFactory(), FakeSessionFactory()
+    with pytest.raises(RuntimeError):
+        async with UnitOfWork(factory) as uow:
+            await read(other, "elsewhere")
+            await read(factory, "select")
+            uow.defer("update")
+            raise RuntimeError("boom")
+    assert len(other.sessions) == 1
+    assert len(factory.sessions) == 1
+    assert factory.log == ["rollback", "close"]
+
+
+@pytest.mark.anyio
+async def test_cancelled_exit_still_closes_session():
+    factory = FakeSessionFactory()
+    rolling_back = asyncio.Event()
+
+    async def slow_rollback():
+        rolling_back.set()
+        await asyncio.sleep(0.05)
+        factory.log.append("rollback")
+
+    async def request():
+        async with UnitOfWork(factory) as uow:
+            (await uow.session()).rollback = slow_rollback
+            await asyncio.sleep(30)
+
+    task = asyncio.create_task(request())
+    await asyncio.sleep(0.01)
+    task.cancel()
+    await rolling_back.wait()
+    # A second cancellation mid-rollback must not strand the session.
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert factory.log == ["rollback", "close"]
+
+
+@pytest.mark.anyio
+async def test_cache_hits_are_stamped_in_batches():
+    factory = FakeSessionFactory()
+    repo = ChunkCacheRepo(factory)
+    await repo._touch({(uuid4(), "h1")}, "chunker", "model")
+    await repo._touch({(uuid4(), "h2"), (uuid4(), "h3")}, "chunker", "model")
+    assert factory.sessions == []
+
+    assert await repo.flush_touches() == 3
+    assert len(factory.sessions) == 1
+    assert len(factory.sessions[0].statements) == 1
+    assert factory.sessions[0].statements[0].startswith("UPDATE kb.kb_chunk_cache")
+    assert await repo.flush_touches() == 0
+
+    # Once the interval has passed, hits inside a unit of work join its deferred writes.
+    repo._touches_flushed_at -= TOUCH_INTERVAL.total_seconds()
+    async with UnitOfWork(factory):
+        await repo._touch({(uuid4(), "h4")}, "chunker", "model")
+        assert len(factory.sessions) == 1
+    assert len(factory.sessions) == 2
+    assert factory.sessions[1].statements[0].startswith("UPDATE kb.kb_chunk_cache")
+
+
+def test_content_addressed_usage_joins_refs_to_stored_content():
+    repo = ContentAddressedChunkCacheRepo()
+    stmt = select(repo.model.owner_user_id, func.sum(repo._entry_bytes())).select_from(repo._sized_entries())
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "kb.kb_item_chunk_refs JOIN kb.kb_chunk_store" in sql
+    assert "octet_length(kb.kb_chunk_store.chunk_text)" in sql